@@ -1,6 +1,21 @@
-from typing import List, Tuple, Dict
+import os
+import sys
+from typing import List, Tuple, Dict, Optional
 from ortools.sat.python import cp_model
 
+# The solver configuration is shared with the models in Solver/
+SOLVER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Solver")
+if SOLVER_DIR not in sys.path:
+    sys.path.append(SOLVER_DIR)
+
+# The instance parser is shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from solver_config import SolverConfig
+from instance import read_stdin
+
 def Input():
     """
     Reads input data from stdin and returns it in a structured format.
@@ -10,30 +25,11 @@ def Input():
         A tuple containing: number of items, number of trucks, 
         list of item dimensions, list of truck dimensions and costs
     """
-    try:
-
-        # Parse first line for number of items and trucks
-        n_items, n_trucks = map(int, input().split())
-
-        # Parse item dimensions
-        items = [
-            tuple(map(int, input().split())) 
-            for i in range(n_items)
-        ]
-
-        # Parse truck dimensions and costs
-        trucks = [
-            tuple(map(int, input().split())) 
-            for i in range(n_trucks)
-        ]
-
-        return n_items, n_trucks, items, trucks
-
-    except (ValueError, IndexError) as e:
-        raise ValueError(f"Invalid input format: {e}")
+    # one bulk parse of stdin (heuristic/instance.py), raises ValueError on a bad format
+    return read_stdin().as_tuple()
 
 
-def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]], time_limit: int = 300) -> List[str]:
+def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]], time_limit: int = 300, config: Optional[SolverConfig] = None) -> List[str]:
     """
     Solves the bin packing problem using Constraint Programming.
     
@@ -43,6 +39,8 @@ def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[T
         items (List[Tuple[int, int]]): List of item dimensions (width, length).
         trucks (List[Tuple[int, int, int]]): List of truck dimensions (width, length, cost).
         time_limit (int, optional): Maximum solving time in seconds. Defaults to 300.
+        config (SolverConfig, optional): Workers, time limit, gap, seed, log and solution
+                                         callback. Overrides time_limit. Defaults to None.
     
     Returns:
         List[str]: A list of strings representing the solution for each item. 
@@ -123,9 +121,9 @@ def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[T
     model.Minimize(cost)
 
     # Solve the model
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = time_limit
-    status = solver.Solve(model)
+    config = config or SolverConfig(time_limit)
+    solver = config.cp_solver()
+    status = config.solve_cp(solver, model)
 
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         results = []
@@ -147,8 +145,9 @@ def main():
     """
     try:
         n_items, n_trucks, items, trucks = Input()
-        # Let time_limit = 600s
-        solution = CP(n_items, n_trucks, items, trucks, 600)
+        # Let time_limit = 600s, --time-limit= / --workers= / --gap= / --seed= / --log to change the search
+        config = SolverConfig.from_argv(sys.argv[1:], time_limit=600)
+        solution = CP(n_items, n_trucks, items, trucks, config.time_limit, config)
 
         if solution == ["F"]:
             print("F")
@@ -1,11 +1,19 @@
 import sys
 import os
 import time
-import csv
 import random
-import copy
 from typing import List
 
+# bounds.py, instance.py, corpus.py, serialize.py nằm trong heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from bounds import lower_bound, gap
+from instance import load
+from corpus import open_all
+from serialize import write_solution, placements_array, CsvAppender
+
 INF = 10**9
 
 # ===================== DATA STRUCTURES =====================
@@ -32,6 +40,33 @@ class Container:
         self.boxes_pos = [(0, 0)]
 
 
+class Journal:
+    """
+    Undo log cho một vòng destroy/repair: lưu trạng thái của box/container
+    lần đầu bị thay đổi, rollback ghi đè lại theo thứ tự ngược.
+    """
+
+    def __init__(self):
+        self.boxes = {}       # box ID -> (box, truck, x, y, rotation)
+        self.containers = {}  # container ID -> (container, boxes, boxes_pos, used)
+
+    def record_box(self, box: Box):
+        if box.ID not in self.boxes:
+            self.boxes[box.ID] = (box, box.truck, box.x, box.y, box.rotation)
+
+    def record_container(self, cont: Container):
+        if cont.ID not in self.containers:
+            self.containers[cont.ID] = (cont, cont.boxes[:], cont.boxes_pos[:], cont.used)
+
+    def rollback(self):
+        for box, truck, x, y, rot in reversed(list(self.boxes.values())):
+            box.truck, box.x, box.y, box.rotation = truck, x, y, rot
+        for cont, bids, pos, used in reversed(list(self.containers.values())):
+            cont.boxes, cont.boxes_pos, cont.used = bids, pos, used
+        self.boxes.clear()
+        self.containers.clear()
+
+
 # ===================== GEOMETRY =====================
 
 def box_intersect(b1: Box, b2: Box) -> bool:
@@ -105,41 +140,47 @@ def greedy_construct(boxes, containers):
 
 # ===================== DESTROY =====================
 
-def destroy_solution(boxes, containers, destroy_rate=0.2):
+def destroy_solution(boxes, containers, destroy_rate=0.2, journal=None):
     active_boxes = [b for b in boxes if b.truck != -1]
     if not active_boxes:
         return []
 
-    max_cost = max(containers[b.truck - 1].cost for b in active_boxes)
+    cont_by_id = {c.ID: c for c in containers}
+
+    max_cost = max(cont_by_id[b.truck].cost for b in active_boxes)
     weights = [
-        containers[b.truck - 1].cost / max_cost
+        cont_by_id[b.truck].cost / max_cost
         for b in active_boxes
     ]
 
     num_remove = max(1, int(len(active_boxes) * destroy_rate))
     removed = random.choices(active_boxes, weights=weights, k=num_remove)
     removed = list({b.ID: b for b in removed}.values())
-    
+
+    touched = {b.truck: cont_by_id[b.truck] for b in removed}
+    if journal is not None:
+        for b in removed:
+            journal.record_box(b)
+        for c in touched.values():
+            journal.record_container(c)
+
     for b in removed:
         b.truck = -1
 
-    for c in containers:
+    for c in touched.values():
+        remaining = sorted(bid for bid in c.boxes if boxes[bid - 1].truck != -1)
         c.boxes.clear()
         c.boxes_pos = [(0, 0)]
         c.used = False
-
-    cont_by_id = {c.ID: c for c in containers}
-    
-    for b in boxes:
-        if b.truck != -1:
-            cont = cont_by_id[b.truck]
-            insert_box(b, cont, b.x, b.y, b.rotation)
+        for bid in remaining:
+            b = boxes[bid - 1]
+            insert_box(b, c, b.x, b.y, b.rotation)
     return removed
 
 
 # ===================== REPAIR =====================
 
-def repair_solution(removed, boxes, containers):
+def repair_solution(removed, boxes, containers, journal=None):
     removed_sorted = sorted(removed, key=lambda b: b.w * b.h, reverse=True)
     
     for b in removed_sorted:
@@ -148,6 +189,8 @@ def repair_solution(removed, boxes, containers):
             for (x, y) in cont.boxes_pos:
                 for rot in (False, True):
                     if can_place(b, cont, x, y, rot, boxes):
+                        if journal is not None:
+                            journal.record_container(cont)
                         insert_box(b, cont, x, y, rot)
                         cont.boxes_pos.remove((x, y))
                         placed = True
@@ -163,58 +206,50 @@ def repair_solution(removed, boxes, containers):
 
 # ===================== LNS =====================
 
-def CB_LNS(boxes, containers, iters=100, destroy_rate=0.3):
+def CB_LNS(boxes, containers, iters=100, destroy_rate=0.3, bound=None):
     best_cost = total_cost(containers)
-    current_container = copy.deepcopy(containers)
-    current_boxes = copy.deepcopy(boxes)
 
     for _ in range(iters):
-        removed = destroy_solution(boxes, containers, destroy_rate)
-        repair_solution(removed, boxes, containers)
+        if bound is not None and best_cost <= bound:
+            break  # đã tối ưu
+
+        journal = Journal()
+        removed = destroy_solution(boxes, containers, destroy_rate, journal)
+        repair_solution(removed, boxes, containers, journal)
 
         c = total_cost(containers)
         
         if c < best_cost:
             best_cost = c
-            current_container = copy.deepcopy(containers)
-            current_boxes = copy.deepcopy(boxes)
         else:
-            # rollback
-            for b in boxes:
-                b.truck = -1
-            for cont in containers:
-                cont.used = False
-                cont.boxes = []
-                cont.boxes_pos = [(0, 0)]
-            containers = copy.deepcopy(current_container)
-            boxes = copy.deepcopy(current_boxes)
+            journal.rollback()
 
-    return current_boxes, current_container, best_cost
+    return boxes, containers, best_cost
 
 
 # ===================== SOLVE =====================
 
-def solve_single(input_path, lns_rounds=50, iters_per_round=100, destroy_rate=0.3):
-    with open(input_path, "r") as f:
-        data = f.read().strip().split()
-
-    it = iter(data)
+def solve_single(input_path, lns_rounds=50, iters_per_round=100, destroy_rate=0.3, instance=None):
+    # parse một lần thành mảng, sidecar .npz bỏ qua bước parse ở các lần chạy sau
+    # (instance: view sẵn có từ corpus thì không đọc file)
+    if instance is None:
+        instance = load(input_path, cache=True)
+    N, K = instance.n, instance.k
 
-    N = int(next(it))
-    K = int(next(it))
+    boxes = [Box(i + 1, w, h) for i, (w, h) in enumerate(instance.item_list())]
+    containers = [Container(j + 1, W, H, cost) for j, (W, H, cost) in enumerate(instance.truck_list())]
 
-    boxes = [Box(i + 1, int(next(it)), int(next(it))) for i in range(N)]
-    containers = [
-        Container(i + 1, int(next(it)), int(next(it)), int(next(it)))
-        for i in range(K)
-    ]
+    # cận dưới của cost: dừng sớm khi lời giải đạt cận
+    bound = lower_bound([(b.w, b.h) for b in boxes], [(c.W, c.H, c.cost) for c in containers])
 
     start_time = time.time()
     
     greedy_construct(boxes, containers)
     
     for _ in range(lns_rounds):
-        boxes, containers, _ = CB_LNS(boxes, containers, iters=iters_per_round, destroy_rate=destroy_rate)
+        boxes, containers, best_cost = CB_LNS(boxes, containers, iters=iters_per_round, destroy_rate=destroy_rate, bound=bound)
+        if best_cost <= bound:
+            break
     
     end_time = time.time()
 
@@ -222,14 +257,12 @@ def solve_single(input_path, lns_rounds=50, iters_per_round=100, destroy_rate=0.
     n_used = count_used_trucks(containers)
     running_time = end_time - start_time
 
-    return N, K, n_used, cost, running_time, boxes
+    return N, K, n_used, cost, running_time, boxes, bound
 
 
-def write_output(output_path, N, K, cost, running_time, boxes):
-    with open(output_path, "w") as f:
-        for b in sorted(boxes, key=lambda x: x.ID):
-            f.write(f"{b.ID} {b.truck} {b.x} {b.y} {int(b.rotation)}\n")
-        f.write(f"{N} {K} {cost} {running_time:.6f}\n")
+def write_output(output_path, N, K, cost, running_time, boxes, binary=False):
+    # format cả lời giải một lần rồi ghi một lần (binary=True: file .npz, xem serialize.py)
+    write_solution(output_path, placements_array(boxes), f"{N} {K} {cost} {running_time:.6f}", binary)
 
 
 # ===================== MAIN =====================
@@ -239,18 +272,15 @@ def main():
     test_dir = os.path.join(base_dir, "Test_case")
     output_base = os.path.dirname(os.path.abspath(__file__))
 
-    results = []
-
-    phases = [
-        (1, 1, 40),
-        (2, 0, 59),
-        (3, 0, 59)
-    ]
+    # mỗi test xong là ghi ngay một dòng CSV: sweep bị ngắt vẫn giữ kết quả
+    csv_path = os.path.join(output_base, "result_CBGLS.csv")
+    results = CsvAppender(csv_path, ['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time', 'lower_bound', 'gap'])
 
-    for phase, start, end in phases:
-        for test_num in range(start, end + 1):
+    # phase / test lấy từ các file có trong Test_case/, instance đọc từ corpus đóng gói
+    for phase, corpus in open_all(test_dir):
+        for test_num, instance in corpus:
             test_str = f"{test_num:02d}"
-            input_path = os.path.join(test_dir, f"Phase_{phase}", f"input{test_str}.txt")
+            input_path = corpus.path(test_num)
             output_path = os.path.join(output_base, f"Phase_{phase}", f"output{test_str}.txt")
 
             if not os.path.exists(input_path):
@@ -260,13 +290,15 @@ def main():
                     'n_trucks': 'N/A',
                     'n_trucks_used': 'N/A',
                     'cost': 'N/A',
-                    'running_time': 'N/A'
+                    'running_time': 'N/A',
+                    'lower_bound': 'N/A',
+                    'gap': 'N/A'
                 })
                 continue
 
             try:
-                N, K, n_used, cost, running_time, boxes = solve_single(
-                    input_path, lns_rounds=50, iters_per_round=100, destroy_rate=0.3
+                N, K, n_used, cost, running_time, boxes, bound = solve_single(
+                    input_path, lns_rounds=50, iters_per_round=100, destroy_rate=0.3, instance=instance
                 )
                 write_output(output_path, N, K, cost, running_time, boxes)
                 
@@ -275,7 +307,9 @@ def main():
                     'n_trucks': K,
                     'n_trucks_used': n_used,
                     'cost': cost,
-                    'running_time': f"{running_time:.6f}"
+                    'running_time': f"{running_time:.6f}",
+                    'lower_bound': bound,
+                    'gap': f"{gap(cost, bound):.4f}"
                 })
                 print(f"Phase {phase} - Test {test_str}: Cost={cost}, Time={running_time:.6f}s")
             except Exception as e:
@@ -285,16 +319,12 @@ def main():
                     'n_trucks': 'N/A',
                     'n_trucks_used': 'N/A',
                     'cost': 'N/A',
-                    'running_time': 'N/A'
+                    'running_time': 'N/A',
+                    'lower_bound': 'N/A',
+                    'gap': 'N/A'
                 })
 
-    # Write CSV
-    csv_path = os.path.join(output_base, "result_CBGLS.csv")
-    with open(csv_path, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time'])
-        writer.writeheader()
-        writer.writerows(results)
-    
+    results.close()
     print(f"\nResults saved to {csv_path}")
 
 
@@ -2,9 +2,76 @@
 import sys
 import os
 import time
-from typing import List, Tuple, Dict
+import queue
+from typing import List, Tuple, Dict, Optional, Callable, Union
 from ortools.sat.python import cp_model
 
+# The solver configuration is shared with the models in Solver/
+SOLVER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "Solver")
+if SOLVER_DIR not in sys.path:
+    sys.path.append(SOLVER_DIR)
+
+# The instance parser is shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from solver_config import SolverConfig
+from instance import load
+from corpus import open_all
+from serialize import format_rows
+
+# (pack, bin, x, y, rotated), 1-based like the output file
+Placement = Tuple[int, int, int, int, int]
+
+
+class IncumbentStream(cp_model.CpSolverSolutionCallback):
+    """
+    Solution callback passing every improving solution to the caller.
+
+    Each incumbent is sent as (cost, elapsed time in seconds, placements),
+    either to a function or put on a queue. If the function returns True
+    the search stops and the incumbent is kept as the final solution.
+    """
+
+    def __init__(self, target: Union[Callable[[int, float, List[Placement]], Optional[bool]], queue.Queue],
+                 cost, X: Dict, R: List, l: List, b: List, n_packs: int, n_bins: int, start_time: float):
+        """
+        Args:
+            target: Function called as target(cost, elapsed, placements), or a queue.Queue
+            cost: Objective expression of the model
+            X, R, l, b: Placement, rotation and coordinate variables
+            n_packs (int), n_bins (int): Problem size
+            start_time (float): time.time() the elapsed time is measured from
+        """
+        super().__init__()
+        self.target = target
+        self.cost = cost
+        self.X, self.R, self.l, self.b = X, R, l, b
+        self.n_packs = n_packs
+        self.n_bins = n_bins
+        self.start_time = start_time
+        self.best = None
+        self.n_incumbents = 0
+
+    def on_solution_callback(self) -> None:
+        cost = self.Value(self.cost)
+        if self.best is not None and cost >= self.best:
+            return
+        self.best = cost
+        self.n_incumbents += 1
+
+        placements = []
+        for i in range(self.n_packs):
+            bin_placement = next(j + 1 for j in range(self.n_bins) if self.Value(self.X[i, j]))
+            placements.append((i + 1, bin_placement, self.Value(self.l[i]), self.Value(self.b[i]), self.Value(self.R[i])))
+        elapsed = time.time() - self.start_time
+
+        if isinstance(self.target, queue.Queue):
+            self.target.put((cost, elapsed, placements))
+        elif self.target(cost, elapsed, placements):
+            self.StopSearch()
+
 
 class BinPackingSolver:
     """
@@ -14,16 +81,23 @@ class BinPackingSolver:
     and solving the bin packing problem with optional rotation of packages.
     """
 
-    def __init__(self, file_path: str, time_limit: int = 600):
+    def __init__(self, file_path: str, time_limit: int = 600, config: Optional[SolverConfig] = None,
+                 instance=None):
         """
         Initialize the solver with input file and time limit.
         
         Args:
             file_path (str): Path to the input data file
             time_limit (int, optional): Maximum solving time in seconds. Defaults to 600.
+            config (SolverConfig, optional): Workers, time limit, gap, seed, log and solution
+                                             callback. Overrides time_limit. Defaults to None.
+            instance (Instance, optional): Already loaded instance (e.g. a view of the packed
+                                           corpus), file_path is then not read. Defaults to None.
         """
         self.file_path = file_path
-        self.time_limit = time_limit
+        self.instance = instance
+        self.config = config or SolverConfig(time_limit)
+        self.time_limit = self.config.time_limit
         self.n_packs = 0
         self.n_bins = 0
         self.packs = []
@@ -41,27 +115,15 @@ class BinPackingSolver:
             ValueError: If the input file format is invalid
         """
         try:
-            with open(self.file_path, 'r') as f:
-                data = f.readlines()
-                
-                # Parse first line for number of packs and bins
-                self.n_packs, self.n_bins = map(int, data[0].split())
-                
-                # Parse pack dimensions
-                self.packs = [
-                    tuple(map(int, data[i].split())) 
-                    for i in range(1, self.n_packs + 1)
-                ]
-                
-                # Parse bin dimensions and costs
-                self.bins = [
-                    tuple(map(int, data[i].split())) 
-                    for i in range(self.n_packs + 1, len(data))
-                ]
-                
-                # Calculate maximum bin dimensions for constraint setting
-                self.max_width = max(x[0] for x in self.bins)
-                self.max_height = max(x[1] for x in self.bins)
+            # bulk parse, the .npz sidecar skips it on the next runs of the benchmark
+            instance = self.instance if self.instance is not None else load(self.file_path, cache=True)
+            self.n_packs, self.n_bins = instance.n, instance.k
+            self.packs = instance.item_list()
+            self.bins = instance.truck_list()
+
+            # Calculate maximum bin dimensions for constraint setting
+            self.max_width = int(instance.trucks[:, 0].max())
+            self.max_height = int(instance.trucks[:, 1].max())
 
         except FileNotFoundError:
             raise FileNotFoundError(f"Input file not found: {self.file_path}")
@@ -156,10 +218,16 @@ class BinPackingSolver:
 
         return model, Z
 
-    def solve(self) -> None:
+    def solve(self, on_solution: Optional[Union[Callable[[int, float, List[Placement]], Optional[bool]], queue.Queue]] = None) -> None:
         """
         Solve the bin packing problem and print results.
+
+        Args:
+            on_solution (optional): Function or queue.Queue receiving every improving
+                solution as (cost, elapsed time, placements), see IncumbentStream.
+                It replaces the callback of the SolverConfig. Defaults to None.
         """
+        start_time = time.time()
         try:
             # Read input data
             self.read_input()
@@ -175,9 +243,11 @@ class BinPackingSolver:
             model.Minimize(cost)
 
             # Solve the model
-            solver = cp_model.CpSolver()
-            solver.parameters.max_time_in_seconds = self.time_limit
-            status = solver.Solve(model)
+            solver = self.config.cp_solver()
+            stream = None
+            if on_solution is not None:
+                stream = IncumbentStream(on_solution, cost, X, R, l, b, self.n_packs, self.n_bins, start_time)
+            status = self.config.solve_cp(solver, model, stream)
             
             # minCost
             self.minCost = solver.Value(cost)
@@ -201,42 +271,41 @@ class BinPackingSolver:
         """
 
         if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            res = ""
+            rows = []
             for i in range(self.n_packs):
                 for j in range(self.n_bins):
                     if solver.Value(X[i, j]) == 1:
                         bin_placement = j + 1
-                res += f"{i + 1} {bin_placement} {solver.Value(r[i])} {solver.Value(t[i])} {solver.Value(R[i])}"
-                if i != self.n_packs -1:
-                    res += '\n'
-            return res
+                rows.append((i + 1, bin_placement, solver.Value(r[i]), solver.Value(t[i]), solver.Value(R[i])))
+            # all the rows formatted at once, no trailing newline
+            return format_rows(rows)
         else:
             return("F")
         
 if __name__ == "__main__":
-    numtest = [[1, 40], [0, 59], [0, 59]]
-    for phase in range(1, 4):
-        for test in range(numtest[phase-1][0], numtest[phase-1][1]+1):
-            input_path = f"Test_case/Phase_{phase}/input{test:02d}.txt"
+    # --time-limit= / --workers= / --gap= / --seed= / --log to change the search
+    config = SolverConfig.from_argv(sys.argv[1:], time_limit=300)
+    # --stream: print every improving solution (cost, time) on stderr
+    on_solution = None
+    if "--stream" in sys.argv[1:]:
+        on_solution = lambda cost, elapsed, placements: print(f"{cost} {elapsed:.3f}", file=sys.stderr)
+    # phases / tests found in Test_case/, instances read from the packed corpus
+    for phase, corpus in open_all("Test_case"):
+        for test, instance in corpus:
+            input_path = corpus.path(test)
             output_path = f"Output/Output-CP/Phase_{phase}/output{test:02d}.txt"
 
-            with open(input_path, "r") as input_file:
-                start_time = time.time()
+            start_time = time.time()
 
-                solver = BinPackingSolver(input_path, 300)
-                result = solver.solve()
-                end_time = time.time()
-                execution_time = end_time - start_time
+            solver = BinPackingSolver(input_path, config=config, instance=instance)
+            result = solver.solve(on_solution)
+            end_time = time.time()
+            execution_time = end_time - start_time
+
+            summary = f"{solver.n_bins} {solver.n_packs} {solver.minCost} {execution_time}"
 
-                summary = f"{solver.n_bins} {solver.n_packs} {solver.minCost} {execution_time}"
-            input_file.close()
-            
             with open(output_path, "w") as output_file:
-                output_file.write(result)
-                if result != "F":
-                    output_file.write('\n')
-                    output_file.write(summary)
-            output_file.close()
+                output_file.write(result if result == "F" else f"{result}\n{summary}")
 
     # input_path = "Output/Ouput-CP/test_input.txt"
     # output_path = "Output/Ouput-CP/test_output.txt"
@@ -1,9 +1,18 @@
 import sys
 import os
 import time
-import csv
 from typing import List
 
+# bounds.py, instance.py, corpus.py, serialize.py nằm trong heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from bounds import lower_bound, gap
+from instance import load
+from corpus import open_all
+from serialize import write_solution, placements_array, CsvAppender
+
 INF = 10**9
 
 # ===================== DATA STRUCTURES =====================
@@ -118,20 +127,18 @@ def greedy_construct(boxes, containers):
 
 # ===================== SOLVE =====================
 
-def solve_single(input_path):
-    with open(input_path, "r") as f:
-        data = f.read().strip().split()
+def solve_single(input_path, instance=None):
+    # parse một lần thành mảng, sidecar .npz bỏ qua bước parse ở các lần chạy sau
+    # (instance: view sẵn có từ corpus thì không đọc file)
+    if instance is None:
+        instance = load(input_path, cache=True)
+    N, K = instance.n, instance.k
 
-    it = iter(data)
+    boxes = [Box(i + 1, w, h) for i, (w, h) in enumerate(instance.item_list())]
+    containers = [Container(j + 1, W, H, cost) for j, (W, H, cost) in enumerate(instance.truck_list())]
 
-    N = int(next(it))
-    K = int(next(it))
-
-    boxes = [Box(i + 1, int(next(it)), int(next(it))) for i in range(N)]
-    containers = [
-        Container(i + 1, int(next(it)), int(next(it)), int(next(it)))
-        for i in range(K)
-    ]
+    # cận dưới của cost, để báo gap trong CSV
+    bound = lower_bound([(b.w, b.h) for b in boxes], [(c.W, c.H, c.cost) for c in containers])
 
     start_time = time.time()
     greedy_construct(boxes, containers)
@@ -141,16 +148,12 @@ def solve_single(input_path):
     n_used = count_used_trucks(containers)
     running_time = end_time - start_time
 
-    return N, K, n_used, cost, running_time, boxes
+    return N, K, n_used, cost, running_time, boxes, bound
 
 
-def write_output(output_path, N, K, cost, running_time, boxes):
-    with open(output_path, "w") as f:
-        # Write box placements
-        for b in sorted(boxes, key=lambda x: x.ID):
-            f.write(f"{b.ID} {b.truck} {b.x} {b.y} {int(b.rotation)}\n")
-        # Write summary
-        f.write(f"{N} {K} {cost} {running_time:.6f}\n")
+def write_output(output_path, N, K, cost, running_time, boxes, binary=False):
+    # format cả lời giải một lần rồi ghi một lần (binary=True: file .npz, xem serialize.py)
+    write_solution(output_path, placements_array(boxes), f"{N} {K} {cost} {running_time:.6f}", binary)
 
 
 # ===================== MAIN =====================
@@ -160,36 +163,32 @@ def main():
     test_dir = os.path.join(base_dir, "Test_case")
     output_base = os.path.dirname(os.path.abspath(__file__))
 
-    results = []
-
-    # Phase 1: test 01-40
-    # Phase 2: test 00-59
-    # Phase 3: test 00-59
-    phases = [
-        (1, 1, 40),
-        (2, 0, 59),
-        (3, 0, 59)
-    ]
+    # mỗi test xong là ghi ngay một dòng CSV: sweep bị ngắt vẫn giữ kết quả
+    csv_path = os.path.join(output_base, "result_Greedy.csv")
+    results = CsvAppender(csv_path, ['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time', 'lower_bound', 'gap'])
 
-    for phase, start, end in phases:
-        for test_num in range(start, end + 1):
+    # phase / test lấy từ các file có trong Test_case/, instance đọc từ corpus đóng gói
+    for phase, corpus in open_all(test_dir):
+        for test_num, instance in corpus:
             test_str = f"{test_num:02d}"
-            input_path = os.path.join(test_dir, f"Phase_{phase}", f"input{test_str}.txt")
+            input_path = corpus.path(test_num)
             output_path = os.path.join(output_base, f"Phase_{phase}", f"output{test_str}.txt")
 
             if not os.path.exists(input_path):
                 print(f"Skip: {input_path} not found")
                 results.append({
                     'n_items': 'N/A',
-                    'n_trucks': 'N/A', 
+                    'n_trucks': 'N/A',
                     'n_trucks_used': 'N/A',
                     'cost': 'N/A',
-                    'running_time': 'N/A'
+                    'running_time': 'N/A',
+                    'lower_bound': 'N/A',
+                    'gap': 'N/A'
                 })
                 continue
 
             try:
-                N, K, n_used, cost, running_time, boxes = solve_single(input_path)
+                N, K, n_used, cost, running_time, boxes, bound = solve_single(input_path, instance=instance)
                 write_output(output_path, N, K, cost, running_time, boxes)
                 
                 results.append({
@@ -197,7 +196,9 @@ def main():
                     'n_trucks': K,
                     'n_trucks_used': n_used,
                     'cost': cost,
-                    'running_time': f"{running_time:.6f}"
+                    'running_time': f"{running_time:.6f}",
+                    'lower_bound': bound,
+                    'gap': f"{gap(cost, bound):.4f}"
                 })
                 print(f"Phase {phase} - Test {test_str}: Cost={cost}, Time={running_time:.6f}s")
             except Exception as e:
@@ -207,16 +208,12 @@ def main():
                     'n_trucks': 'N/A',
                     'n_trucks_used': 'N/A', 
                     'cost': 'N/A',
-                    'running_time': 'N/A'
+                    'running_time': 'N/A',
+                    'lower_bound': 'N/A',
+                    'gap': 'N/A'
                 })
 
-    # Write CSV
-    csv_path = os.path.join(output_base, "result_Greedy.csv")
-    with open(csv_path, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time'])
-        writer.writeheader()
-        writer.writerows(results)
-    
+    results.close()
     print(f"\nResults saved to {csv_path}")
 
 
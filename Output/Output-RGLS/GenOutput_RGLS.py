@@ -1,10 +1,19 @@
 import sys
 import os
 import time
-import csv
 import random
 from typing import List
 
+# bounds.py, instance.py, corpus.py, serialize.py nằm trong heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from bounds import lower_bound, gap
+from instance import load
+from corpus import open_all
+from serialize import write_solution, placements_array, CsvAppender
+
 INF = 10**9
 
 # ===================== DATA STRUCTURES =====================
@@ -124,9 +133,11 @@ def rebuild_container_state(boxes, containers):
         c.boxes.clear()
         c.used = False
 
+    # containers đã được sort theo cost: tìm theo ID, không theo vị trí
+    cont_by_id = {c.ID: c for c in containers}
     for b in boxes:
         if b.truck != -1:
-            cont = containers[b.truck - 1]
+            cont = cont_by_id[b.truck]
             cont.boxes.append(b.ID)
             cont.used = True
 
@@ -185,11 +196,14 @@ def restore_solution(boxes, containers, saved):
     rebuild_container_state(boxes, containers)
 
 
-def random_LNS(boxes, containers, iters=100, destroy_rate=0.3):
+def random_LNS(boxes, containers, iters=100, destroy_rate=0.3, bound=None):
     best_cost = total_cost(containers)
     best_solution = save_solution(boxes)
 
     for i in range(iters):
+        if bound is not None and best_cost <= bound:
+            break  # đã tối ưu
+
         removed = random_destroy(boxes, containers, destroy_rate)
         repair_solution(removed, boxes, containers)
 
@@ -206,38 +220,34 @@ def random_LNS(boxes, containers, iters=100, destroy_rate=0.3):
 
 # ===================== SOLVE =====================
 
-def solve_single(input_path, iters=100, destroy_rate=0.3):
-    with open(input_path, "r") as f:
-        data = f.read().strip().split()
-
-    it = iter(data)
+def solve_single(input_path, iters=100, destroy_rate=0.3, instance=None):
+    # parse một lần thành mảng, sidecar .npz bỏ qua bước parse ở các lần chạy sau
+    # (instance: view sẵn có từ corpus thì không đọc file)
+    if instance is None:
+        instance = load(input_path, cache=True)
+    N, K = instance.n, instance.k
 
-    N = int(next(it))
-    K = int(next(it))
+    boxes = [Box(i + 1, w, h) for i, (w, h) in enumerate(instance.item_list())]
+    containers = [Container(j + 1, W, H, cost) for j, (W, H, cost) in enumerate(instance.truck_list())]
 
-    boxes = [Box(i + 1, int(next(it)), int(next(it))) for i in range(N)]
-    containers = [
-        Container(i + 1, int(next(it)), int(next(it)), int(next(it)))
-        for i in range(K)
-    ]
+    # cận dưới của cost: dừng sớm khi lời giải đạt cận
+    bound = lower_bound([(b.w, b.h) for b in boxes], [(c.W, c.H, c.cost) for c in containers])
 
     start_time = time.time()
     greedy_construct(boxes, containers)
-    random_LNS(boxes, containers, iters=iters, destroy_rate=destroy_rate)
+    random_LNS(boxes, containers, iters=iters, destroy_rate=destroy_rate, bound=bound)
     end_time = time.time()
 
     cost = total_cost(containers)
     n_used = count_used_trucks(containers)
     running_time = end_time - start_time
 
-    return N, K, n_used, cost, running_time, boxes
+    return N, K, n_used, cost, running_time, boxes, bound
 
 
-def write_output(output_path, N, K, cost, running_time, boxes):
-    with open(output_path, "w") as f:
-        for b in sorted(boxes, key=lambda x: x.ID):
-            f.write(f"{b.ID} {b.truck} {b.x} {b.y} {int(b.rotation)}\n")
-        f.write(f"{N} {K} {cost} {running_time:.6f}\n")
+def write_output(output_path, N, K, cost, running_time, boxes, binary=False):
+    # format cả lời giải một lần rồi ghi một lần (binary=True: file .npz, xem serialize.py)
+    write_solution(output_path, placements_array(boxes), f"{N} {K} {cost} {running_time:.6f}", binary)
 
 
 # ===================== MAIN =====================
@@ -247,18 +257,15 @@ def main():
     test_dir = os.path.join(base_dir, "Test_case")
     output_base = os.path.dirname(os.path.abspath(__file__))
 
-    results = []
-
-    phases = [
-        (1, 1, 40),
-        (2, 0, 59),
-        (3, 0, 59)
-    ]
+    # mỗi test xong là ghi ngay một dòng CSV: sweep bị ngắt vẫn giữ kết quả
+    csv_path = os.path.join(output_base, "result_RGLS.csv")
+    results = CsvAppender(csv_path, ['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time', 'lower_bound', 'gap'])
 
-    for phase, start, end in phases:
-        for test_num in range(start, end + 1):
+    # phase / test lấy từ các file có trong Test_case/, instance đọc từ corpus đóng gói
+    for phase, corpus in open_all(test_dir):
+        for test_num, instance in corpus:
             test_str = f"{test_num:02d}"
-            input_path = os.path.join(test_dir, f"Phase_{phase}", f"input{test_str}.txt")
+            input_path = corpus.path(test_num)
             output_path = os.path.join(output_base, f"Phase_{phase}", f"output{test_str}.txt")
 
             if not os.path.exists(input_path):
@@ -268,12 +275,14 @@ def main():
                     'n_trucks': 'N/A',
                     'n_trucks_used': 'N/A',
                     'cost': 'N/A',
-                    'running_time': 'N/A'
+                    'running_time': 'N/A',
+                    'lower_bound': 'N/A',
+                    'gap': 'N/A'
                 })
                 continue
 
             try:
-                N, K, n_used, cost, running_time, boxes = solve_single(input_path, iters=100, destroy_rate=0.3)
+                N, K, n_used, cost, running_time, boxes, bound = solve_single(input_path, iters=100, destroy_rate=0.3, instance=instance)
                 write_output(output_path, N, K, cost, running_time, boxes)
                 
                 results.append({
@@ -281,7 +290,9 @@ def main():
                     'n_trucks': K,
                     'n_trucks_used': n_used,
                     'cost': cost,
-                    'running_time': f"{running_time:.6f}"
+                    'running_time': f"{running_time:.6f}",
+                    'lower_bound': bound,
+                    'gap': f"{gap(cost, bound):.4f}"
                 })
                 print(f"Phase {phase} - Test {test_str}: Cost={cost}, Time={running_time:.6f}s")
             except Exception as e:
@@ -291,16 +302,12 @@ def main():
                     'n_trucks': 'N/A',
                     'n_trucks_used': 'N/A',
                     'cost': 'N/A',
-                    'running_time': 'N/A'
+                    'running_time': 'N/A',
+                    'lower_bound': 'N/A',
+                    'gap': 'N/A'
                 })
 
-    # Write CSV
-    csv_path = os.path.join(output_base, "result_RGLS.csv")
-    with open(csv_path, 'w', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time'])
-        writer.writeheader()
-        writer.writerows(results)
-    
+    results.close()
     print(f"\nResults saved to {csv_path}")
 
 
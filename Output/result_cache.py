@@ -0,0 +1,117 @@
+import os
+import json
+import hashlib
+
+# Cache kết quả nằm trong Output/.result_cache/
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".result_cache")
+
+
+def instance_digest(instance):
+    """Hash nội dung của instance (mảng items, trucks), không phụ thuộc tên file"""
+    h = hashlib.blake2b(digest_size=16)
+    for array in (instance.items, instance.trucks):
+        h.update(str(array.shape).encode())
+        h.update(array.astype("<i8").tobytes())
+    return h.hexdigest()
+
+
+def code_version(paths):
+    """Hash nội dung các file mã nguồn (thứ tự đường dẫn không ảnh hưởng)"""
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(set(paths)):
+        with open(path, "rb") as f:
+            h.update(os.path.basename(path).encode())
+            h.update(f.read())
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Cache kết quả trên đĩa, địa chỉ theo nội dung: khoá là hash của
+    (instance, thuật toán, tham số, seed, phiên bản mã). Mỗi entry gồm
+    <key>.out (nội dung file output) và <key>.json (dòng CSV); file json ghi
+    sau cùng nên entry có json là entry đầy đủ.
+
+    Khi tổng dung lượng vượt max_bytes, evict() xoá các entry dùng lâu nhất
+    (mtime được cập nhật mỗi lần get trúng). Chỉ một process (process cha của
+    sweep) đọc / ghi cache.
+    """
+
+    def __init__(self, root=CACHE_DIR, max_bytes=512 * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(digest, algo, params, seed, code):
+        payload = json.dumps([digest, algo, params, seed, code], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _paths(self, key):
+        folder = os.path.join(self.root, key[:2])
+        return os.path.join(folder, key + ".json"), os.path.join(folder, key + ".out")
+
+    def get(self, key):
+        """(row, output bytes) hoặc None"""
+        meta, out = self._paths(key)
+        try:
+            with open(meta) as f:
+                row = json.load(f)
+            with open(out, "rb") as f:
+                output = f.read()
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        for path in (meta, out):
+            os.utime(path)  # LRU
+        self.hits += 1
+        return row, output
+
+    def put(self, key, row, output):
+        meta, out = self._paths(key)
+        os.makedirs(os.path.dirname(meta), exist_ok=True)
+        for path, data, mode in ((out, output, "wb"), (meta, json.dumps(row), "w")):
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+    def entries(self):
+        """[(mtime, size, key)] của các entry đầy đủ"""
+        found = []
+        for folder in os.listdir(self.root):
+            path = os.path.join(self.root, folder)
+            if not os.path.isdir(path):
+                continue
+            for name in os.listdir(path):
+                if name.endswith(".json"):
+                    key = name[:-len(".json")]
+                    meta, out = self._paths(key)
+                    try:
+                        size = os.path.getsize(meta) + os.path.getsize(out)
+                        found.append((os.path.getmtime(meta), size, key))
+                    except OSError:
+                        continue
+        return found
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Xoá các entry cũ nhất tới khi tổng dung lượng <= max_bytes, trả về số entry đã xoá"""
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, key in entries:
+            if total <= self.max_bytes:
+                break
+            for path in self._paths(key):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,291 @@
+import os
+import sys
+import csv
+import time
+import random
+import signal
+import argparse
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = os.path.join(BASE_DIR, "Test_case")
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+HEURISTIC_DIR = os.path.join(BASE_DIR, "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from bounds import lower_bound, gap
+from corpus import Corpus, discover
+from serialize import write_solution, CsvAppender
+from result_cache import ResultCache, instance_digest, code_version
+
+# algo -> file harness (trong OUTPUT_DIR)
+HARNESSES = {
+    "Greedy": os.path.join("Output-Greedy", "GenOutput_Greedy.py"),
+    "RGLS": os.path.join("Output-RGLS", "GenOutput_RGLS.py"),
+    "CBGLS": os.path.join("Output-CBGLS", "GenOutput_CBGLS.py"),
+    "CP": os.path.join("Output-CP", "GenOutput-CP.py"),
+}
+
+FIELDNAMES = ['n_items', 'n_trucks', 'n_trucks_used', 'cost', 'running_time', 'lower_bound', 'gap']
+NA_ROW = {k: 'N/A' for k in FIELDNAMES}
+
+_modules = {}  # harness đã load trong process worker
+_corpora = {}  # phase -> Corpus (memmap) đã mở trong process worker
+
+
+class CaseTimeout(Exception):
+    pass
+
+
+def _on_alarm(signum, frame):
+    raise CaseTimeout()
+
+
+def load_harness(algo):
+    """Load GenOutput_*.py như module (tên file CP có dấu '-' nên không import thẳng được)"""
+    if algo not in _modules:
+        path = os.path.join(OUTPUT_DIR, HARNESSES[algo])
+        spec = importlib.util.spec_from_file_location(f"genoutput_{algo.lower()}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _modules[algo] = module
+    return _modules[algo]
+
+
+def harness_version(algo):
+    """
+    Phiên bản mã của một harness: hash của file harness và mọi module của
+    repo mà nó import (heuristic/, Solver/...). Sửa một solver chỉ làm đổi
+    phiên bản của các harness dùng nó.
+    """
+    module = load_harness(algo)
+    others = {m.__name__ for a, m in _modules.items() if a != algo}
+    paths = [module.__file__]
+    for name, m in list(sys.modules.items()):
+        path = getattr(m, "__file__", None)
+        if name in others or not path or not path.endswith(".py"):
+            continue
+        path = os.path.abspath(path)
+        if path.startswith(BASE_DIR + os.sep) and path != os.path.abspath(__file__):
+            paths.append(path)
+    return code_version(paths)
+
+
+def output_path_of(algo, phase, test_num, binary=False):
+    return os.path.join(OUTPUT_DIR, os.path.dirname(HARNESSES[algo]),
+                        f"Phase_{phase}", f"output{test_num:02d}.{'npz' if binary else 'txt'}")
+
+
+def load_instance(phase, test_num):
+    """View của test trong corpus đóng gói (run_all đã đóng gói trước khi mở pool)"""
+    if phase not in _corpora:
+        _corpora[phase] = Corpus(TEST_DIR, phase, build=False)
+    return _corpora[phase].get(test_num)
+
+
+# ===================== SOLVE =====================
+
+def run_heuristic(module, input_path, output_path, instance=None, binary=False):
+    N, K, n_used, cost, running_time, boxes, bound = module.solve_single(input_path, instance=instance)
+    module.write_output(output_path, N, K, cost, running_time, boxes, binary)
+    return {
+        'n_items': N,
+        'n_trucks': K,
+        'n_trucks_used': n_used,
+        'cost': cost,
+        'running_time': f"{running_time:.6f}",
+        'lower_bound': bound,
+        'gap': f"{gap(cost, bound):.4f}"
+    }
+
+
+def run_cp(module, input_path, output_path, time_limit, cp_workers=0, instance=None, binary=False, seed=0):
+    start_time = time.time()
+    config = module.SolverConfig(time_limit, workers=cp_workers, seed=seed)
+    solver = module.BinPackingSolver(input_path, config=config, instance=instance)
+    result = solver.solve()
+    execution_time = time.time() - start_time
+
+    summary = f"{solver.n_bins} {solver.n_packs} {solver.minCost} {execution_time}"
+    if binary and result != "F":
+        write_solution(output_path, result.split(), summary, binary=True)
+    else:
+        with open(output_path, "w") as output_file:
+            output_file.write(result if result == "F" else f"{result}\n{summary}")
+
+    if result == "F":
+        return dict(NA_ROW)
+    n_used = len({line.split()[1] for line in result.split('\n')})
+    bound = lower_bound([p[:2] for p in solver.packs], solver.bins)
+    return {
+        'n_items': solver.n_packs,
+        'n_trucks': solver.n_bins,
+        'n_trucks_used': n_used,
+        'cost': solver.minCost,
+        'running_time': execution_time,
+        'lower_bound': bound,
+        'gap': f"{gap(solver.minCost, bound):.4f}"
+    }
+
+
+def run_case(algo, phase, test_num, timeout=None, cp_time_limit=300, cp_workers=0, binary=False, seed=0):
+    """
+    Giải một test trong process worker, ghi output{NN}.txt và trả về dòng CSV.
+    Quá timeout (giây) thì bỏ test đó (ghi N/A) nhưng worker vẫn chạy tiếp.
+    binary=True: lời giải ghi ở dạng nhị phân output{NN}.npz (serialize.py).
+    seed: seed của random trước mỗi test (heuristic) hoặc của CP-SAT, để kết quả lặp lại được.
+    """
+    test_str = f"{test_num:02d}"
+    input_path = os.path.join(TEST_DIR, f"Phase_{phase}", f"input{test_str}.txt")
+    output_path = output_path_of(algo, phase, test_num, binary)
+
+    if not os.path.exists(input_path):
+        return dict(NA_ROW), f"Skip: {input_path} not found"
+
+    module = load_harness(algo)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+    if timeout:
+        # CP-SAT chạy trong C++ nên không bị alarm ngắt: giới hạn bằng time limit
+        cp_time_limit = min(cp_time_limit, timeout)
+        signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        instance = load_instance(phase, test_num)  # file input lỗi: ValueError, ghi N/A như lỗi khi giải
+        if algo == "CP":
+            row = run_cp(module, input_path, output_path, cp_time_limit, cp_workers, instance, binary, seed)
+        else:
+            random.seed(seed)
+            row = run_heuristic(module, input_path, output_path, instance, binary)
+        message = f"Phase {phase} - Test {test_str}: Cost={row['cost']}, Time={row['running_time']}s"
+    except CaseTimeout:
+        row, message = dict(NA_ROW), f"Timeout Phase {phase} - Test {test_str} (> {timeout}s)"
+    except (Exception, SystemExit) as e:
+        row, message = dict(NA_ROW), f"Error Phase {phase} - Test {test_str}: {e}"
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return row, message
+
+
+# ===================== MAIN =====================
+
+def run_all(algo, workers=None, timeout=None, cp_time_limit=300, cp_workers=None, binary=False,
+            seed=0, cache=None, resume=False):
+    """
+    Chạy toàn bộ test song song, ghi result_{algo}.csv theo đúng thứ tự test.
+    cp_workers: số luồng CP-SAT mỗi test, mặc định chia đều số core cho các worker.
+    Trong lúc chạy, mỗi test xong được ghi ngay vào result_{algo}.partial.csv
+    (thứ tự hoàn thành, có cột phase / test): bị ngắt giữa chừng vẫn còn kết quả.
+    resume=True: các test đã có trong file partial của lần chạy trước được giữ, không chạy lại.
+    cache: ResultCache; test nào trúng cache (cùng instance, thuật toán, tham số,
+    seed và mã nguồn) thì chép lại output đã lưu thay vì giải. Cache chỉ lưu
+    test giải xong (không lưu N/A), running_time là thời gian của lần giải đã lưu.
+    """
+    # phase / test lấy từ Test_case/; đóng gói corpus ở đây để các worker chỉ việc mở memmap
+    phases = discover(TEST_DIR)
+    corpora = {phase: Corpus(TEST_DIR, phase) for phase, _ in phases}
+    cases = [(phase, t) for phase, tests in phases for t in tests]
+    if cp_workers is None:
+        cp_workers = max(1, (os.cpu_count() or 1) // (workers or os.cpu_count() or 1))
+    results = {}
+    csv_path = os.path.join(OUTPUT_DIR, os.path.dirname(HARNESSES[algo]), f"result_{algo}.csv")
+    partial_path = csv_path[:-len(".csv")] + ".partial.csv"
+
+    # tham số ảnh hưởng tới kết quả (timeout chỉ gây N/A, không được cache)
+    params = {'binary': binary}
+    if algo == "CP":
+        params.update(time_limit=min(cp_time_limit, timeout) if timeout else cp_time_limit, cp_workers=cp_workers)
+    version = harness_version(algo) if cache is not None else None
+    keys = {}
+
+    with CsvAppender(partial_path, ['phase', 'test'] + FIELDNAMES, resume=resume) as partial:
+        for row in partial.rows() if resume else []:
+            case = (int(row.pop('phase')), int(row.pop('test')))
+            # test lỗi / quá thời gian (N/A) thì chạy lại
+            if case[1] in corpora.get(case[0], ()) and row['cost'] != 'N/A':
+                results[case] = row
+        if results:
+            print(f"Resume: {len(results)} tests from {partial_path}")
+
+        todo = []
+        for phase, t in cases:
+            if (phase, t) in results:
+                continue
+            # file input lỗi thì không có nội dung để làm khoá cache: để worker ghi N/A
+            if cache is not None and corpora[phase].valid(t):
+                keys[phase, t] = cache.key(instance_digest(corpora[phase].get(t)), algo, params, seed, version)
+                hit = cache.get(keys[phase, t])
+                if hit is not None:
+                    row, output = hit
+                    output_path = output_path_of(algo, phase, t, binary)
+                    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+                    with open(output_path, "wb") as f:
+                        f.write(output)
+                    results[phase, t] = row
+                    partial.append({'phase': phase, 'test': t, **row})
+                    print(f"Cached Phase {phase} - Test {t:02d}: Cost={row['cost']}")
+                    continue
+            todo.append((phase, t))
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(run_case, algo, phase, t, timeout, cp_time_limit, cp_workers, binary, seed): (phase, t)
+                for phase, t in todo
+            }
+            for future in as_completed(futures):
+                row, message = future.result()
+                phase, t = futures[future]
+                results[phase, t] = row
+                partial.append({'phase': phase, 'test': t, **row})
+                if (phase, t) in keys and row['cost'] != 'N/A':
+                    with open(output_path_of(algo, phase, t, binary), "rb") as f:
+                        cache.put(keys[phase, t], row, f.read())
+                print(message)
+
+    with open(csv_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(results[case] for case in cases)
+    os.remove(partial_path)
+
+    if cache is not None:
+        removed = cache.evict()
+        print(f"Cache: {cache.hits} hits, {cache.misses} misses" + (f", {removed} entries evicted" if removed else ""))
+    print(f"\nResults saved to {csv_path}")
+    return csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a GenOutput harness over all test cases in parallel")
+    parser.add_argument("algo", choices=sorted(HARNESSES))
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="per-instance time limit in seconds (default: none)")
+    parser.add_argument("--cp-time-limit", type=int, default=300,
+                        help="CP-SAT time limit per instance (default: 300)")
+    parser.add_argument("--cp-workers", type=int, default=None,
+                        help="CP-SAT threads per instance (default: cores / workers)")
+    parser.add_argument("--binary", action="store_true",
+                        help="write solutions as compact output<NN>.npz instead of text")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed of every test (default: 0)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="solve every test, do not read or write the result cache")
+    parser.add_argument("--cache-size", type=int, default=512,
+                        help="result cache size limit in MB, oldest entries are evicted (default: 512)")
+    parser.add_argument("--resume", action="store_true",
+                        help="keep the tests already in result_<algo>.partial.csv of an interrupted run")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else ResultCache(max_bytes=args.cache_size * 1024 * 1024)
+    run_all(args.algo, args.workers, args.timeout, args.cp_time_limit, args.cp_workers, args.binary,
+            args.seed, cache, args.resume)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+import os
+import re
+import sys
+import csv
+import bisect
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = os.path.join(BASE_DIR, "Test_case")
+OUTPUT_DIR = os.path.dirname(os.path.abspath(__file__))
+HEURISTIC_DIR = os.path.join(BASE_DIR, "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from corpus import Corpus, discover
+from serialize import read_solution
+
+OUTPUT_NAME = re.compile(r"output(\d+)\.(txt|npz)$")
+
+_corpora = {}  # phase -> Corpus đã mở trong process worker
+
+
+def find_overlap(rects):
+    """
+    Sweep-line theo x trên các hình chữ nhật (truck, x0, y0, x1, y1):
+    trả về cặp chỉ số (a, b) chồng nhau đầu tiên, hoặc None.
+
+    Sự kiện sắp xếp theo (truck, x, loại) với "rời" trước "vào", nên hai hình
+    chỉ chạm cạnh không tính là chồng. Các hình đang mở đều cắt đường quét
+    nên phải rời nhau theo y: danh sách y0 của chúng đã sắp xếp, hình mới chỉ
+    cần so với hình có y0 lớn nhất mà < y1 của nó (bisect), O(n log n).
+    """
+    rects = np.asarray(rects, dtype=np.int64).reshape(-1, 5)
+    # hình rỗng không chồng lên gì
+    idx = np.nonzero((rects[:, 3] > rects[:, 1]) & (rects[:, 4] > rects[:, 2]))[0]
+    m = len(idx)
+    if m < 2:
+        return None
+    # loại sự kiện: 0 = rời (x1), 1 = vào (x0)
+    truck = np.concatenate((rects[idx, 0], rects[idx, 0]))
+    x = np.concatenate((rects[idx, 3], rects[idx, 1]))
+    kind = np.concatenate((np.zeros(m, np.int64), np.ones(m, np.int64)))
+    who = np.concatenate((idx, idx))
+    order = np.lexsort((kind, x, truck))
+
+    y0, y1 = rects[:, 2].tolist(), rects[:, 4].tolist()
+    current, starts, owners = None, [], []
+    for e_truck, e_kind, e_who in zip(truck[order].tolist(), kind[order].tolist(), who[order].tolist()):
+        if e_truck != current:
+            current, starts, owners = e_truck, [], []
+        if e_kind == 0:
+            # các hình đang mở rời nhau theo y nên y0 không trùng
+            pos = bisect.bisect_left(starts, y0[e_who])
+            del starts[pos], owners[pos]
+            continue
+        pos = bisect.bisect_left(starts, y1[e_who])
+        if pos > 0 and y1[owners[pos - 1]] > y0[e_who]:
+            return owners[pos - 1], e_who
+        starts.insert(pos, y0[e_who])
+        owners.insert(pos, e_who)
+    return None
+
+
+def check_solution(items, trucks, rows, summary=None):
+    """
+    Các vi phạm của lời giải rows (n, 5) = [item, truck, x, y, rot] (1-based)
+    cho instance items (n, 2), trucks (k, 3): mỗi item đúng một lần, truck
+    hợp lệ, nằm trong thùng, không chồng nhau, cost ở dòng summary (số thứ 3)
+    đúng. Trả về (danh sách vi phạm, cost tính lại).
+    """
+    items = np.asarray(items, dtype=np.int64).reshape(-1, 2)
+    trucks = np.asarray(trucks, dtype=np.int64).reshape(-1, 3)
+    rows = np.asarray(rows, dtype=np.int64).reshape(-1, 5)
+    n, k = len(items), len(trucks)
+    errors = []
+
+    item, truck, x, y, rot = rows.T
+    if len(rows) != n:
+        errors.append(f"{len(rows)} rows for {n} items")
+    bad_item = (item < 1) | (item > n)
+    if bad_item.any():
+        errors.append(f"item id out of range: {item[bad_item][:5].tolist()}")
+    counts = np.bincount(item[~bad_item] - 1, minlength=n)
+    if (counts != 1).any():
+        errors.append(f"items not placed exactly once: {(np.nonzero(counts != 1)[0][:5] + 1).tolist()}")
+    bad_truck = (truck < 1) | (truck > k)
+    if bad_truck.any():
+        errors.append(f"truck id out of range: {truck[bad_truck][:5].tolist()}")
+    bad_rot = (rot != 0) & (rot != 1)
+    if bad_rot.any():
+        errors.append(f"rotation not 0/1 for items {item[bad_rot][:5].tolist()}")
+    ok = ~(bad_item | bad_truck | bad_rot)
+    if not ok.all():
+        rows, item, truck, x, y, rot = rows[ok], item[ok], truck[ok], x[ok], y[ok], rot[ok]
+
+    size = items[item - 1]
+    w = np.where(rot == 1, size[:, 1], size[:, 0])
+    h = np.where(rot == 1, size[:, 0], size[:, 1])
+    W, H = trucks[truck - 1, 0], trucks[truck - 1, 1]
+    outside = (x < 0) | (y < 0) | (x + w > W) | (y + h > H)
+    if outside.any():
+        errors.append(f"items outside their truck: {item[outside][:5].tolist()}")
+
+    pair = find_overlap(np.stack((truck, x, y, x + w, y + h), axis=1))
+    if pair is not None:
+        a, b = pair
+        errors.append(f"items {item[a]} and {item[b]} overlap in truck {truck[a]}")
+
+    cost = int(trucks[np.unique(truck) - 1, 2].sum()) if len(truck) else 0
+    if summary is not None:
+        fields = summary.split()
+        if len(fields) >= 3 and fields[2].lstrip("-").isdigit() and int(fields[2]) != cost:
+            errors.append(f"reported cost {fields[2]} != {cost}")
+    return errors, cost
+
+
+def validate_file(phase, test, output_path):
+    """(output_path, vi phạm, cost) của một file output; cost None nếu lời giải là "F" """
+    if phase not in _corpora:
+        _corpora[phase] = Corpus(TEST_DIR, phase, build=False)
+    corpus = _corpora[phase]
+    if test not in corpus:
+        return output_path, [f"no input{test:02d}.txt in Phase_{phase}"], None
+    with open(output_path, "rb") as f:
+        head = f.read(2)
+    if head.strip() == b"F":
+        return output_path, [], None
+    try:
+        rows, summary = read_solution(output_path)
+    except (ValueError, OSError) as e:
+        return output_path, [f"unreadable: {e}"], None
+    try:
+        instance = corpus.get(test)
+    except ValueError as e:
+        return output_path, [f"input unreadable: {e}"], None
+    errors, cost = check_solution(instance.items, instance.trucks, rows, summary)
+    return output_path, errors, cost
+
+
+def output_files(directory):
+    """[(phase, test, path)] của các file output trong Output-*/Phase_*/ dưới directory"""
+    found = []
+    for root, _, files in os.walk(directory):
+        match = re.search(r"Phase_(\d+)$", root)
+        if match is None:
+            continue
+        for name in files:
+            m = OUTPUT_NAME.match(name)
+            if m:
+                found.append((int(match.group(1)), int(m.group(1)), os.path.join(root, name)))
+    return sorted(found)
+
+
+def check_csv(directory, costs):
+    """
+    So cột cost của result_*.csv trong directory với cost tính lại từ output.
+    Dòng CSV theo thứ tự test như run_parallel ghi; dòng N/A bỏ qua.
+    """
+    errors = []
+    cases = [(phase, t) for phase, tests in discover(TEST_DIR) for t in tests]
+    for name in sorted(os.listdir(directory)):
+        if not (name.startswith("result_") and name.endswith(".csv")) or name.endswith(".partial.csv"):
+            continue
+        with open(os.path.join(directory, name), newline="") as f:
+            rows = list(csv.DictReader(f))
+        if len(rows) != len(cases):
+            errors.append(f"{name}: {len(rows)} rows for {len(cases)} tests")
+            continue
+        for (phase, t), row in zip(cases, rows):
+            if row.get("cost", "N/A") == "N/A" or (phase, t) not in costs:
+                continue
+            if costs[phase, t] is not None and str(costs[phase, t]) != row["cost"]:
+                errors.append(f"{name}: Phase {phase} - Test {t:02d} cost {row['cost']} != output {costs[phase, t]}")
+    return errors
+
+
+def validate(directories, workers=None, csv_check=True):
+    """
+    Kiểm tra mọi file output trong các thư mục (song song theo file).
+    Trả về {đường dẫn: vi phạm} của các file sai (rỗng nếu tất cả hợp lệ).
+    """
+    for phase, _ in discover(TEST_DIR):
+        Corpus(TEST_DIR, phase)  # đóng gói trước để worker chỉ mở memmap
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for directory in directories:
+            files = output_files(directory)
+            checked = pool.map(validate_file, *zip(*files)) if files else []
+            costs = {}
+            infeasible = 0
+            for (phase, t, _), (path, errors, cost) in zip(files, checked):
+                costs[phase, t] = cost
+                infeasible += cost is None and not errors
+                if errors:
+                    failures[path] = errors
+            if csv_check:
+                for error in check_csv(directory, costs):
+                    failures.setdefault(os.path.join(directory, "result.csv"), []).append(error)
+            bad = sum(1 for path in failures if path.startswith(directory + os.sep))
+            print(f"{os.path.relpath(directory, BASE_DIR)}: {len(files)} files, {bad} invalid, {infeasible} F")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check every solution file against its instance")
+    parser.add_argument("dirs", nargs="*",
+                        help="output directories (default: every Output/Output-*)")
+    parser.add_argument("-j", "--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--no-csv", action="store_true",
+                        help="do not compare the cost column of result_*.csv")
+    args = parser.parse_args()
+
+    dirs = [os.path.abspath(d) for d in args.dirs] or sorted(
+        os.path.join(OUTPUT_DIR, d) for d in os.listdir(OUTPUT_DIR) if d.startswith("Output-"))
+    failures = validate(dirs, args.workers, not args.no_csv)
+    for path, errors in sorted(failures.items()):
+        for error in errors:
+            print(f"INVALID {os.path.relpath(path, BASE_DIR)}: {error}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
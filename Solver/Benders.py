@@ -0,0 +1,274 @@
+### Logic-based Benders decomposition - Group 9
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Dict, Optional
+from ortools.sat.python import cp_model
+
+# The lower bounds are shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from warm_start import warm_start as heuristic_start
+from CP_model import Input, pack_single_truck
+from solver_config import SolverConfig
+from Matheuristic import PackingCache
+from bounds import lower_bound
+
+
+def infeasible_core(items: List[Tuple[int, int]], W: int, H: int, config: SolverConfig) -> List[int]:
+    """
+    Deletion filter: drops the items of an infeasible set one by one (smallest
+    first) as long as the rest still provably does not fit in W x H.
+    Returns the indices of the items kept, a minimal infeasible subset.
+    """
+    keep = list(range(len(items)))
+    for i in sorted(keep, key=lambda i: items[i][0] * items[i][1]):
+        trial = [k for k in keep if k != i]
+        if trial and pack_single_truck([items[k] for k in trial], W, H, config=config)[0] == cp_model.INFEASIBLE:
+            keep = trial
+    return keep
+
+
+class LogicBenders:
+    """
+    Two-phase exact solver: truck selection / assignment, then 2D packing.
+
+    Master (CP-SAT): X[i, j] = item i in truck j, Z[j] = truck j used,
+    minimize the cost of the used trucks under relaxed packing constraints:
+    - area: the items of a truck have at most its area,
+    - dimension: items wider than W / 2 in every orientation that fits all
+      cross the vertical middle line of the truck, so they are stacked and
+      their heights sum to at most H (and the same with W and H swapped).
+    Subproblems: the items the master puts in each used truck are packed by
+    pack_single_truck from CP_model.py. The trucks are independent, so the
+    subproblems of one round are solved in parallel processes.
+    An infeasible set is first shrunk to a minimal infeasible subset S
+    (infeasible_core), which gives the no-good cut
+        sum(X[i, j'] for i in S) <= |S| - 1
+    for j and every truck j' no larger than j (the items rotate, so W x H and
+    H x W are the same truck).
+    The master optimum is a lower bound, the first master solution whose
+    trucks all pack is optimal.
+    """
+
+    def __init__(self, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]],
+                 cache: Optional[PackingCache] = None):
+        self.items = items
+        self.trucks = trucks
+        self.cache = cache or PackingCache(SolverConfig(10, workers=1))
+        self.lower_bound = 0
+        self.iterations = 0
+        self.cuts = 0
+        self.optimal = False
+        self.infeasible = False
+        # a subproblem that timed out is cut as if infeasible: the result is then not proven
+        self.proven = True
+
+        # fits[j]: items that fit in truck j in some orientation
+        self.fits = [
+            [i for i, (w, h) in enumerate(items) if (w <= W and h <= H) or (h <= W and w <= H)]
+            for W, H, _ in trucks
+        ]
+
+    def _smaller_trucks(self, j: int) -> List[int]:
+        """Trucks where anything that does not fit in truck j does not fit either"""
+        W, H = self.trucks[j][0], self.trucks[j][1]
+        return [u for u, (Wu, Hu, _) in enumerate(self.trucks) if (Wu <= W and Hu <= H) or (Wu <= H and Hu <= W)]
+
+    def _stacked(self, j: int, i: int) -> Tuple[int, int]:
+        """
+        (height, width) item i needs in the stacks of truck j: its smallest
+        height if it is wider than W / 2 in every orientation that fits, and
+        its smallest width if it is longer than H / 2 in every one (0 otherwise)
+        """
+        W, H = self.trucks[j][0], self.trucks[j][1]
+        w, h = self.items[i]
+        orientations = [(wo, ho) for wo, ho in ((w, h), (h, w)) if wo <= W and ho <= H]
+        height = min(ho for _, ho in orientations) if all(2 * wo > W for wo, _ in orientations) else 0
+        width = min(wo for wo, _ in orientations) if all(2 * ho > H for _, ho in orientations) else 0
+        return height, width
+
+    def solve(self, config: Optional[SolverConfig] = None, processes: Optional[int] = None) -> List[str]:
+        """
+        Solves the master and the subproblems until the master solution packs.
+
+        Args:
+            config (SolverConfig, optional): Parameters of the master, the time limit is
+                                             for the whole decomposition. Defaults to 300s.
+            processes (int, optional): Processes of the subproblems. Defaults to the number of CPUs,
+                                       1 solves them in this process.
+
+        Returns:
+            List[str]: A list of strings representing the solution for each item.
+                       Returns ["F"] if the instance is proven infeasible (by bounds.py, or
+                       a master proven INFEASIBLE under proven cuts only), and [] if the
+                       time ran out before any solution.
+        """
+        start_time = time.time()
+        config = config or SolverConfig(300)
+        items, trucks = self.items, self.trucks
+        n, k = len(items), len(trucks)
+        try:
+            self.lower_bound = lower_bound(items, trucks)
+        except ValueError:
+            # an item fits in no truck, or the trucks are too small in total
+            self.infeasible = True
+            return ["F"]
+
+        # Incumbent: greedy packing (the master only has to beat it)
+        start = heuristic_start(items, trucks, "greedy")
+        incumbent = None
+        if start is not None:
+            placements, cost = start
+            incumbent = cost
+
+        model = cp_model.CpModel()
+        X: Dict[Tuple[int, int], cp_model.IntVar] = {}
+        Z = [model.NewBoolVar(f'Z_{j}') for j in range(k)]
+        for j in range(k):
+            for i in self.fits[j]:
+                X[i, j] = model.NewBoolVar(f'X_{i}_{j}')
+                model.AddImplication(X[i, j], Z[j])
+        of_item: List[List[int]] = [[] for _ in range(n)]
+        for i, j in X:
+            of_item[i].append(j)
+        for i in range(n):
+            model.AddExactlyOne(X[i, j] for j in of_item[i])
+
+        for j, (W, H, _) in enumerate(trucks):
+            # a used truck holds an item
+            model.AddBoolOr([X[i, j] for i in self.fits[j]] + [Z[j].Not()])
+            model.Add(sum(items[i][0] * items[i][1] * X[i, j] for i in self.fits[j]) <= W * H * Z[j])
+            stacked = [(i, self._stacked(j, i)) for i in self.fits[j]]
+            heights = [(i, hs) for i, (hs, _) in stacked if hs]
+            widths = [(i, ws) for i, (_, ws) in stacked if ws]
+            if len(heights) > 1:
+                model.Add(sum(hs * X[i, j] for i, hs in heights) <= H)
+            if len(widths) > 1:
+                model.Add(sum(ws * X[i, j] for i, ws in widths) <= W)
+
+        cost = sum(trucks[j][2] * Z[j] for j in range(k))
+        model.Add(cost >= self.lower_bound)
+        if incumbent is not None:
+            model.Add(cost <= incumbent - 1)
+            for i, (j, _, _, _) in enumerate(placements):
+                model.AddHint(X[i, j], 1)
+            used = {j for j, _, _, _ in placements}
+            for j in range(k):
+                model.AddHint(Z[j], int(j in used))
+        model.Minimize(cost)
+
+        executor = None
+        processes = processes or os.cpu_count() or 1
+        if processes > 1:
+            executor = ProcessPoolExecutor(processes)
+        try:
+            while True:
+                remaining = None if config.time_limit is None else config.time_limit - (time.time() - start_time)
+                if remaining is not None and remaining <= 0:
+                    break
+                master = SolverConfig(remaining, config.workers, config.relative_gap, config.seed, config.log)
+                solver = master.cp_solver()
+                status = master.solve_cp(solver, model)
+                self.iterations += 1
+                if status == cp_model.INFEASIBLE:
+                    if incumbent is None:
+                        # no assignment packs at all (if every cut came from a proof)
+                        self.infeasible = self.proven
+                        break
+                    # no assignment beats the incumbent
+                    self.lower_bound = max(self.lower_bound, incumbent)
+                    self.optimal = self.proven
+                    break
+                if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                    break
+                if status == cp_model.OPTIMAL:
+                    self.lower_bound = max(self.lower_bound, round(solver.ObjectiveValue()))
+
+                loads: Dict[int, List[int]] = {}
+                for (i, j), var in X.items():
+                    if solver.Value(var):
+                        loads.setdefault(j, []).append(i)
+                model.ClearHints()
+                for (i, j), var in X.items():
+                    model.AddHint(var, solver.Value(var))
+                for j in range(k):
+                    model.AddHint(Z[j], solver.Value(Z[j]))
+
+                order = list(loads)
+                results = self.cache.pack_all(
+                    [([items[i] for i in loads[j]], trucks[j][0], trucks[j][1], None) for j in order], executor)
+                failed = [(j, sub_status) for j, (sub_status, sub_placements) in zip(order, results)
+                          if sub_placements is None]
+                packed = not failed
+                # a time-out is cut with the whole set, a proof of infeasibility with its core
+                infeasible = [j for j, sub_status in failed if sub_status == cp_model.INFEASIBLE]
+                if len(infeasible) < len(failed):
+                    self.proven = False
+                args = [([items[i] for i in loads[j]], trucks[j][0], trucks[j][1], self.cache.config) for j in infeasible]
+                if executor is None:
+                    cores = [infeasible_core(*a) for a in args]
+                else:
+                    cores = list(executor.map(infeasible_core, *zip(*args))) if args else []
+                groups = {j: loads[j] for j, _ in failed}
+                for j, core in zip(infeasible, cores):
+                    groups[j] = [loads[j][c] for c in core]
+                for j, group in groups.items():
+                    for u in self._smaller_trucks(j):
+                        if all((i, u) in X for i in group):
+                            model.Add(sum(X[i, u] for i in group) <= len(group) - 1)
+                            self.cuts += 1
+
+                if packed:
+                    placements = [None] * n
+                    for j, (_, sub_placements) in zip(order, results):
+                        for i, (x, y, rot) in zip(loads[j], sub_placements):
+                            placements[i] = (j, x, y, rot)
+                    incumbent = sum(trucks[j][2] for j in loads)
+                    if status == cp_model.OPTIMAL:
+                        self.optimal = self.proven
+                        break
+                    model.Add(cost <= incumbent - 1)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        if incumbent is None:
+            return ["F"] if self.infeasible else []
+        return [f"{i + 1} {j + 1} {x} {y} {rot}" for i, (j, x, y, rot) in enumerate(placements)]
+
+
+def main():
+    """
+    Main entry point of the script.
+    Reads input, solves the bin packing problem, and prints results.
+    """
+    try:
+        n_items, n_trucks, items, trucks = Input()
+        # Let time_limit = 300s, --time-limit= / --workers= / --gap= / --seed= / --log for the master,
+        # --truck-time-limit= for each subproblem (default 10s), --processes= for the subproblems (default: all CPUs)
+        config = SolverConfig.from_argv(sys.argv[1:], time_limit=300)
+        options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+        truck_config = SolverConfig(float(options.get("truck-time-limit", 10)), workers=1, seed=config.seed)
+        processes = int(options["processes"]) if "processes" in options else None
+        model = LogicBenders(items, trucks, PackingCache(truck_config))
+        solution = model.solve(config, processes)
+
+        if solution == ["F"]:
+            print("F")
+        elif not solution:
+            print("Error: no solution found within the time limit")
+        else:
+            for item_solution in solution:
+                print(item_solution)
+
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,20 @@
 ### CP model - Group 9
 
-from typing import List, Tuple, Dict
+import os
+import sys
+from typing import List, Tuple, Dict, Optional
 from ortools.sat.python import cp_model
 
+# The instance parser is shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from warm_start import warm_start as heuristic_start
+from instance import read_stdin
+from presolve import Presolve
+from solver_config import SolverConfig
+
 def Input():
     """
     Reads input data from stdin and returns it in a structured format.
@@ -12,30 +24,11 @@ def Input():
         A tuple containing: number of items, number of trucks, 
         list of item dimensions, list of truck dimensions and costs
     """
-    try:
-
-        # Parse first line for number of items and trucks
-        n_items, n_trucks = map(int, input().split())
-
-        # Parse item dimensions
-        items = [
-            tuple(map(int, input().split())) 
-            for i in range(n_items)
-        ]
-
-        # Parse truck dimensions and costs
-        trucks = [
-            tuple(map(int, input().split())) 
-            for i in range(n_trucks)
-        ]
-
-        return n_items, n_trucks, items, trucks
+    # one bulk parse of stdin (heuristic/instance.py), raises ValueError on a bad format
+    return read_stdin().as_tuple()
 
-    except (ValueError, IndexError) as e:
-        raise ValueError(f"Invalid input format: {e}")
 
-
-def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]], time_limit: int = 300) -> List[str]:
+def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]], time_limit: int = 300, warm_start: Optional[str] = None, config: Optional[SolverConfig] = None) -> List[str]:
     """
     Solves the bin packing problem using Constraint Programming.
     
@@ -45,6 +38,10 @@ def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[T
         items (List[Tuple[int, int]]): List of item dimensions (width, length).
         trucks (List[Tuple[int, int, int]]): List of truck dimensions (width, length, cost).
         time_limit (int, optional): Maximum solving time in seconds. Defaults to 300.
+        warm_start (str, optional): Heuristic ("greedy" or "rgls") whose packing is given as a
+                                    hint, with its cost as an objective cutoff. Defaults to None.
+        config (SolverConfig, optional): Workers, time limit, gap, seed, log and solution
+                                         callback. Overrides time_limit. Defaults to None.
     
     Returns:
         List[str]: A list of strings representing the solution for each item. 
@@ -53,14 +50,19 @@ def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[T
     max_width = max(truck[0] for truck in trucks)
     max_height = max(truck[1] for truck in trucks)
 
+    # Item-truck compatibility and symmetry breaking between identical trucks
+    pre = Presolve(items, trucks)
+    if not pre.feasible():
+        return ["F"]
+
     model = cp_model.CpModel()
 
     # Placement and rotation variables
-    X = {}  # Item placement in trucks
+    X = {}  # Item placement in trucks (only trucks the item may go in)
     R = []  # Item rotation flags
     for i in range(n_items):
         R.append(model.NewBoolVar(f'item_{i}_rotated'))
-        for j in range(n_trucks):
+        for j in pre.allowed[i]:
             X[i, j] = model.NewBoolVar(f'item_{i}_in_truck_{j}')
 
     # Truck usage tracking
@@ -82,16 +84,21 @@ def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[T
     # Pack placement constraints
     for i in range(n_items):
         # Each item must be in exactly one truck
-        model.Add(sum(X[i, j] for j in range(n_trucks)) == 1)
+        model.Add(sum(X[i, j] for j in pre.allowed[i]) == 1)
 
         # Item must fit in the truck it's placed in
-        for j in range(n_trucks):
+        for j in pre.allowed[i]:
             model.Add(r[i] <= trucks[j][0]).OnlyEnforceIf(X[i, j])
             model.Add(t[i] <= trucks[j][1]).OnlyEnforceIf(X[i, j])
 
     # Non-overlap constraints
     for i in range(n_items):
         for k in range(i + 1, n_items):
+            # Only trucks both items may go in
+            shared = pre.common(i, k)
+            if not shared:
+                continue
+
             a1 = model.NewBoolVar('a1')
             model.Add(r[i] <= l[k]).OnlyEnforceIf(a1)
             model.Add(r[i] > l[k]).OnlyEnforceIf(a1.Not())
@@ -109,39 +116,286 @@ def CP(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[T
             model.Add(t[k] > b[i]).OnlyEnforceIf(a4.Not())
 
             # Ensure items in the same truck do not overlap
-            for j in range(n_trucks):
+            for j in shared:
                 model.AddBoolOr(a1, a2, a3, a4).OnlyEnforceIf(X[i, j], X[k, j])
 
     # Truck usage tracking
+    in_truck = [[] for _ in range(n_trucks)]
+    for (i, j), x in X.items():
+        in_truck[j].append(x)
     for j in range(n_trucks):
+        if not in_truck[j]:
+            model.Add(Z[j] == 0)
+            continue
         b1 = model.NewBoolVar('b')
-        model.Add(sum(X[i, j] for i in range(n_items)) == 0).OnlyEnforceIf(b1)
+        model.Add(sum(in_truck[j]) == 0).OnlyEnforceIf(b1)
         model.Add(Z[j] == 0).OnlyEnforceIf(b1)
-        model.Add(sum(X[i, j] for i in range(n_items)) != 0).OnlyEnforceIf(b1.Not())
+        model.Add(sum(in_truck[j]) != 0).OnlyEnforceIf(b1.Not())
         model.Add(Z[j] == 1).OnlyEnforceIf(b1.Not())
+
+    # Identical / dominating trucks are used first
+    for a, c in pre.usage_pairs:
+        model.Add(Z[a] >= Z[c])
         
     # Set objective: minimize truck usage cost
     cost = sum(Z[j] * trucks[j][2] for j in range(n_trucks))
     model.Minimize(cost)
 
+    # Warm start: hint a heuristic packing, only accept solutions at least as good
+    start = heuristic_start(items, trucks, warm_start) if warm_start is not None else None
+    if start is not None:
+        placements, start_cost = start
+        placements = pre.relabel(placements)
+        for i, (ji, x, y, rot) in enumerate(placements):
+            w, h = (items[i][1], items[i][0]) if rot else items[i]
+            for j in pre.allowed[i]:
+                model.AddHint(X[i, j], j == ji)
+            model.AddHint(R[i], rot)
+            model.AddHint(l[i], x)
+            model.AddHint(b[i], y)
+            model.AddHint(r[i], x + w)
+            model.AddHint(t[i], y + h)
+        used = {ji for ji, _, _, _ in placements}
+        for j in range(n_trucks):
+            model.AddHint(Z[j], j in used)
+        model.Add(cost <= start_cost)
+
     # Solve the model
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = time_limit
-    status = solver.Solve(model)
+    config = config or SolverConfig(time_limit)
+    solver = config.cp_solver()
+    status = config.solve_cp(solver, model)
 
     if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         results = []
         for i in range(n_items):
-            for j in range(n_trucks):
+            for j in pre.allowed[i]:
                 if solver.Value(X[i, j]) == 1:
                     truck_placement = j + 1
                     break
             results.append(f"{i + 1} {truck_placement} {solver.Value(l[i])} {solver.Value(b[i])} {solver.Value(R[i])}")
         return results
+    elif start is not None:
+        # No solution within the time limit: the heuristic packing is still valid
+        return [f"{i + 1} {j + 1} {x} {y} {rot}" for i, (j, x, y, rot) in enumerate(start[0])]
     else:
         return ["F"]
 
 
+def CP_intervals(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]], time_limit: int = 300, warm_start: Optional[str] = None, config: Optional[SolverConfig] = None) -> List[str]:
+    """
+    Solves the bin packing problem using optional interval variables.
+
+    Each (item, truck, orientation) that fits gets a pair of optional x/y
+    intervals; the orientations of an item are alternatives, so at most one
+    pair is present. Non-overlap is one AddNoOverlap2D per truck instead of
+    reified inequalities for every item pair.
+
+    Args:
+        n_items (int): Number of items to pack.
+        n_trucks (int): Number of trucks (bins).
+        items (List[Tuple[int, int]]): List of item dimensions (width, length).
+        trucks (List[Tuple[int, int, int]]): List of truck dimensions (width, length, cost).
+        time_limit (int, optional): Maximum solving time in seconds. Defaults to 300.
+        warm_start (str, optional): Heuristic ("greedy" or "rgls") whose packing is given as a
+                                    hint, with its cost as an objective cutoff. Defaults to None.
+        config (SolverConfig, optional): Workers, time limit, gap, seed, log and solution
+                                         callback. Overrides time_limit. Defaults to None.
+
+    Returns:
+        List[str]: A list of strings representing the solution for each item.
+                   Returns ["F"] if no feasible solution.
+    """
+    max_width = max(truck[0] for truck in trucks)
+    max_height = max(truck[1] for truck in trucks)
+
+    # Item-truck compatibility and symmetry breaking between identical trucks
+    pre = Presolve(items, trucks)
+    if not pre.feasible():
+        return ["F"]
+
+    model = cp_model.CpModel()
+
+    # Coordinate variables, shared by every truck (an item is in exactly one)
+    l = [model.NewIntVar(0, max_width, f'l_{i}') for i in range(n_items)]
+    b = [model.NewIntVar(0, max_height, f'b_{i}') for i in range(n_items)]
+
+    # Truck usage tracking
+    Z = [model.NewBoolVar(f'truck_{j}_is_used') for j in range(n_trucks)]
+
+    X = {}  # X[i, j]: item i in truck j (only for trucks the item may go in)
+    P = {}  # P[i, j, o]: item i in truck j with orientation o (1 = rotated)
+    x_intervals = [[] for _ in range(n_trucks)]
+    y_intervals = [[] for _ in range(n_trucks)]
+    areas = [[] for _ in range(n_trucks)]
+
+    for i in range(n_items):
+        w, h = items[i]
+        # A square item has a single orientation
+        orientations = [(0, w, h)] if w == h else [(0, w, h), (1, h, w)]
+
+        for j in pre.allowed[i]:
+            W, H = trucks[j][0], trucks[j][1]
+            fits = [(o, wo, ho) for o, wo, ho in orientations if wo <= W and ho <= H]
+
+            X[i, j] = model.NewBoolVar(f'item_{i}_in_truck_{j}')
+            alternatives = []
+            for o, wo, ho in fits:
+                p = model.NewBoolVar(f'item_{i}_in_truck_{j}_rot_{o}')
+                P[i, j, o] = p
+                alternatives.append(p)
+
+                # Item must fit in the truck it's placed in
+                model.Add(l[i] <= W - wo).OnlyEnforceIf(p)
+                model.Add(b[i] <= H - ho).OnlyEnforceIf(p)
+
+                x_intervals[j].append(model.NewOptionalFixedSizeIntervalVar(
+                    l[i], wo, p, f'x_{i}_{j}_{o}'))
+                y_intervals[j].append(model.NewOptionalFixedSizeIntervalVar(
+                    b[i], ho, p, f'y_{i}_{j}_{o}'))
+
+            # Exactly one orientation if the item is in this truck
+            model.Add(sum(alternatives) == X[i, j])
+            model.AddImplication(X[i, j], Z[j])
+            areas[j].append(w * h * X[i, j])
+
+        # Each item must be in exactly one truck
+        model.AddExactlyOne(X[i, j] for j in pre.allowed[i])
+
+    for j in range(n_trucks):
+        if not x_intervals[j]:
+            model.Add(Z[j] == 0)
+            continue
+        # Items in the same truck do not overlap
+        model.AddNoOverlap2D(x_intervals[j], y_intervals[j])
+        # Redundant area cut, strengthens the linear relaxation
+        model.Add(sum(areas[j]) <= trucks[j][0] * trucks[j][1] * Z[j])
+
+    # Identical / dominating trucks are used first
+    for a, c in pre.usage_pairs:
+        model.Add(Z[a] >= Z[c])
+
+    # Set objective: minimize truck usage cost
+    cost = sum(Z[j] * trucks[j][2] for j in range(n_trucks))
+    model.Minimize(cost)
+
+    # Warm start: hint a heuristic packing, only accept solutions at least as good
+    start = heuristic_start(items, trucks, warm_start) if warm_start is not None else None
+    if start is not None:
+        placements, start_cost = start
+        placements = pre.relabel(placements)
+        for i, (ji, x, y, rot) in enumerate(placements):
+            # A square item only has the unrotated alternative
+            o = rot if (i, ji, rot) in P else 1 - rot
+            for j in pre.allowed[i]:
+                model.AddHint(X[i, j], j == ji)
+                for oo in (0, 1):
+                    if (i, j, oo) in P:
+                        model.AddHint(P[i, j, oo], j == ji and oo == o)
+            model.AddHint(l[i], x)
+            model.AddHint(b[i], y)
+        used = {ji for ji, _, _, _ in placements}
+        for j in range(n_trucks):
+            model.AddHint(Z[j], j in used)
+        model.Add(cost <= start_cost)
+
+    # Solve the model
+    config = config or SolverConfig(time_limit)
+    solver = config.cp_solver()
+    status = config.solve_cp(solver, model)
+
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        results = []
+        for i in range(n_items):
+            for j in range(n_trucks):
+                if (i, j) in X and solver.Value(X[i, j]) == 1:
+                    truck_placement = j + 1
+                    rotated = int((i, j, 1) in P and solver.Value(P[i, j, 1]) == 1)
+                    break
+            results.append(f"{i + 1} {truck_placement} {solver.Value(l[i])} {solver.Value(b[i])} {rotated}")
+        return results
+    elif start is not None:
+        # No solution within the time limit: the heuristic packing is still valid
+        return [f"{i + 1} {j + 1} {x} {y} {rot}" for i, (j, x, y, rot) in enumerate(start[0])]
+    else:
+        return ["F"]
+
+
+def pack_single_truck(items: List[Tuple[int, int]], W: int, H: int, hint: Optional[List[Tuple[int, int, int]]] = None,
+                      config: Optional[SolverConfig] = None) -> Tuple[int, Optional[List[Tuple[int, int, int]]]]:
+    """
+    Checks whether the items fit together in one W x H truck and packs them.
+
+    A pure feasibility model: one AddNoOverlap2D over optional fixed-size
+    intervals (one pair per orientation that fits). Items of the same size
+    are interchangeable, so they are ordered by x.
+
+    Args:
+        items (List[Tuple[int, int]]): List of item dimensions (width, length).
+        W (int), H (int): Truck dimensions.
+        hint (List[Tuple[int, int, int]], optional): Known (x, y, rotated) per item. Defaults to None.
+        config (SolverConfig, optional): Search parameters. Defaults to 10s and 1 worker.
+
+    Returns:
+        Tuple[int, Optional[List[Tuple[int, int, int]]]]: (status, placements) where
+        placements[i] = (x, y, rotated) if status is OPTIMAL / FEASIBLE, else None.
+        INFEASIBLE means the items provably do not fit, UNKNOWN that the time limit was hit.
+    """
+    if sum(w * h for w, h in items) > W * H:
+        return cp_model.INFEASIBLE, None
+
+    model = cp_model.CpModel()
+    l = [model.NewIntVar(0, W, f'l_{i}') for i in range(len(items))]
+    b = [model.NewIntVar(0, H, f'b_{i}') for i in range(len(items))]
+    P = {}  # P[i, o]: item i with orientation o (1 = rotated)
+    x_intervals, y_intervals = [], []
+
+    for i, (w, h) in enumerate(items):
+        # A square item has a single orientation
+        orientations = [(0, w, h)] if w == h else [(0, w, h), (1, h, w)]
+        fits = [(o, wo, ho) for o, wo, ho in orientations if wo <= W and ho <= H]
+        if not fits:
+            return cp_model.INFEASIBLE, None
+
+        for o, wo, ho in fits:
+            p = model.NewBoolVar(f'item_{i}_rot_{o}')
+            P[i, o] = p
+            model.Add(l[i] <= W - wo).OnlyEnforceIf(p)
+            model.Add(b[i] <= H - ho).OnlyEnforceIf(p)
+            x_intervals.append(model.NewOptionalFixedSizeIntervalVar(l[i], wo, p, f'x_{i}_{o}'))
+            y_intervals.append(model.NewOptionalFixedSizeIntervalVar(b[i], ho, p, f'y_{i}_{o}'))
+        model.AddExactlyOne(P[i, o] for o, _, _ in fits)
+
+    model.AddNoOverlap2D(x_intervals, y_intervals)
+
+    # Items of the same size (up to rotation) can be swapped: order them by x
+    by_size: Dict[Tuple[int, int], List[int]] = {}
+    for i, (w, h) in enumerate(items):
+        by_size.setdefault((min(w, h), max(w, h)), []).append(i)
+    for same in by_size.values():
+        for i, k in zip(same, same[1:]):
+            model.Add(l[i] <= l[k])
+
+    if hint is not None:
+        for i, (x, y, rot) in enumerate(hint):
+            # A square item only has the unrotated alternative
+            o = rot if (i, rot) in P else 1 - rot
+            model.AddHint(l[i], x)
+            model.AddHint(b[i], y)
+            for oo in (0, 1):
+                if (i, oo) in P:
+                    model.AddHint(P[i, oo], oo == o)
+
+    config = config or SolverConfig(10, workers=1)
+    solver = config.cp_solver()
+    status = config.solve_cp(solver, model)
+
+    if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        placements = [(solver.Value(l[i]), solver.Value(b[i]), int((i, 1) in P and solver.Value(P[i, 1]) == 1))
+                      for i in range(len(items))]
+        return status, placements
+    return status, None
+
+
 def main():
     """
     Main entry point of the script.
@@ -149,8 +403,13 @@ def main():
     """
     try:
         n_items, n_trucks, items, trucks = Input()
-        # Let time_limit = 600s
-        solution = CP(n_items, n_trucks, items, trucks, 600)
+        # --intervals: use the interval / AddNoOverlap2D model
+        model = CP_intervals if "--intervals" in sys.argv[1:] else CP
+        # --warm-start=greedy|rgls: hint the packing of a heuristic
+        warm_start = next((arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--warm-start=")), None)
+        # Let time_limit = 600s, --time-limit= / --workers= / --gap= / --seed= / --log to change the search
+        config = SolverConfig.from_argv(sys.argv[1:], time_limit=600)
+        solution = model(n_items, n_trucks, items, trucks, config.time_limit, warm_start, config)
 
         if solution == ["F"]:
             print("F")
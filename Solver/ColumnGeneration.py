@@ -0,0 +1,295 @@
+### Column generation model - Group 9
+
+import os
+import sys
+import math
+import time
+from typing import List, Tuple, Dict, Optional
+from ortools.linear_solver import pywraplp
+
+# MaxRects and the lower bounds are shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from warm_start import warm_start as heuristic_start
+from CP_model import Input
+from solver_config import SolverConfig
+from maxrects import MaxRects
+from bounds import lower_bound
+
+EPS = 1e-6
+
+# (truck, ((item, x, y, rotated), ...)): a set of items packed in one truck
+Pattern = Tuple[int, Tuple[Tuple[int, int, int, int], ...]]
+
+
+class ColumnGeneration:
+    """
+    Set-cover formulation over patterns, solved by column generation.
+
+    Master LP: min sum(cost_j * lambda_p) such that every item is covered by
+    at least one chosen pattern and every truck is used by at most one.
+    Each item also has an artificial column that covers it alone at a cost
+    above any solution (the sum of all truck costs), so the restricted
+    master is feasible before the first pattern is found.
+    Pricing: for each truck, the MaxRects greedy packer of heuristic/ fills
+    the truck with items of high dual value per unit of area; the packing it
+    finds is the column, so every pattern is feasible by construction.
+
+    Greedy pricing is not exact, so the LP value is not a bound by itself.
+    The bound is Lagrangian instead: for the item duals pi >= 0,
+        sum(pi_i) + sum_j min(0, cost_j - UB_j(pi))
+    is a valid lower bound, where UB_j(pi) is the fractional knapsack of the
+    duals into the area of truck j (an upper bound on any pattern of truck j).
+    """
+
+    def __init__(self, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]]):
+        self.items = items
+        self.trucks = trucks
+        self.patterns: List[Pattern] = []
+        self._seen = set()
+        self.lp_value = None
+        self.lower_bound = 0
+        self.iterations = 0
+
+        # fits[j]: items that fit in truck j in some orientation
+        self.fits = [
+            [i for i, (w, h) in enumerate(items) if (w <= W and h <= H) or (h <= W and w <= H)]
+            for W, H, _ in trucks
+        ]
+
+    def add_pattern(self, j: int, placed: List[Tuple[int, int, int, int]]) -> bool:
+        """Adds a column, False if the truck already has a pattern with these items"""
+        key = (j, frozenset(i for i, _, _, _ in placed))
+        if not placed or key in self._seen:
+            return False
+        self._seen.add(key)
+        self.patterns.append((j, tuple(placed)))
+        return True
+
+    def greedy_pack(self, j: int, order: List[int]) -> List[Tuple[int, int, int, int]]:
+        """Puts the items in truck j in the given order wherever MaxRects finds room"""
+        W, H = self.trucks[j][0], self.trucks[j][1]
+        space = MaxRects(W, H)
+        free_area = W * H
+        placed = []
+        for i in order:
+            w, h = self.items[i]
+            if w * h > free_area:
+                continue
+            spot = space.find(w, h)
+            if spot is None:
+                continue
+            x, y, rot = spot
+            space.add(x, y, *((h, w) if rot else (w, h)))
+            free_area -= w * h
+            placed.append((i, x, y, int(rot)))
+        return placed
+
+    def knapsack_bound(self, j: int, pi: List[float]) -> float:
+        """Fractional knapsack of the duals into the area of truck j"""
+        capacity = self.trucks[j][0] * self.trucks[j][1]
+        value = 0.0
+        for i in sorted((i for i in self.fits[j] if pi[i] > EPS),
+                        key=lambda i: -pi[i] / (self.items[i][0] * self.items[i][1])):
+            area = self.items[i][0] * self.items[i][1]
+            if area >= capacity:
+                return value + pi[i] * capacity / area
+            value += pi[i]
+            capacity -= area
+        return value
+
+    def solve(self, max_iters: int = 200, time_limit: float = 300, config: Optional[SolverConfig] = None) -> List[str]:
+        """
+        Column generation, then a set-cover MIP (SCIP) over the columns found.
+
+        Args:
+            max_iters (int, optional): Pricing rounds. Defaults to 200.
+            time_limit (float, optional): Time limit of the column generation in seconds. Defaults to 300.
+            config (SolverConfig, optional): Parameters of the final MIP. Defaults to 60s.
+
+        Returns:
+            List[str]: A list of strings representing the solution for each item.
+                       Returns ["F"] if the instance is proven infeasible (bounds.py),
+                       and [] if no solution was found.
+        """
+        start_time = time.time()
+        items, trucks = self.items, self.trucks
+        n, k = len(items), len(trucks)
+        try:
+            self.lower_bound = lower_bound(items, trucks)
+        except ValueError:
+            return ["F"]  # an item fits in no truck, or the trucks are too small in total
+
+        # Initial columns: the loads of a greedy packing when there is one
+        # (a feasible cover), the artificial columns keep the LP feasible otherwise
+        placements, incumbent = None, math.inf
+        start = heuristic_start(items, trucks, "greedy")
+        if start is not None:
+            placements, incumbent = start
+            loads: Dict[int, List[Tuple[int, int, int, int]]] = {}
+            for i, (j, x, y, rot) in enumerate(placements):
+                loads.setdefault(j, []).append((i, x, y, rot))
+            for j, placed in loads.items():
+                self.add_pattern(j, placed)
+
+        # Master LP
+        lp = pywraplp.Solver.CreateSolver('GLOP')
+        cover = [lp.Constraint(1, lp.infinity(), f'cover_{i}') for i in range(n)]
+        once = [lp.Constraint(-lp.infinity(), 1, f'once_{j}') for j in range(k)]
+        lp.Objective().SetMinimization()
+        artificial_cost = sum(cost for _, _, cost in trucks) + 1
+        for i in range(n):
+            var = lp.NumVar(0, lp.infinity(), f'a_{i}')
+            lp.Objective().SetCoefficient(var, artificial_cost)
+            cover[i].SetCoefficient(var, 1)
+        columns = []
+
+        while self.iterations < max_iters and time.time() - start_time < time_limit:
+            # Columns added since the last round
+            for j, placed in self.patterns[len(columns):]:
+                var = lp.NumVar(0, lp.infinity(), f'p_{len(columns)}')
+                lp.Objective().SetCoefficient(var, trucks[j][2])
+                once[j].SetCoefficient(var, 1)
+                for i, _, _, _ in placed:
+                    cover[i].SetCoefficient(var, 1)
+                columns.append(var)
+
+            if lp.Solve() != pywraplp.Solver.OPTIMAL:
+                break
+            self.iterations += 1
+            self.lp_value = lp.Objective().Value()
+            pi = [max(0.0, c.dual_value()) for c in cover]
+            mu = [min(0.0, c.dual_value()) for c in once]
+
+            # Lagrangian bound, and pricing only where a negative column may exist
+            lagrangian = sum(pi)
+            new = 0
+            for j in range(k):
+                best = trucks[j][2] - self.knapsack_bound(j, pi)
+                lagrangian += min(0.0, best)
+                if best - mu[j] >= -EPS:
+                    continue  # no pattern of truck j has a negative reduced cost
+                candidates = [i for i in self.fits[j] if pi[i] > EPS]
+                by_density = sorted(candidates, key=lambda i: -pi[i] / (items[i][0] * items[i][1]))
+                by_value = sorted(candidates, key=lambda i: -pi[i])
+                for order in (by_density, by_value):
+                    placed = self.greedy_pack(j, order)
+                    if trucks[j][2] - sum(pi[i] for i, _, _, _ in placed) - mu[j] < -EPS:
+                        new += self.add_pattern(j, placed)
+            self.lower_bound = max(self.lower_bound, math.ceil(lagrangian - EPS))
+
+            if new == 0 or self.lower_bound >= incumbent:
+                break
+
+        if self.lp_value is not None:
+            rounded = self._round([var.solution_value() for var in columns])
+            if rounded is not None and rounded[1] < incumbent:
+                placements, incumbent = rounded
+        if placements is not None and self.lower_bound >= incumbent:
+            return [f"{i + 1} {j + 1} {x} {y} {rot}" for i, (j, x, y, rot) in enumerate(placements)]
+        return self._integer_solution(incumbent, placements, config or SolverConfig(60))
+
+    def _round(self, values: List[float]) -> Optional[Tuple[List[Tuple[int, int, int, int]], int]]:
+        """
+        LP rounding: disjoint patterns by decreasing lambda, the items left over
+        go to the unused trucks by the greedy heuristic. None if they do not fit.
+        """
+        n = len(self.items)
+        placements: List[Optional[Tuple[int, int, int, int]]] = [None] * n
+        used = set()
+        for p in sorted((p for p in range(len(values)) if values[p] > EPS), key=lambda p: -values[p]):
+            j, placed = self.patterns[p]
+            if j in used or any(placements[i] is not None for i, _, _, _ in placed):
+                continue
+            used.add(j)
+            for i, x, y, rot in placed:
+                placements[i] = (j, x, y, rot)
+
+        left = [i for i in range(n) if placements[i] is None]
+        if left:
+            free = [j for j in range(len(self.trucks)) if j not in used]
+            rest = heuristic_start([self.items[i] for i in left], [self.trucks[j] for j in free], "greedy") if free else None
+            if rest is None:
+                return None
+            for i, (j, x, y, rot) in zip(left, rest[0]):
+                placements[i] = (free[j], x, y, rot)
+        cost = sum(self.trucks[j][2] for j in {j for j, _, _, _ in placements})
+        return placements, cost
+
+    def _integer_solution(self, incumbent, placements, config: SolverConfig) -> List[str]:
+        """
+        Set-cover MIP over the columns; an item covered twice stays in one of its patterns.
+        placements is the incumbent packing, None if there is none yet (incumbent is then inf).
+        """
+        n, k = len(self.items), len(self.trucks)
+        solver = config.mip_solver('SCIP')
+        use = [solver.BoolVar(f'p_{p}') for p in range(len(self.patterns))]
+        covering: List[List[int]] = [[] for _ in range(n)]  # patterns holding item i
+        of_truck: List[List[int]] = [[] for _ in range(k)]  # patterns of truck j
+        for p, (j, placed) in enumerate(self.patterns):
+            of_truck[j].append(p)
+            for i, _, _, _ in placed:
+                covering[i].append(p)
+        for i in range(n):
+            solver.Add(sum(use[p] for p in covering[i]) >= 1)
+        for j in range(k):
+            if of_truck[j]:
+                solver.Add(sum(use[p] for p in of_truck[j]) <= 1)
+        solver.Minimize(sum(self.trucks[j][2] * use[p] for p, (j, _) in enumerate(self.patterns)))
+        if placements is not None:
+            solver.Add(sum(self.trucks[j][2] * use[p] for p, (j, _) in enumerate(self.patterns)) <= incumbent)
+
+            # Hint: the patterns of the incumbent, when they are columns
+            loads: Dict[int, set] = {}
+            for i, (j, _, _, _) in enumerate(placements):
+                loads.setdefault(j, set()).add(i)
+            incumbent_keys = {(j, frozenset(group)) for j, group in loads.items()}
+            solver.SetHint(use, [float((j, frozenset(i for i, _, _, _ in placed)) in incumbent_keys)
+                                 for j, placed in self.patterns])
+
+        status = config.solve_mip(solver)
+        if status not in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+            if placements is None:
+                return []  # the columns found hold no cover, which proves nothing
+            # the incumbent (greedy packing or LP rounding) is feasible
+            return [f"{i + 1} {j + 1} {x} {y} {rot}" for i, (j, x, y, rot) in enumerate(placements)]
+
+        # Removing items from a packed truck keeps it feasible
+        result: Dict[int, str] = {}
+        for p, (j, placed) in enumerate(self.patterns):
+            if use[p].solution_value() > 0.5:
+                for i, x, y, rot in placed:
+                    result.setdefault(i, f"{i + 1} {j + 1} {x} {y} {rot}")
+        return [result[i] for i in range(n)]
+
+
+def main():
+    """
+    Main entry point of the script.
+    Reads input, solves the bin packing problem, and prints results.
+    """
+    try:
+        n_items, n_trucks, items, trucks = Input()
+        # --time-limit= / --workers= / --gap= / --seed= / --log for the final MIP (default 60s),
+        # --cg-time-limit= / --iters= for the column generation (default 300s / 200 rounds)
+        config = SolverConfig.from_argv(sys.argv[1:], time_limit=60)
+        options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+        model = ColumnGeneration(items, trucks)
+        solution = model.solve(int(options.get("iters", 200)), float(options.get("cg-time-limit", 300)), config)
+
+        if solution == ["F"]:
+            print("F")
+        elif not solution:
+            print("Error: no solution found")
+        else:
+            for item_solution in solution:
+                print(item_solution)
+
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
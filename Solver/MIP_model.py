@@ -1,178 +1,233 @@
-### MIP model - Group 9
-
-from ortools.linear_solver import pywraplp
-
-# function to get input data from user (type through console)
-def input_data():
-    n, k = (int(x) for x in input().split())
-    data = {}
-    data['size_item'] = []  # 'size_item': [[w0, h0], [w1, h1], ...]
-    data['size_truck'] = [] # 'size_truck': [[W0, H0], [W1, H1], ...]
-    data['cost'] = []       # 'cost': [c0, c1, ...]
-    
-    for i in range(n):
-        w, h = (int(x) for x in input().split())
-        data['size_item'].append([w, h])
-        # w = data['size_item'][i][0]
-        # h = data['size_item'][i][1]
-
-    for j in range(k):
-        w, h, c = (int(x) for x in input().split())
-        data['size_truck'].append([w, h])
-        data['cost'].append(c)
-
-    W_truck = [data['size_truck'][i][0] for i in range(k)]
-    H_truck = [data['size_truck'][i][1] for i in range(k)]
-    return n, k, data, W_truck, H_truck
-
-    
-# MAIN SOLVER 
-def process_test_case(n, k, data, W_truck, H_truck):
-
-    max_W = max(W_truck)    
-    max_H = max(H_truck)    
-
-    # Create Solver
-    solver = pywraplp.Solver.CreateSolver('SCIP')
-
-    # Create variables
-    M = 1000000 
-
-    X = {}  # X[(i,j)] = 1 if item i is packed in truck j else 0
-    o = {}  # if o = 1 then rotation = 90 degree, else 0
-    Z = {}  # equals 1 if truck j is used; otherwise, 0
-    l = {}  # left coordinate of item
-    b = {}  # bottom coodinate of item
-    r = {}  # right coordinate of item
-    t = {}  # top coordinate of item
-    e = {}  # e[(i, j, k)] equals 1 if both item i and item j are placed in truck k, otherwise 0
-    p1 = {} # p1[(i, j, k)] equals 1 if item i is on the left of item j when in truck k, otherwise 0.
-    p2 = {} # p2[(i, j, k)] equals 1 if item i is on the right of item j when in truck k, otherwise 0.
-    p3 = {} # p3[(i, j, k)] equals 1 if item i is under item j when in truck k, otherwise 0.
-    p4 = {} # p4[(i, j, k)] equals 1 if item i is on the top of item j when in truck k, otherwise 0.
-
-
-    for i in range(n):
-        # coordinate and orientation of item i 
-        o[i] = solver.IntVar(0, 1, 'o[%i]' % i)
-        l[i] = solver.IntVar(0, max_W, 'l[%i]' % i)
-        r[i] = solver.IntVar(0, max_W, 'r[%i]' % i)
-        t[i] = solver.IntVar(0, max_H, 't[%i]' % i)
-        b[i] = solver.IntVar(0, max_H, 'b[%i]' % i)
-
-        # ri = li + wi · (1 − Oi) + hi · Oi
-        # ti = bi + hi · (1 − Oi) + wi · Oi
-        solver.Add(r[i] == l[i] + (1 - o[i]) * data['size_item'][i][0] + o[i] * data['size_item'][i][1])
-        solver.Add(t[i] == b[i] + (1 - o[i]) * data['size_item'][i][1] + o[i] * data['size_item'][i][0])
-
-        for m in range(k):
-            X[(i, m)] = solver.IntVar(0, 1, 'X_[%i]_[%i]' % (i, m)) # Xij
-
-            # item i must not exceed area of truck
-            # ri ≤ Wj + M · (1 − Xij)
-            # ti ≤ Hj + M · (1 − Xij)
-            solver.Add(r[i] <= (1 - X[(i, m)]) * M + W_truck[m])
-            solver.Add(t[i] <= (1 - X[(i, m)]) * M + H_truck[m])
-
-    # each item must be packed in 1 truck
-    for i in range(n):
-        solver.Add(sum(X[(i, m)] for m in range(k)) == 1) # iterate through k trucks, we get the sum of Xij = 1
-
-    # if 2 items are packed in the same truck, they must not overlap
-    for i in range(n - 1):
-        for j in range(i + 1, n):
-            for m in range(k):
-                e[(i, j, m)] = solver.IntVar(0, 1, f'e[{i}][{j}][{m}]')
-                solver.Add(e[(i, j, m)] >= X[(i, m)] + X[(j, m)] - 1)
-                solver.Add(e[(i, j, m)] <= X[(i, m)])
-                solver.Add(e[(i, j, m)] <= X[(j, m)])
-
-                # Binary variables for each constraint
-                p1[(i, j, m)] = solver.IntVar(0, 1, f'p1[{i}][{j}][{m}]')
-                p2[(i, j, m)] = solver.IntVar(0, 1, f'p2[{i}][{j}][{m}]')
-                p3[(i, j, m)] = solver.IntVar(0, 1, f'p3[{i}][{j}][{m}]')
-                p4[(i, j, m)] = solver.IntVar(0, 1, f'p4[{i}][{j}][{m}]')
-
-                # Constraints that the binary variables must satisfy
-                solver.Add(r[i] <= l[j] + M * (1 - p1[(i, j, m)]))
-                solver.Add(r[j] <= l[i] + M * (1 - p2[(i, j, m)]))
-                solver.Add(t[i] <= b[j] + M * (1 - p3[(i, j, m)]))
-                solver.Add(t[j] <= b[i] + M * (1 - p4[(i, j, m)]))
-
-                solver.Add(p1[(i, j, m)] + p2[(i, j, m)] + p3[(i, j, m)] + p4[(i, j, m)] + (1 - e[(i, j, m)]) * M >= 1)
-                solver.Add(p1[(i, j, m)] + p2[(i, j, m)] + p3[(i, j, m)] + p4[(i, j, m)] <= e[(i, j, m)] * M)
-
-    # find trucks being used
-    for m in range(k):
-        Z[m] = solver.IntVar(0, 1, f'Z[{m}]')
-        # if sum(X[i][m]) >= 1 then truck m is used => Z[m] = 1
-        # else, Z[m] = 0
-
-        q = solver.IntVar(0, n, f'q[{m}]')
-        solver.Add(q == sum(X[(i, m)] for i in range(n)))
-        # truck m is used if there are at least 1 item packed in it, so sum(X[(i, m)] for i in range(n)) != 0
-
-        # q = 0 => Z[m] = 0
-        # q != 0 => Z[m] = 1
-        solver.Add(Z[m] <= q * M)
-        solver.Add(q <= Z[m] * M)
-
-    # objective
-    cost = sum(Z[m] * data['cost'][m] for m in range(k)) # sum of used trucks * trucks' cost
-    solver.Minimize(cost) # minimize that sum
-    # time_limit = 300*1000 # time is in milisecond
-    # solver.set_time_limit(int(time_limit))
-
-    #start_time = time.time()
-    status = solver.Solve()
-    #end_time = time.time()
-
-    if status == pywraplp.Solver.OPTIMAL or status == pywraplp.Solver.FEASIBLE:
-        result = []
-        for i in range(n):
-            item_result = [i + 1] # i: item digit 
-            for j in range(k):
-                if X[i, j].solution_value() == 1:
-                    item_result.append(j + 1)   # t[i]: truck j the item is put in 
-            item_result.append(int(l[i].solution_value()))  # x[i]: left coordinate == x
-            item_result.append(int(b[i].solution_value()))  # y[i]: bottom coordinate == y
-            item_result.append(int(o[i].solution_value()))  # o[i]: orientation of item
-            result.append(item_result)
-
-        # for analysis
-        #num_trucks_used = int(sum(used[m].solution_value() for m in range(k)))
-        #total_cost = solver.Objective().Value()
-        #running_time = end_time - start_time
-
-        # result is the output list (𝑖, 𝑡[𝑖], 𝑥[𝑖], 𝑦[𝑖], 𝑜[𝑖]) of the problem
-        return result    
-        #return result, n, k, num_trucks_used, total_cost, running_time  # n, k is for analysis
-    else:
-        return None
-
-
-n, k, data, W_truck, H_truck = input_data()
-#result, n, k, num_trucks_used, total_cost, running_time = process_test_case(n, k, data, W_truck, H_truck)
-result = process_test_case(n, k, data, W_truck, H_truck)
-
-# print(running_time)
-
-for res in result:
-    for i in res:
-        print(i, end=" ")
-    print()
-
-    # Process each test case in the folder
-    #for testcase_filename in os.listdir(testcase_folder):
-    #    testcase_path = os.path.join(testcase_folder, testcase_filename)
-    #    result, num_trucks_used, total_cost, running_time = process_test_case(testcase_path)
-#
-    #    if result is not None:
-    #        print(f"Test case {testcase_filename}:")
-    #         for item_result in result:
-    #            print(' '.join(map(str, item_result)))
-    #        print(f'Number of trucks used: {num_trucks_used}')
-    #        print(f'Total cost: {total_cost}')
-    #        print(f'Running time: {running_time:.4f} seconds')
-    #    else:
-    #        print(f"Test case {testcase_filename}: No feasible solution found")
+### MIP model - Group 9
+
+import os
+import sys
+from ortools.linear_solver import pywraplp
+
+# The instance parser is shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from warm_start import warm_start as heuristic_start
+from instance import read_stdin
+from presolve import Presolve
+from solver_config import SolverConfig
+
+# function to get input data from user (type through console)
+def input_data():
+    instance = read_stdin()  # one bulk parse of stdin (heuristic/instance.py)
+    n, k = instance.n, instance.k
+    data = {}
+    data['size_item'] = instance.items.tolist()      # 'size_item': [[w0, h0], [w1, h1], ...]
+    data['size_truck'] = instance.trucks[:, :2].tolist()  # 'size_truck': [[W0, H0], [W1, H1], ...]
+    data['cost'] = instance.trucks[:, 2].tolist()      # 'cost': [c0, c1, ...]
+
+    W_truck = [data['size_truck'][i][0] for i in range(k)]
+    H_truck = [data['size_truck'][i][1] for i in range(k)]
+    return n, k, data, W_truck, H_truck
+
+    
+# MAIN SOLVER 
+# warm_start: "greedy" / "rgls" to hint a heuristic packing and cut off worse solutions
+# config: SolverConfig (time limit, threads, gap, seed, log), 300s time limit by default
+def process_test_case(n, k, data, W_truck, H_truck, warm_start=None, config=None):
+
+    # item-truck compatibility and symmetry breaking between identical trucks
+    items = [tuple(size) for size in data['size_item']]
+    trucks = [(W_truck[m], H_truck[m], data['cost'][m]) for m in range(k)]
+    pre = Presolve(items, trucks)
+    if not pre.feasible():
+        return None
+
+    # Create Solver
+    config = config or SolverConfig()
+    solver = config.mip_solver('SCIP')
+
+    # Create variables
+    # No global M: every bound below is the tightest one the data gives
+    # (W_m / H_m of the trucks an item may go in, number of items)
+    W_max = [max(W_truck[m] for m in pre.allowed[i]) for i in range(n)]  # widest truck item i may go in
+    H_max = [max(H_truck[m] for m in pre.allowed[i]) for i in range(n)]  # tallest truck item i may go in
+
+    X = {}  # X[(i,j)] = 1 if item i is packed in truck j else 0 (only trucks item i may go in)
+    o = {}  # if o = 1 then rotation = 90 degree, else 0
+    Z = {}  # equals 1 if truck j is used; otherwise, 0
+    l = {}  # left coordinate of item
+    b = {}  # bottom coodinate of item
+    r = {}  # right coordinate of item
+    t = {}  # top coordinate of item
+    # relative position of a pair, shared by all trucks (only matters when both items are in the same truck)
+    p1 = {} # p1[(i, j)] equals 1 if item i is on the left of item j, otherwise 0.
+    p2 = {} # p2[(i, j)] equals 1 if item i is on the right of item j, otherwise 0.
+    p3 = {} # p3[(i, j)] equals 1 if item i is under item j, otherwise 0.
+    p4 = {} # p4[(i, j)] equals 1 if item i is on the top of item j, otherwise 0.
+
+
+    for i in range(n):
+        # coordinate and orientation of item i 
+        o[i] = solver.IntVar(0, 1, 'o[%i]' % i)
+        l[i] = solver.IntVar(0, W_max[i], 'l[%i]' % i)
+        r[i] = solver.IntVar(0, W_max[i], 'r[%i]' % i)
+        t[i] = solver.IntVar(0, H_max[i], 't[%i]' % i)
+        b[i] = solver.IntVar(0, H_max[i], 'b[%i]' % i)
+
+        # ri = li + wi · (1 − Oi) + hi · Oi
+        # ti = bi + hi · (1 − Oi) + wi · Oi
+        solver.Add(r[i] == l[i] + (1 - o[i]) * data['size_item'][i][0] + o[i] * data['size_item'][i][1])
+        solver.Add(t[i] == b[i] + (1 - o[i]) * data['size_item'][i][1] + o[i] * data['size_item'][i][0])
+
+        for m in pre.allowed[i]:
+            X[(i, m)] = solver.IntVar(0, 1, 'X_[%i]_[%i]' % (i, m)) # Xij
+
+    # each item must be packed in 1 truck
+    for i in range(n):
+        solver.Add(sum(X[(i, m)] for m in pre.allowed[i]) == 1) # iterate through allowed trucks, we get the sum of Xij = 1
+
+        # item i must not exceed area of truck
+        # exactly one Xij is 1, so the truck size is a linear expression (no M needed)
+        # ri ≤ sum(Wj · Xij)
+        # ti ≤ sum(Hj · Xij)
+        solver.Add(r[i] <= sum(W_truck[m] * X[(i, m)] for m in pre.allowed[i]))
+        solver.Add(t[i] <= sum(H_truck[m] * X[(i, m)] for m in pre.allowed[i]))
+
+    # if 2 items are packed in the same truck, they must not overlap
+    for i in range(n - 1):
+        for j in range(i + 1, n):
+            trucks_ij = pre.common(i, j)
+            if not trucks_ij:
+                continue # never in the same truck
+
+            # Binary variables for each constraint
+            p1[(i, j)] = solver.IntVar(0, 1, f'p1[{i}][{j}]')
+            p2[(i, j)] = solver.IntVar(0, 1, f'p2[{i}][{j}]')
+            p3[(i, j)] = solver.IntVar(0, 1, f'p3[{i}][{j}]')
+            p4[(i, j)] = solver.IntVar(0, 1, f'p4[{i}][{j}]')
+
+            # Constraints that the binary variables must satisfy
+            # M is the largest right / top the item can reach: ri - lj ≤ W_max[i] always holds
+            solver.Add(r[i] <= l[j] + W_max[i] * (1 - p1[(i, j)]))
+            solver.Add(r[j] <= l[i] + W_max[j] * (1 - p2[(i, j)]))
+            solver.Add(t[i] <= b[j] + H_max[i] * (1 - p3[(i, j)]))
+            solver.Add(t[j] <= b[i] + H_max[j] * (1 - p4[(i, j)]))
+
+            # both in truck m => at least one relative position holds
+            for m in trucks_ij:
+                solver.Add(p1[(i, j)] + p2[(i, j)] + p3[(i, j)] + p4[(i, j)] >= X[(i, m)] + X[(j, m)] - 1)
+
+    # find trucks being used
+    for m in range(k):
+        Z[m] = solver.IntVar(0, 1, f'Z[{m}]')
+        packed = [i for i in range(n) if (i, m) in X]
+
+        # if some X[i][m] = 1 then truck m is used => Z[m] = 1
+        # else, Z[m] = 0
+        for i in packed:
+            solver.Add(X[(i, m)] <= Z[m])
+        solver.Add(Z[m] <= sum(X[(i, m)] for i in packed))
+
+        # the items in truck m cannot cover more than its area
+        solver.Add(sum(data['size_item'][i][0] * data['size_item'][i][1] * X[(i, m)] for i in packed)
+                   <= W_truck[m] * H_truck[m] * Z[m])
+
+    # identical / dominating trucks are used first
+    for m1, m2 in pre.usage_pairs:
+        solver.Add(Z[m1] >= Z[m2])
+
+    # objective
+    cost = sum(Z[m] * data['cost'][m] for m in range(k)) # sum of used trucks * trucks' cost
+    solver.Minimize(cost) # minimize that sum
+
+    # warm start: hint the heuristic packing (SCIP completes the rest), keep only solutions as good
+    start = None
+    if warm_start is not None:
+        start = heuristic_start(items, trucks, warm_start)
+        if start is not None:
+            placements, start_cost = start
+            placements = pre.relabel(placements)
+            hint_vars, hint_values = [], []
+            for i, (m_i, x, y, rot) in enumerate(placements):
+                w, h = data['size_item'][i][::-1] if rot else data['size_item'][i]
+                hint_vars += [o[i], l[i], b[i], r[i], t[i]]
+                hint_values += [rot, x, y, x + w, y + h]
+                for m in pre.allowed[i]:
+                    hint_vars.append(X[(i, m)])
+                    hint_values.append(int(m == m_i))
+            # relative positions of the pairs sharing a truck
+            for (i, j) in p1:
+                (m_i, xi, yi, roti), (m_j, xj, yj, rotj) = placements[i], placements[j]
+                if m_i != m_j:
+                    continue
+                wi, hi = data['size_item'][i][::-1] if roti else data['size_item'][i]
+                wj, hj = data['size_item'][j][::-1] if rotj else data['size_item'][j]
+                hint_vars += [p1[(i, j)], p2[(i, j)], p3[(i, j)], p4[(i, j)]]
+                hint_values += [int(xi + wi <= xj), int(xj + wj <= xi), int(yi + hi <= yj), int(yj + hj <= yi)]
+            used = {m_i for m_i, _, _, _ in placements}
+            for m in range(k):
+                hint_vars.append(Z[m])
+                hint_values.append(int(m in used))
+            solver.SetHint(hint_vars, hint_values)
+            solver.Add(cost <= start_cost)
+
+    #start_time = time.time()
+    status = config.solve_mip(solver)
+    #end_time = time.time()
+
+    if status == pywraplp.Solver.OPTIMAL or status == pywraplp.Solver.FEASIBLE:
+        result = []
+        for i in range(n):
+            item_result = [i + 1] # i: item digit 
+            for j in pre.allowed[i]:
+                if X[i, j].solution_value() == 1:
+                    item_result.append(j + 1)   # t[i]: truck j the item is put in 
+            item_result.append(int(l[i].solution_value()))  # x[i]: left coordinate == x
+            item_result.append(int(b[i].solution_value()))  # y[i]: bottom coordinate == y
+            item_result.append(int(o[i].solution_value()))  # o[i]: orientation of item
+            result.append(item_result)
+
+        # for analysis
+        #num_trucks_used = int(sum(used[m].solution_value() for m in range(k)))
+        #total_cost = solver.Objective().Value()
+        #running_time = end_time - start_time
+
+        # result is the output list (𝑖, 𝑡[𝑖], 𝑥[𝑖], 𝑦[𝑖], 𝑜[𝑖]) of the problem
+        return result    
+        #return result, n, k, num_trucks_used, total_cost, running_time  # n, k is for analysis
+    elif start is not None:
+        # no solution from SCIP: the heuristic packing is still feasible
+        return [[i + 1, m_i + 1, x, y, rot] for i, (m_i, x, y, rot) in enumerate(start[0])]
+    else:
+        return None
+
+
+if __name__ == "__main__":
+    # --warm-start=greedy|rgls: hint the packing of a heuristic
+    warm_start = next((arg.split("=", 1)[1] for arg in sys.argv[1:] if arg.startswith("--warm-start=")), None)
+    # --time-limit= / --workers= / --gap= / --seed= / --log to change the search
+    config = SolverConfig.from_argv(sys.argv[1:])
+
+    n, k, data, W_truck, H_truck = input_data()
+    #result, n, k, num_trucks_used, total_cost, running_time = process_test_case(n, k, data, W_truck, H_truck)
+    result = process_test_case(n, k, data, W_truck, H_truck, warm_start, config)
+
+    # print(running_time)
+
+    for res in result:
+        for i in res:
+            print(i, end=" ")
+        print()
+
+    # Process each test case in the folder
+    #for testcase_filename in os.listdir(testcase_folder):
+    #    testcase_path = os.path.join(testcase_folder, testcase_filename)
+    #    result, num_trucks_used, total_cost, running_time = process_test_case(testcase_path)
+#
+    #    if result is not None:
+    #        print(f"Test case {testcase_filename}:")
+    #         for item_result in result:
+    #            print(' '.join(map(str, item_result)))
+    #        print(f'Number of trucks used: {num_trucks_used}')
+    #        print(f'Total cost: {total_cost}')
+    #        print(f'Running time: {running_time:.4f} seconds')
+    #    else:
+    #        print(f"Test case {testcase_filename}: No feasible solution found")
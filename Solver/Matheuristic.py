@@ -0,0 +1,339 @@
+### Matheuristic: heuristic assignment + exact packing per truck - Group 9
+
+import os
+import sys
+import time
+from concurrent.futures import Executor
+from typing import List, Tuple, Dict, Optional
+
+# MaxRects and the lower bounds are shared with heuristic/
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+from warm_start import warm_start as heuristic_start
+from CP_model import Input, pack_single_truck
+from solver_config import SolverConfig
+from maxrects import MaxRects
+from bounds import lower_bound
+
+
+class PackingCache:
+    """
+    Results of pack_single_truck keyed by the truck size and the multiset of
+    item sizes (up to rotation), so a set of items met again in the search,
+    in any order or orientation, costs one dictionary lookup.
+    """
+
+    def __init__(self, config: Optional[SolverConfig] = None):
+        self.config = config or SolverConfig(2, workers=1)
+        self.results: Dict[tuple, Tuple[int, Optional[List[Tuple[int, int, int]]]]] = {}
+        self.calls = 0  # CP-SAT solves
+        self.hits = 0   # answered from the cache
+
+    @staticmethod
+    def canonical(items: List[Tuple[int, int]]) -> List[int]:
+        """Item order in which equal multisets give the same sequence of (short, long) sides"""
+        return sorted(range(len(items)), key=lambda i: (min(items[i]), max(items[i])))
+
+    def key(self, items: List[Tuple[int, int]], W: int, H: int) -> tuple:
+        """Cache key of the items in a W x H truck"""
+        return (W, H, tuple(sorted((min(w, h), max(w, h)) for w, h in items)))
+
+    def _request(self, items, W, H, hint):
+        """Arguments of pack_single_truck in the canonical item order"""
+        order = self.canonical(items)
+        sizes = [(min(items[i]), max(items[i])) for i in order]
+        canonical_hint = None
+        if hint is not None:
+            # rotated flag relative to the (short, long) orientation
+            canonical_hint = [(hint[i][0], hint[i][1], hint[i][2] ^ int(items[i][0] > items[i][1])) for i in order]
+        return sizes, W, H, canonical_hint, self.config
+
+    def _result(self, items, key) -> Tuple[int, Optional[List[Tuple[int, int, int]]]]:
+        """Cached result of key, with the placements back in the order and orientation of items"""
+        status, packed = self.results[key]
+        if packed is None:
+            return status, None
+        placements: List[Optional[Tuple[int, int, int]]] = [None] * len(items)
+        for k, i in enumerate(self.canonical(items)):
+            x, y, rot = packed[k]
+            placements[i] = (x, y, rot ^ int(items[i][0] > items[i][1]))
+        return status, placements
+
+    def pack(self, items: List[Tuple[int, int]], W: int, H: int,
+             hint: Optional[List[Tuple[int, int, int]]] = None) -> Tuple[int, Optional[List[Tuple[int, int, int]]]]:
+        """
+        Same as pack_single_truck(items, W, H, hint), with the result cached.
+        A time-out (UNKNOWN) is cached too: the items are not retried with the same budget.
+        """
+        key = self.key(items, W, H)
+        if key in self.results:
+            self.hits += 1
+        else:
+            self.calls += 1
+            self.results[key] = pack_single_truck(*self._request(items, W, H, hint))
+        return self._result(items, key)
+
+    def pack_all(self, requests: List[Tuple[List[Tuple[int, int]], int, int, Optional[List[Tuple[int, int, int]]]]],
+                 executor: Optional[Executor] = None) -> List[Tuple[int, Optional[List[Tuple[int, int, int]]]]]:
+        """
+        pack() of several (items, W, H, hint) at once. The solves missing from
+        the cache are independent and go to executor (e.g. a ProcessPoolExecutor)
+        when one is given, each request is solved once even if repeated.
+        """
+        keys = [self.key(items, W, H) for items, W, H, _ in requests]
+        todo = {}
+        for key, (items, W, H, hint) in zip(keys, requests):
+            if key in self.results or key in todo:
+                self.hits += 1
+            else:
+                todo[key] = self._request(items, W, H, hint)
+        self.calls += len(todo)
+        if executor is None:
+            solved = [pack_single_truck(*args) for args in todo.values()]
+        else:
+            solved = executor.map(pack_single_truck, *zip(*todo.values())) if todo else []
+        for key, result in zip(todo, solved):
+            self.results[key] = result
+        return [self._result(items, key) for key, (items, _, _, _) in zip(keys, requests)]
+
+
+def matheuristic(n_items: int, n_trucks: int, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]],
+                 time_limit: float = 60, iters: int = 100, seed: int = 0,
+                 cache: Optional[PackingCache] = None) -> List[str]:
+    """
+    Heuristic truck selection / assignment, exact packing inside the trucks.
+
+    1. random_LNS from heuristic/RGLS.py chooses the trucks and the items of each
+       (first_fit when warm_start finds no packing).
+    2. Local search on the assignment, each move re-checked truck by truck:
+       - move the load of an open truck into a cheaper unused one,
+       - pack the loads of two open trucks into one unused truck cheaper than both,
+       - close a truck by spreading its items over the other open trucks
+         (and at most one cheaper unused truck).
+       An item goes into a truck directly if MaxRects finds a free spot in the
+       current layout, otherwise the truck is repacked from scratch by a
+       single-truck CP-SAT model (pack_single_truck, results cached).
+    The search stops at the time limit, when no move improves, or when the cost
+    reaches the lower bound of bounds.py.
+
+    Args:
+        n_items (int): Number of items to pack.
+        n_trucks (int): Number of trucks (bins).
+        items (List[Tuple[int, int]]): List of item dimensions (width, length).
+        trucks (List[Tuple[int, int, int]]): List of truck dimensions (width, length, cost).
+        time_limit (float, optional): Time limit in seconds for the whole search. Defaults to 60.
+        iters (int, optional): random_LNS iterations of the initial assignment. Defaults to 100.
+        seed (int, optional): Random seed of random_LNS. Defaults to 0.
+        cache (PackingCache, optional): Single-truck results, may be shared between runs.
+                                        Defaults to a new cache (2s per CP-SAT solve).
+
+    Returns:
+        List[str]: A list of strings representing the solution for each item.
+                   Returns ["F"] if the instance is proven infeasible (bounds.py),
+                   and [] if no solution was found within the time limit.
+    """
+    start_time = time.time()
+    cache = cache or PackingCache()
+    try:
+        bound = lower_bound(items, trucks)
+    except ValueError:
+        return ["F"]  # an item fits in no truck, or the trucks are too small in total
+
+    load: Dict[int, List[int]] = {}  # truck -> items in it
+    pos: Dict[int, Tuple[int, int, int]] = {}  # item -> (x, y, rotated)
+    cost = None
+
+    def expired():
+        return time.time() - start_time > time_limit
+
+    def out_of_time():
+        return expired() or cost <= bound
+
+    def area(group):
+        return sum(items[i][0] * items[i][1] for i in group)
+
+    def fits(i, j):
+        (w, h), (W, H) = items[i], trucks[j][:2]
+        return (w <= W and h <= H) or (h <= W and w <= H)
+
+    def repack(group, j, hint=None):
+        """Placements of group in truck j, or None"""
+        if area(group) > trucks[j][0] * trucks[j][1] or not all(fits(i, j) for i in group):
+            return None
+        _, packed = cache.pack([items[i] for i in group], trucks[j][0], trucks[j][1], hint)
+        return packed
+
+    def insert(i, j, new_load, new_pos):
+        """Puts item i into truck j (MaxRects first, CP-SAT repack otherwise). False if it does not fit"""
+        group = new_load[j]
+        W, H = trucks[j][0], trucks[j][1]
+        if area(group) + items[i][0] * items[i][1] > W * H or not fits(i, j):
+            return False
+
+        space = MaxRects(W, H)
+        for k in group:
+            x, y, rot = new_pos[k]
+            w, h = items[k][::-1] if rot else items[k]
+            space.add(x, y, w, h)
+        spot = space.find(*items[i])
+        if spot is not None:
+            x, y, rot = spot
+            new_pos[i] = (x, y, int(rot))
+            new_load[j] = group + [i]
+            return True
+
+        packed = repack(group + [i], j, [new_pos[k] for k in group] + [(0, 0, 0)])
+        if packed is None:
+            return False
+        new_load[j] = group + [i]
+        for k, p in zip(new_load[j], packed):
+            new_pos[k] = p
+        return True
+
+    def move_to_cheaper():
+        """Moves a whole load into a cheaper unused truck"""
+        nonlocal load, cost
+        for j in sorted(load, key=lambda j: -trucks[j][2]):
+            if out_of_time():
+                return False
+            for u in sorted(range(n_trucks), key=lambda u: trucks[u][2]):
+                if trucks[u][2] >= trucks[j][2]:
+                    break
+                if u in load:
+                    continue
+                packed = repack(load[j], u, [pos[i] for i in load[j]])
+                if packed is not None:
+                    load[u] = load.pop(j)
+                    for i, p in zip(load[u], packed):
+                        pos[i] = p
+                    cost -= trucks[j][2] - trucks[u][2]
+                    return True
+        return False
+
+    def merge_pair():
+        """Packs the loads of two open trucks into one unused truck cheaper than both"""
+        nonlocal load, cost
+        opened = sorted(load, key=lambda j: area(load[j]))
+        for a_idx, a in enumerate(opened):
+            for c in opened[a_idx + 1:]:
+                if out_of_time():
+                    return False
+                group = load[a] + load[c]
+                for u in sorted(range(n_trucks), key=lambda u: trucks[u][2]):
+                    if trucks[u][2] >= trucks[a][2] + trucks[c][2]:
+                        break
+                    if u in load and u not in (a, c):
+                        continue
+                    packed = repack(group, u)
+                    if packed is not None:
+                        del load[a], load[c]
+                        load[u] = group
+                        for i, p in zip(group, packed):
+                            pos[i] = p
+                        cost -= trucks[a][2] + trucks[c][2] - trucks[u][2]
+                        return True
+        return False
+
+    def close_truck():
+        """
+        Spreads the items of an open truck over the other open trucks, plus at
+        most one unused truck cheaper than the closed one
+        """
+        nonlocal load, pos, cost
+        # most expensive per unit of packed area first
+        for j in sorted(load, key=lambda j: -trucks[j][2] / area(load[j])):
+            extra = [None] + [u for u in sorted(range(n_trucks), key=lambda u: trucks[u][2])
+                              if u not in load and trucks[u][2] < trucks[j][2]][:3]
+            for u in extra:
+                if out_of_time():
+                    return False
+                new_load = {v: list(group) for v, group in load.items() if v != j}
+                if u is not None:
+                    new_load[u] = []
+                new_pos = dict(pos)
+                for i in sorted(load[j], key=lambda i: -items[i][0] * items[i][1]):
+                    targets = sorted(new_load, key=lambda v: area(new_load[v]) - trucks[v][0] * trucks[v][1])
+                    if not any(insert(i, v, new_load, new_pos) for v in targets):
+                        break
+                else:
+                    load = {v: group for v, group in new_load.items() if group}
+                    pos = new_pos
+                    cost = sum(trucks[v][2] for v in load)
+                    return True
+        return False
+
+    def first_fit():
+        """
+        Start used when warm_start finds none: each item, largest first, goes
+        into the first open truck that takes it (MaxRects, then a CP-SAT
+        repack) or else into the cheapest unused truck that takes it.
+        Returns (load, pos), or None if an item is left over or time runs out.
+        """
+        new_load: Dict[int, List[int]] = {}
+        new_pos: Dict[int, Tuple[int, int, int]] = {}
+        unused = sorted(range(n_trucks), key=lambda u: trucks[u][2])
+        for i in sorted(range(n_items), key=lambda i: -items[i][0] * items[i][1]):
+            for j in list(new_load) + unused:
+                if expired():
+                    return None
+                new_load.setdefault(j, [])
+                if insert(i, j, new_load, new_pos):
+                    if j in unused:
+                        unused.remove(j)
+                    break
+                if not new_load[j]:
+                    del new_load[j]
+            else:
+                return None
+        return new_load, new_pos
+
+    start = heuristic_start(items, trucks, "rgls", iters=iters, seed=seed)
+    if start is not None:
+        for i, (j, x, y, rot) in enumerate(start[0]):
+            load.setdefault(j, []).append(i)
+            pos[i] = (x, y, rot)
+    else:
+        start = first_fit()
+        if start is None:
+            return []  # no start within the time limit, which proves nothing
+        load, pos = start
+    cost = sum(trucks[j][2] for j in load)
+
+    while not out_of_time() and (move_to_cheaper() or merge_pair() or close_truck()):
+        pass
+
+    truck_of = {i: j for j, group in load.items() for i in group}
+    return [f"{i + 1} {truck_of[i] + 1} {pos[i][0]} {pos[i][1]} {pos[i][2]}" for i in range(n_items)]
+
+
+def main():
+    """
+    Main entry point of the script.
+    Reads input, solves the bin packing problem, and prints results.
+    """
+    try:
+        n_items, n_trucks, items, trucks = Input()
+        # Let time_limit = 60s, --time-limit= / --workers= / --seed= to change the search,
+        # --truck-time-limit= for each single-truck CP-SAT solve (default 2s), --iters= for random_LNS
+        config = SolverConfig.from_argv(sys.argv[1:], time_limit=60)
+        options = dict(arg[2:].split("=", 1) for arg in sys.argv[1:] if arg.startswith("--") and "=" in arg)
+        truck_config = SolverConfig(float(options.get("truck-time-limit", 2)), workers=config.workers or 1, seed=config.seed)
+        solution = matheuristic(n_items, n_trucks, items, trucks, config.time_limit, int(options.get("iters", 100)),
+                                config.seed, PackingCache(truck_config))
+
+        if solution == ["F"]:
+            print("F")
+        elif not solution:
+            print("Error: no solution found within the time limit")
+        else:
+            for item_solution in solution:
+                print(item_solution)
+
+    except ValueError as e:
+        print(f"Error: {e}")
+
+
+if __name__ == "__main__":
+    main()
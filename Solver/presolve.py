@@ -0,0 +1,102 @@
+### Presolve for the exact models - Group 9
+
+from typing import List, Tuple, Dict
+
+
+class Presolve:
+    """
+    Item-truck compatibility and symmetry breaking shared by the exact models.
+
+    - allowed[i]: trucks item i may go in. A truck is dropped if the item fits
+      in neither orientation.
+    - Identical trucks (same W, H, cost) form a class. Items are ranked by
+      decreasing area, and the item of rank r may only use the first r + 1
+      trucks of each class (the largest item is fixed to the first truck of
+      its class).
+    - usage_pairs: (a, b) meaning used[a] >= used[b]. Trucks of a class are
+      used in order. If class A dominates class B (A is at least as wide and
+      tall and no more expensive), every truck of A is used before any of B.
+
+    Any solution can be turned into one satisfying all of the above, at no
+    extra cost: move the load of a dominated truck into an unused dominating
+    one, then relabel each class by the smallest rank its trucks hold. No
+    optimum is lost.
+    """
+
+    def __init__(self, items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]]):
+        n_items, n_trucks = len(items), len(trucks)
+
+        # Group identical trucks, classes keep the order of the input
+        by_spec: Dict[Tuple[int, int, int], List[int]] = {}
+        for j, spec in enumerate(trucks):
+            by_spec.setdefault(tuple(spec), []).append(j)
+        specs = list(by_spec)
+        self.classes = list(by_spec.values())
+        self.position = [0] * n_trucks  # index of truck j inside its class
+        for cls in self.classes:
+            for p, j in enumerate(cls):
+                self.position[j] = p
+
+        order = sorted(range(n_items), key=lambda i: (-items[i][0] * items[i][1], i))
+        self.rank = [0] * n_items
+        for r, i in enumerate(order):
+            self.rank[i] = r
+
+        self.allowed = []
+        for i, (w, h) in enumerate(items):
+            self.allowed.append([
+                j for j, (W, H, _) in enumerate(trucks)
+                if ((w <= W and h <= H) or (h <= W and w <= H)) and self.position[j] <= self.rank[i]
+            ])
+        self.allowed_set = [set(a) for a in self.allowed]
+
+        # (A, B) class indices, A dominates B
+        self.dominance = [
+            (a, c) for a, (Wa, Ha, ca) in enumerate(specs) for c, (Wc, Hc, cc) in enumerate(specs)
+            if a != c and Wa >= Wc and Ha >= Hc and ca <= cc
+        ]
+
+        self.usage_pairs = [(a, b) for cls in self.classes for a, b in zip(cls, cls[1:])]
+        self.usage_pairs += [(self.classes[a][-1], self.classes[c][0]) for a, c in self.dominance]
+
+    def feasible(self) -> bool:
+        """False if some item fits in no truck at all"""
+        return all(self.allowed)
+
+    def common(self, i: int, k: int) -> List[int]:
+        """Trucks both items may go in (the only ones needing a non-overlap constraint)"""
+        trucks, other = self.allowed[i], self.allowed_set[k]
+        if len(trucks) > len(other):
+            trucks, other = self.allowed[k], self.allowed_set[i]
+        return [j for j in trucks if j in other]
+
+    def relabel(self, placements: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+        """
+        Moves a packing (truck j, x, y, rotated) into dominating / identical
+        trucks so it satisfies the symmetry breaking, e.g. before using it as
+        a hint. The cost never increases and coordinates stay valid.
+        """
+        load: Dict[int, List[int]] = {}  # truck -> items packed in it
+        for i, (j, _, _, _) in enumerate(placements):
+            load.setdefault(j, []).append(i)
+
+        # Empty dominated trucks into unused dominating ones until none is left
+        changed = True
+        while changed:
+            changed = False
+            for a, c in self.dominance:
+                free = [j for j in self.classes[a] if j not in load]
+                for j in self.classes[c]:
+                    if not free:
+                        break
+                    if j in load:
+                        load[free.pop(0)] = load.pop(j)
+                        changed = True
+
+        truck_of = {}
+        for cls in self.classes:
+            used = sorted((j for j in cls if j in load), key=lambda j: min(self.rank[i] for i in load[j]))
+            for target, j in zip(cls, used):
+                for i in load[j]:
+                    truck_of[i] = target
+        return [(truck_of[i], x, y, rot) for i, (_, x, y, rot) in enumerate(placements)]
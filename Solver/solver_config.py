@@ -0,0 +1,106 @@
+### Solver configuration for the exact models - Group 9
+
+import sys
+from typing import List, Optional, Callable, Union
+from ortools.sat.python import cp_model
+from ortools.linear_solver import pywraplp
+
+
+class SolverConfig:
+    """
+    Search parameters shared by the CP-SAT and SCIP models.
+
+    - time_limit: wall time limit in seconds (None = no limit).
+    - workers: search threads. 0 lets CP-SAT use every core. SCIP from OR-Tools
+      is sequential, so for the MIP model this is only a request.
+    - relative_gap: stop once (incumbent - bound) / incumbent <= relative_gap
+      (None = default of the solver).
+    - seed: random seed of the search.
+    - log: True streams the CP-SAT log to stderr (stdout is the output channel
+      of the scripts), a callable receives each log line instead. SCIP can
+      only write its log on stdout.
+    - callback: CpSolverSolutionCallback called on every new solution (CP-SAT only).
+    """
+
+    def __init__(self, time_limit: Optional[float] = 300, workers: int = 0, relative_gap: Optional[float] = None,
+                 seed: int = 0, log: Union[bool, Callable[[str], None]] = False,
+                 callback: Optional[cp_model.CpSolverSolutionCallback] = None):
+        if workers < 0:
+            raise ValueError(f"workers must be >= 0, got {workers}")
+        if relative_gap is not None and relative_gap < 0:
+            raise ValueError(f"relative_gap must be >= 0, got {relative_gap}")
+        self.time_limit = time_limit
+        self.workers = workers
+        self.relative_gap = relative_gap
+        self.seed = seed
+        self.log = log
+        self.callback = callback
+
+    @classmethod
+    def from_argv(cls, argv: List[str], time_limit: Optional[float] = 300) -> "SolverConfig":
+        """
+        Reads --time-limit=, --workers=, --gap=, --seed= and --log from the
+        command line (unknown flags are left to the caller).
+        """
+        options = dict(arg[2:].split("=", 1) for arg in argv if arg.startswith("--") and "=" in arg)
+        return cls(
+            time_limit=float(options["time-limit"]) if "time-limit" in options else time_limit,
+            workers=int(options.get("workers", 0)),
+            relative_gap=float(options["gap"]) if "gap" in options else None,
+            seed=int(options.get("seed", 0)),
+            log="--log" in argv,
+        )
+
+    def _log_line(self, line: str) -> None:
+        if callable(self.log):
+            self.log(line)
+        else:
+            print(line, file=sys.stderr)
+
+    def cp_solver(self) -> cp_model.CpSolver:
+        """CP-SAT solver with these parameters"""
+        solver = cp_model.CpSolver()
+        if self.time_limit is not None:
+            solver.parameters.max_time_in_seconds = self.time_limit
+        solver.parameters.num_workers = self.workers
+        if self.relative_gap is not None:
+            solver.parameters.relative_gap_limit = self.relative_gap
+        solver.parameters.random_seed = self.seed
+        if self.log:
+            solver.parameters.log_search_progress = True
+            solver.parameters.log_to_stdout = False
+            solver.log_callback = self._log_line
+        return solver
+
+    def solve_cp(self, solver: cp_model.CpSolver, model: cp_model.CpModel,
+                 callback: Optional[cp_model.CpSolverSolutionCallback] = None) -> int:
+        """Solves model with the solution callback (callback, else the configured one) and returns the status"""
+        callback = callback or self.callback
+        if callback is not None:
+            return solver.Solve(model, callback)
+        return solver.Solve(model)
+
+    def mip_solver(self, backend: str = "SCIP") -> pywraplp.Solver:
+        """pywraplp solver with these parameters. Solve it with solve_mip"""
+        if self.callback is not None:
+            raise ValueError("Solution callbacks are only supported by CP-SAT")
+        solver = pywraplp.Solver.CreateSolver(backend)
+        if solver is None:
+            raise ValueError(f"MIP backend not available: {backend}")
+        if self.time_limit is not None:
+            solver.SetTimeLimit(int(self.time_limit * 1000))  # time is in milisecond
+        if self.workers:
+            solver.SetNumThreads(self.workers)
+        if backend == "SCIP":
+            solver.SetSolverSpecificParametersAsString(f"randomization/randomseedshift = {self.seed}")
+        if self.log:
+            solver.EnableOutput()
+        return solver
+
+    def solve_mip(self, solver: pywraplp.Solver) -> int:
+        """Solves with the relative gap and returns the status"""
+        params = pywraplp.MPSolverParameters()
+        if self.relative_gap is not None:
+            params.SetDoubleParam(params.RELATIVE_MIP_GAP, self.relative_gap)
+        return solver.Solve(params)
+
@@ -0,0 +1,138 @@
+### Warm start for the exact models - Group 9
+
+import os
+import sys
+import io
+import random
+import contextlib
+from typing import List, Tuple, Optional
+
+# The heuristics live in heuristic/ and import their helpers as top-level modules
+HEURISTIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "heuristic")
+if HEURISTIC_DIR not in sys.path:
+    sys.path.append(HEURISTIC_DIR)
+
+import RGLS
+from core import BoxTable, ContainerTable
+from objective import track
+from maxrects import MaxRects
+
+HEURISTICS = ("greedy", "rgls")
+
+
+def fill_trucks(items: List[Tuple[int, int]],
+                trucks: List[Tuple[int, int, int]]) -> Optional[Tuple[List[Tuple[int, int, int, int]], int]]:
+    """
+    Truck-by-truck packing in the style of Heuristic-1.cpp: the items are taken
+    by decreasing (long side, short side) and each truck in turn gets every
+    remaining item MaxRects can still place in it. This is run for the truck
+    orders of Heuristic-1.cpp (largest first, cheapest first, largest area first,
+    lowest cost per area first) and the cheapest complete packing is kept.
+
+    Returns:
+        Optional[Tuple[List[Tuple[int, int, int, int]], int]]: (placements, cost) as in warm_start,
+        or None if no truck order places every item.
+    """
+    n, k = len(items), len(trucks)
+    order = sorted(range(n), key=lambda i: (-max(items[i]), -min(items[i])))
+    truck_orders = [
+        sorted(range(k), key=lambda j: (-max(trucks[j][:2]), -min(trucks[j][:2]))),
+        sorted(range(k), key=lambda j: trucks[j][2]),
+        sorted(range(k), key=lambda j: -trucks[j][0] * trucks[j][1]),
+        sorted(range(k), key=lambda j: trucks[j][2] / (trucks[j][0] * trucks[j][1])),
+    ]
+
+    best = None
+    for truck_order in truck_orders:
+        placements: List[Optional[Tuple[int, int, int, int]]] = [None] * n
+        left, cost = order, 0
+        for j in truck_order:
+            if not left or (best is not None and cost >= best[1]):
+                break
+            W, H = trucks[j][0], trucks[j][1]
+            space = MaxRects(W, H)
+            free_area = W * H
+            rest = []
+            for i in left:
+                w, h = items[i]
+                spot = space.find(w, h) if w * h <= free_area else None
+                if spot is None:
+                    rest.append(i)
+                    continue
+                x, y, rot = spot
+                space.add(x, y, *((h, w) if rot else (w, h)))
+                free_area -= w * h
+                placements[i] = (j, x, y, int(rot))
+            if len(rest) < len(left):
+                cost += trucks[j][2]
+            left = rest
+        if not left and (best is None or cost < best[1]):
+            best = (placements, cost)
+    return best
+
+
+def _improve(boxes, containers, iters: int, seed: int, engine: str) -> None:
+    """random_LNS on a complete packing, with a private random.Random(seed)"""
+    # random_LNS reports its progress on stdout, which is our output channel
+    with contextlib.redirect_stdout(io.StringIO()):
+        RGLS.random_LNS(boxes, containers, iters=iters, destroy_rate=0.3, engine=engine,
+                        rng=random.Random(seed))
+
+
+def warm_start(items: List[Tuple[int, int]], trucks: List[Tuple[int, int, int]], heuristic: str = "greedy",
+               engine: str = "maxrects", iters: int = 100, seed: int = 0) -> Optional[Tuple[List[Tuple[int, int, int, int]], int]]:
+    """
+    Runs a heuristic from heuristic/RGLS.py to get a feasible packing.
+
+    greedy_construct is tried with each placement engine. When it gets stuck
+    with all of them, fill_trucks builds the packing instead ("rgls" then runs
+    random_LNS on it).
+
+    Args:
+        items (List[Tuple[int, int]]): List of item dimensions (width, length).
+        trucks (List[Tuple[int, int, int]]): List of truck dimensions (width, length, cost).
+        heuristic (str, optional): "greedy" (greedy_construct) or "rgls" (greedy_construct + random_LNS).
+        engine (str, optional): Placement engine tried first. Defaults to "maxrects".
+        iters (int, optional): random_LNS iterations for "rgls". Defaults to 100.
+        seed (int, optional): Seed of the private random.Random of random_LNS
+                              (the global random state is left untouched). Defaults to 0.
+
+    Returns:
+        Optional[Tuple[List[Tuple[int, int, int, int]], int]]:
+        (placements, cost) where placements[i] = (truck index j (0-based), x, y, rotated),
+        or None if no heuristic placed every item. None only means "no hint":
+        it is not a proof of infeasibility, callers must not report F on it.
+    """
+    if heuristic not in HEURISTICS:
+        raise ValueError(f"Unknown warm-start heuristic: {heuristic}")
+
+    # greedy_construct keeps the input order, so one engine can get stuck where
+    # another does not: fall back to the others
+    for engine in [engine] + [e for e in ("maxrects", "skyline", "corner") if e != engine]:
+        boxes = BoxTable(items).views()
+        containers = ContainerTable(trucks).views(RGLS.Container)
+        try:
+            RGLS.greedy_construct(boxes, containers, engine=engine)
+            if heuristic == "rgls":
+                _improve(boxes, containers, iters, seed, engine)
+            break
+        except RuntimeError:
+            continue
+    else:
+        start = fill_trucks(items, trucks)
+        if start is None or heuristic != "rgls":
+            return start
+        boxes = BoxTable(items).views()
+        containers = ContainerTable(trucks).views(RGLS.Container)
+        containers.sort(key=lambda c: (c.cost, c.ID))
+        track(containers)
+        by_id = {c.ID: c for c in containers}
+        for box, (j, x, y, rot) in zip(boxes, start[0]):
+            RGLS.place_box(box, by_id[j + 1], x, y, bool(rot))
+        try:
+            _improve(boxes, containers, iters, seed, "maxrects")
+        except RuntimeError:
+            return start  # repair got stuck part-way: keep the packing of fill_trucks
+
+    placements = [(b.truck - 1, b.x, b.y, int(b.rotation)) for b in boxes]
+    return placements, RGLS.total_cost(containers)
@@ -1,32 +1,94 @@
 import sys
 import random
 from typing import List
-import copy
+
+from core import Box, BoxTable, ContainerTable, ContainerView
+from spatial import SpatialGrid
+from objective import track
+from feasibility import first_feasible
+from skyline import skyline_position
+from maxrects import maxrects_position
+from bounds import lower_bound
+from instance import load
+
 INF = 10**9
 
 
 # ===================== DATA STRUCTURES =====================
 
-class Box:
-    def __init__(self, ID, w, h):
-        self.ID = ID
-        self.w = w
-        self.h = h
-        self.truck = -1
-        self.x = 0
-        self.y = 0
-        self.rotation = False
-
-
-class Container:
-    def __init__(self, ID, W, H, cost):
-        self.ID = ID
-        self.W = W
-        self.H = H
-        self.cost = cost
-        self.used = False
+class Container(ContainerView):
+    __slots__ = ('_used', 'objective', 'boxes', 'boxes_pos', 'grid', 'skyline', 'maxrects')
+
+    def __init__(self, table: ContainerTable, j):
+        super().__init__(table, j)
+        W, H = self.W, self.H
+        self._used = False
+        self.objective = None  # Objective chung, gắn bởi track()
         self.boxes = []
         self.boxes_pos = [(0, 0)]
+        self.grid = SpatialGrid(W, H)
+        self.skyline = None  # Skyline, dựng khi dùng engine="skyline"
+        self.maxrects = None  # MaxRects, dựng khi dùng engine="maxrects"
+
+    @property
+    def used(self):
+        return self._used
+
+    @used.setter
+    def used(self, value):
+        if value != self._used:
+            self._used = value
+            if self.objective is not None:
+                self.objective.update(self, value)
+
+
+class Journal:
+    """
+    Undo log cho một vòng destroy/repair: lưu trạng thái của box/container
+    lần đầu bị thay đổi, rollback ghi đè lại theo thứ tự ngược.
+    Grid không được copy: từ lúc container được ghi, mọi insert / remove trên
+    grid của nó được log lại, rollback chạy ngược các thao tác đó.
+    Xong một vòng thì gọi rollback() hoặc commit() để grid ngừng ghi log.
+    """
+
+    def __init__(self):
+        self.boxes = {}       # box ID -> (box, truck, x, y, rotation)
+        self.containers = {}  # container ID -> (container, boxes, boxes_pos, used)
+        self.grid_ops = []    # (grid, op, bid, rect) theo thứ tự thực hiện
+
+    def record_box(self, box: Box):
+        if box.ID not in self.boxes:
+            self.boxes[box.ID] = (box, box.truck, box.x, box.y, box.rotation)
+
+    def record_container(self, cont: Container):
+        if cont.ID not in self.containers:
+            self.containers[cont.ID] = (cont, cont.boxes[:], cont.boxes_pos[:], cont.used)
+            cont.grid.log = self.grid_ops
+
+    def commit(self):
+        """Giữ các thay đổi, bỏ log"""
+        for cont, _, _, _ in self.containers.values():
+            cont.grid.log = None
+        self.boxes.clear()
+        self.containers.clear()
+        self.grid_ops.clear()
+
+    def rollback(self):
+        for cont, _, _, _ in self.containers.values():
+            cont.grid.log = None
+        for grid, op, bid, rect in reversed(self.grid_ops):
+            if op == "insert":
+                grid.remove(bid)
+            else:
+                grid.insert(bid, *rect)
+        for box, truck, x, y, rot in reversed(list(self.boxes.values())):
+            box.truck, box.x, box.y, box.rotation = truck, x, y, rot
+        for cont, bids, pos, used in reversed(list(self.containers.values())):
+            cont.boxes, cont.boxes_pos, cont.used = bids, pos, used
+            cont.skyline = cont.maxrects = None
+        self.boxes.clear()
+        self.containers.clear()
+        self.grid_ops.clear()
 
 
 # ===================== GEOMETRY =====================
@@ -49,10 +111,7 @@ def can_place(box: Box, cont: Container, x, y, rot, boxes) -> bool:
         return False
 
     box.x, box.y, box.rotation = x, y, rot
-    for bid in cont.boxes:
-        if box_intersect(box, boxes[bid - 1]):
-            return False
-    return True
+    return not cont.grid.overlaps(x, y, w, h)
 
 
 def insert_box(box: Box, cont: Container, x, y, rot):
@@ -61,36 +120,69 @@ def insert_box(box: Box, cont: Container, x, y, rot):
     box.truck = cont.ID
 
     cont.boxes.append(box.ID)
+    cont.grid.insert(box.ID, x, y, w, h)
     cont.boxes_pos.append((x, y + h))
     cont.boxes_pos.append((x + w, y))
+    if cont.skyline is not None:
+        cont.skyline.add(x, y, w, h)
+    if cont.maxrects is not None:
+        cont.maxrects.add(x, y, w, h)
     cont.used = True
 
 
+def find_position(box: Box, cont: Container, boxes, batch=False, engine="corner"):
+    """
+    Điểm (x, y, rot) đầu tiên trong cont.boxes_pos đặt được box, hoặc None.
+    batch=True kiểm tra các điểm theo khối bằng feasible_mask (NumPy).
+    engine="skyline" thay boxes_pos bằng vị trí best-fit trên skyline,
+    engine="maxrects" chọn vùng trống best-short-side-fit của MaxRects.
+    """
+    if engine == "maxrects":
+        return maxrects_position(box, cont, boxes)
+    if engine == "skyline":
+        pos = skyline_position(box, cont, boxes)
+        if pos is not None:
+            return pos
+        # Skyline không thấy các lỗ bên dưới nó (vd. sau destroy): thử điểm góc
+    elif engine != "corner":
+        raise ValueError(f"Unknown placement engine: {engine}")
+
+    if batch:
+        candidates = ((x, y, rot) for (x, y) in cont.boxes_pos for rot in (False, True))
+        return first_feasible(box, cont, candidates)
+
+    for (x, y) in cont.boxes_pos:
+        for rot in (False, True):
+            if can_place(box, cont, x, y, rot, boxes):
+                return x, y, rot
+    return None
+
+
 # ===================== OBJECTIVE =====================
 def init_cost(containers):
     return sum(c.cost for c in containers)
 def total_cost(containers):
-    return sum(c.cost for c in containers if c.used)
+    objective = containers[0].objective
+    if objective is None:
+        return sum(c.cost for c in containers if c.used)
+    return objective.cost
 
 
 # ===================== GREEDY CONSTRUCTION =====================
 
-def greedy_construct(boxes, containers):
+def greedy_construct(boxes, containers, batch=False, engine="corner"):
     containers.sort(key=lambda c: (c.cost, c.ID))
+    track(containers)
 
     for box in boxes:
         placed = False
         for cont in containers:
-            for (x, y) in cont.boxes_pos:
-                for rot in (False, True):
-                    if can_place(box, cont, x, y, rot, boxes):
-                        insert_box(box, cont, x, y, rot)
-                        cont.boxes_pos.remove((x, y))
-                        placed = True
-                        break
-                if placed:
-                    break
-            if placed:
+            pos = find_position(box, cont, boxes, batch, engine)
+            if pos is not None:
+                insert_box(box, cont, *pos)
+                if pos[:2] in cont.boxes_pos:
+                    cont.boxes_pos.remove(pos[:2])
+                placed = True
                 break
 
         if not placed:
@@ -99,17 +191,20 @@ def greedy_construct(boxes, containers):
 
 # ===================== DESTROY =====================
 
-def destroy_solution(boxes, containers, destroy_rate=0.2):
+def destroy_solution(boxes, containers, destroy_rate=0.2, journal=None):
     # 1. CHỈ lấy box đang được đặt
     active_boxes = [b for b in boxes if b.truck != -1]
     if not active_boxes:
         return []
 
+    # Tạo dict để tìm container theo ID (vì containers đã sort)
+    cont_by_id = {c.ID: c for c in containers}
+
     # 2. Cost-biased weights
-    max_cost = max(containers[b.truck - 1].cost for b in active_boxes)
+    max_cost = max(cont_by_id[b.truck].cost for b in active_boxes)
     # print("max_cost:", max_cost)
     weights = [
-        containers[b.truck - 1].cost / max_cost
+        cont_by_id[b.truck].cost / max_cost
         for b in active_boxes
     ]
 
@@ -118,31 +213,39 @@ def destroy_solution(boxes, containers, destroy_rate=0.2):
     removed = random.choices(active_boxes, weights=weights, k=num_remove)
     removed = list({b.ID: b for b in removed}.values())
     # print("destroyed boxes:", [b.ID for b in removed])
-    
-    # 4. Destroy = reset assignment (KHÔNG đụng container)
+
+    # 4. Destroy = reset assignment, chỉ đụng container chứa box bị remove
+    touched = {b.truck: cont_by_id[b.truck] for b in removed}
+    if journal is not None:
+        for b in removed:
+            journal.record_box(b)
+        for c in touched.values():
+            journal.record_container(c)
+
     for b in removed:
+        touched[b.truck].grid.remove(b.ID)
         b.truck = -1
 
-    # 5. Rebuild container state từ box assignments
-
-    for c in containers:
+    # 5. Rebuild state của các container đó từ box assignments
+    # (các box còn lại không đổi chỗ nên grid chỉ cần bỏ các box bị remove)
+    for c in touched.values():
+        remaining = sorted(bid for bid in c.boxes if boxes[bid - 1].truck != -1)
         c.boxes.clear()
         c.boxes_pos = [(0, 0)]
-        c.used = False
-
-    # Tạo dict để tìm container theo ID (vì containers đã sort)
-    cont_by_id = {c.ID: c for c in containers}
-    
-    for b in boxes:
-        if b.truck != -1:
-            cont = cont_by_id[b.truck]  # Tìm đúng container theo ID
-            insert_box(b, cont, b.x, b.y, b.rotation)
+        c.skyline = c.maxrects = None
+        for bid in remaining:
+            b = boxes[bid - 1]
+            w, h = (b.h, b.w) if b.rotation else (b.w, b.h)
+            c.boxes.append(bid)
+            c.boxes_pos.append((b.x, b.y + h))
+            c.boxes_pos.append((b.x + w, b.y))
+        c.used = bool(c.boxes)
     return removed
 
 
 # ===================== REPAIR =====================
 
-def repair_solution(removed, boxes, containers):
+def repair_solution(removed, boxes, containers, journal=None, batch=False, engine="corner"):
     # QUAN TRỌNG: Sort theo diện tích giảm dần (đặt box lớn trước)
     removed_sorted = sorted(removed, key=lambda b: b.w * b.h, reverse=True)
     # print("repairing boxes:", [b.ID for b in removed_sorted])
@@ -150,16 +253,14 @@ def repair_solution(removed, boxes, containers):
         placed = False
         # Ưu tiên container đã used trước (để không mở thêm container mới)
         for cont in sorted(containers, key=lambda c: (0 if c.used else 1, c.cost, c.ID)):
-            for (x, y) in cont.boxes_pos:
-                for rot in (False, True):
-                    if can_place(b, cont, x, y, rot, boxes):
-                        insert_box(b, cont, x, y, rot)
-                        cont.boxes_pos.remove((x, y))
-                        placed = True
-                        break
-                if placed:
-                    break
-            if placed:
+            pos = find_position(b, cont, boxes, batch, engine)
+            if pos is not None:
+                if journal is not None:
+                    journal.record_container(cont)
+                insert_box(b, cont, *pos)
+                if pos[:2] in cont.boxes_pos:
+                    cont.boxes_pos.remove(pos[:2])
+                placed = True
                 break
 
         if not placed:
@@ -168,58 +269,53 @@ def repair_solution(removed, boxes, containers):
 
 # ===================== LNS =====================
 
-def CB_LNS(boxes, containers, iters=100, destroy_rate=0.3):
+def CB_LNS(boxes, containers, iters=100, destroy_rate=0.3, engine="corner", bound=None):
+    """bound: cận dưới của cost (bounds.lower_bound), không tìm tiếp khi đã đạt cận"""
     best_cost = total_cost(containers)
-    current_container = copy.deepcopy(containers)
-    current_boxes = copy.deepcopy(boxes)
 
     for _ in range(iters):
-        removed = destroy_solution(boxes, containers, destroy_rate)
-        repair_solution(removed, boxes, containers)
+        if bound is not None and best_cost <= bound:
+            break  # đã tối ưu
+
+        journal = Journal()
+        removed = destroy_solution(boxes, containers, destroy_rate, journal)
+        try:
+            repair_solution(removed, boxes, containers, journal, engine=engine)
+        except RuntimeError:
+            journal.rollback()  # trả lại lời giải trước vòng này rồi báo lỗi như cũ
+            raise
 
         c = total_cost(containers)
-        
+
         if c < best_cost:
             best_cost = c
+            journal.commit()
             return boxes, containers  # (boxes, containers)
-        else:
-            # rollback
-            for b in boxes:
-                b.truck = -1
-            for cont in containers:
-                cont.used = False
-                cont.boxes = []
-                cont.boxes_pos = [(0, 0)]
-            containers = copy.deepcopy(current_container)
-            boxes = copy.deepcopy(current_boxes)
 
-    return current_boxes, current_container  # (boxes, containers) - FIX!
+        # rollback: chỉ khôi phục những gì destroy/repair đã đụng tới
+        journal.rollback()
+
+    return boxes, containers  # (boxes, containers)
 
 
 # ===================== IO =====================
 
 def solve():
-    with open("example.txt", "r") as f:
-        data = f.read().strip().split()
-
-    it = iter(data)
+    instance = load("example.txt")
 
-    N = int(next(it))
-    K = int(next(it))
-
-    boxes = [Box(i + 1, int(next(it)), int(next(it))) for i in range(N)]
-    containers = [
-        Container(i + 1, int(next(it)), int(next(it)), int(next(it)))
-        for i in range(K)
-    ]
+    boxes = BoxTable(instance.item_list()).views()
+    containers = ContainerTable(instance.truck_list()).views(Container)
 
     containers.sort(key=lambda c: (c.cost, c.ID))
 
     greedy_construct(boxes, containers)
+    bound = lower_bound([(b.w, b.h) for b in boxes], [(c.W, c.H, c.cost) for c in containers])
     # print("Initial cost:", total_cost(containers))
     for i in range(50):
+        if total_cost(containers) <= bound:
+            break
         # print(f"--- LNS Iteration {i+1} ---")
-        current_boxes, current_containers = CB_LNS(boxes, containers)
+        current_boxes, current_containers = CB_LNS(boxes, containers, bound=bound)
         print("Final cost:", total_cost(current_containers))
         containers = current_containers
         boxes = current_boxes
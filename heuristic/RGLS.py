@@ -2,30 +2,45 @@ import sys
 import random
 from typing import List
 
+from core import Box, BoxTable, ContainerTable, ContainerView
+from spatial import SpatialGrid
+from objective import track
+from extreme_points import ExtremePoints
+from feasibility import first_feasible
+from skyline import skyline_position
+from maxrects import maxrects_position
+from bounds import lower_bound
+from instance import load
+
 INF = 10**9
 
 
 # ===================== DATA STRUCTURES =====================
 
-class Box:
-    def __init__(self, ID, w, h):
-        self.ID = ID
-        self.w = w
-        self.h = h
-        self.truck = -1
-        self.x = 0
-        self.y = 0
-        self.rotation = False
-
-
-class Container:
-    def __init__(self, ID, W, H, cost):
-        self.ID = ID
-        self.W = W
-        self.H = H
-        self.cost = cost
-        self.used = False
+class Container(ContainerView):
+    __slots__ = ('_used', 'objective', 'boxes', 'points', 'grid', 'skyline', 'maxrects')
+
+    def __init__(self, table: ContainerTable, j):
+        super().__init__(table, j)
+        W, H = self.W, self.H
+        self._used = False
+        self.objective = None  # Objective chung, gắn bởi track()
         self.boxes = []  # list of box IDs
+        self.grid = SpatialGrid(W, H)
+        self.points = ExtremePoints(W, H)
+        self.skyline = None  # Skyline, dựng khi dùng engine="skyline"
+        self.maxrects = None  # MaxRects, dựng khi dùng engine="maxrects"
+
+    @property
+    def used(self):
+        return self._used
+
+    @used.setter
+    def used(self, value):
+        if value != self._used:
+            self._used = value
+            if self.objective is not None:
+                self.objective.update(self, value)
 
 
 # ===================== GEOMETRY =====================
@@ -50,71 +65,98 @@ def can_place_at(box: Box, cont: Container, x, y, rot, boxes) -> bool:
     if x < 0 or y < 0:
         return False
 
-    # Tạm set để check intersection
-    old_x, old_y, old_rot = box.x, box.y, box.rotation
-    box.x, box.y, box.rotation = x, y, rot
-    
-    for bid in cont.boxes:
-        if box_intersect(box, boxes[bid - 1]):
-            box.x, box.y, box.rotation = old_x, old_y, old_rot
-            return False
-    
-    box.x, box.y, box.rotation = old_x, old_y, old_rot
-    return True
+    # Chỉ check các box nằm cùng ô lưới
+    return not cont.grid.overlaps(x, y, w, h)
 
 
-def get_candidate_positions(cont: Container, boxes) -> List[tuple]:
+def get_candidate_positions(cont: Container, boxes) -> ExtremePoints:
     """
-    Tính tất cả candidate positions trong container.
-    Sử dụng Bottom-Left heuristic: các điểm góc của boxes + (0,0)
+    Candidate positions trong container theo thứ tự (y, x).
+    Sử dụng Bottom-Left heuristic: các điểm góc của boxes + (0,0),
+    được container cập nhật dần mỗi khi thêm/bỏ box.
     """
-    positions = set()
-    positions.add((0, 0))
-    
-    for bid in cont.boxes:
-        b = boxes[bid - 1]
-        w, h = (b.h, b.w) if b.rotation else (b.w, b.h)
-        # Góc trên-trái và góc phải-dưới của mỗi box
-        positions.add((b.x + w, b.y))  # phải của box
-        positions.add((b.x, b.y + h))  # trên của box
-    
-    return sorted(positions, key=lambda p: (p[1], p[0]))  
+    return cont.points
+
+
+def find_position(box: Box, cont: Container, boxes, batch=False, engine="corner"):
+    """
+    Candidate (x, y, rot) đầu tiên đặt được box trong container, hoặc None.
+    batch=True kiểm tra candidate theo khối bằng feasible_mask (NumPy).
+    engine="skyline" thay các điểm góc bằng vị trí best-fit trên skyline,
+    engine="maxrects" chọn vùng trống best-short-side-fit của MaxRects.
+    """
+    if engine == "maxrects":
+        return maxrects_position(box, cont, boxes)
+    if engine == "skyline":
+        pos = skyline_position(box, cont, boxes)
+        if pos is not None:
+            return pos
+        # Skyline không thấy các lỗ bên dưới nó (vd. sau destroy): thử điểm góc
+    elif engine != "corner":
+        raise ValueError(f"Unknown placement engine: {engine}")
+
+    positions = get_candidate_positions(cont, boxes)
+    if batch:
+        candidates = ((x, y, rot) for (x, y) in positions for rot in (False, True))
+        return first_feasible(box, cont, candidates)
+
+    for (x, y) in positions:
+        for rot in (False, True):
+            if can_place_at(box, cont, x, y, rot, boxes):
+                return x, y, rot
+    return None
 
 
 def place_box(box: Box, cont: Container, x, y, rot):
     """Đặt box vào container tại vị trí (x, y)"""
+    w, h = (box.h, box.w) if rot else (box.w, box.h)
     box.x, box.y, box.rotation = x, y, rot
     box.truck = cont.ID
     cont.boxes.append(box.ID)
+    cont.grid.insert(box.ID, x, y, w, h)
+    cont.points.insert(x, y, w, h, cont.grid)
+    if cont.skyline is not None:
+        cont.skyline.add(x, y, w, h)
+    if cont.maxrects is not None:
+        cont.maxrects.add(x, y, w, h)
     cont.used = True
 
 
+def remove_box(box: Box, cont: Container):
+    """Bỏ box khỏi container"""
+    w, h = (box.h, box.w) if box.rotation else (box.w, box.h)
+    cont.boxes.remove(box.ID)
+    cont.grid.remove(box.ID)
+    cont.points.remove(box.x, box.y, w, h, cont.grid)
+    # Skyline không hạ xuống được, MaxRects không gộp lại được: dựng lại khi cần
+    cont.skyline = cont.maxrects = None
+    cont.used = bool(cont.boxes)
+    box.truck = -1
+
+
 # ===================== OBJECTIVE =====================
 
 def total_cost(containers):
-    return sum(c.cost for c in containers if c.used)
+    objective = containers[0].objective
+    if objective is None:
+        return sum(c.cost for c in containers if c.used)
+    return objective.cost
 
 
 # ===================== GREEDY CONSTRUCTION =====================
 
-def greedy_construct(boxes, containers):
+def greedy_construct(boxes, containers, batch=False, engine="corner"):
     """Greedy: đặt từng box vào container có cost thấp nhất mà fit được"""
     containers.sort(key=lambda c: (c.cost, c.ID))
+    track(containers)
 
     for box in boxes:
         placed = False
         for cont in containers:
-            # Tính candidate positions động
-            positions = get_candidate_positions(cont, boxes)
-            for (x, y) in positions:
-                for rot in (False, True):
-                    if can_place_at(box, cont, x, y, rot, boxes):
-                        place_box(box, cont, x, y, rot)
-                        placed = True
-                        break
-                if placed:
-                    break
-            if placed:
+            pos = find_position(box, cont, boxes, batch, engine)
+            if pos is not None:
+                place_box(box, cont, *pos)
+                placed = True
                 break
 
         if not placed:
@@ -127,37 +169,39 @@ def rebuild_container_state(boxes, containers):
     """Rebuild container.boxes từ thông tin boxes"""
     for c in containers:
         c.boxes.clear()
+        c.grid.clear()
+        c.points.clear()
+        c.skyline = c.maxrects = None
         c.used = False
 
+    # containers đã sort theo cost nên phải tìm theo ID
+    cont_by_id = {c.ID: c for c in containers}
+
     for b in boxes:
         if b.truck != -1:
-            cont = containers[b.truck - 1]
-            cont.boxes.append(b.ID)
-            cont.used = True
+            place_box(b, cont_by_id[b.truck], b.x, b.y, b.rotation)
 
 
-def random_destroy(boxes, containers, destroy_rate=0.2):
-    """Randomly remove some boxes from solution"""
+def random_destroy(boxes, containers, destroy_rate=0.2, rng=random):
+    """Randomly remove some boxes from solution (rng: random.Random riêng, mặc định module random)"""
     active_boxes = [b for b in boxes if b.truck != -1]
     if not active_boxes:
         return []
 
     num_remove = max(1, int(len(active_boxes) * destroy_rate))
-    removed = random.sample(active_boxes, num_remove)
+    removed = rng.sample(active_boxes, num_remove)
 
-    # Reset assignment cho các boxes bị remove
+    # Chỉ cập nhật các container chứa box bị remove
+    cont_by_id = {c.ID: c for c in containers}
     for b in removed:
-        b.truck = -1
-
-    # Rebuild container state
-    rebuild_container_state(boxes, containers)
+        remove_box(b, cont_by_id[b.truck])
 
     return removed
 
 
 # ===================== REPAIR =====================
 
-def repair_solution(removed, boxes, containers):
+def repair_solution(removed, boxes, containers, batch=False, engine="corner"):
     """Repair: đặt lại các boxes đã bị remove"""
     # Sort removed boxes theo diện tích giảm dần (đặt box lớn trước)
     removed_sorted = sorted(removed, key=lambda b: b.w * b.h, reverse=True)
@@ -166,16 +210,10 @@ def repair_solution(removed, boxes, containers):
         placed = False
         # Ưu tiên đặt vào containers đã used (cost thấp) trước
         for cont in sorted(containers, key=lambda c: (0 if c.used else 1, c.cost, c.ID)):
-            positions = get_candidate_positions(cont, boxes)
-            for (x, y) in positions:
-                for rot in (False, True):
-                    if can_place_at(b, cont, x, y, rot, boxes):
-                        place_box(b, cont, x, y, rot)
-                        placed = True
-                        break
-                if placed:
-                    break
-            if placed:
+            pos = find_position(b, cont, boxes, batch, engine)
+            if pos is not None:
+                place_box(b, cont, *pos)
+                placed = True
                 break
 
         if not placed:
@@ -185,42 +223,47 @@ def repair_solution(removed, boxes, containers):
 # ===================== LNS =====================
 
 def save_solution(boxes):
-    """Lưu lại trạng thái hiện tại của boxes"""
-    return [(b.truck, b.x, b.y, b.rotation) for b in boxes]
+    """Lưu lại trạng thái hiện tại của boxes (copy các cột của BoxTable)"""
+    return boxes[0].table.snapshot()
 
 
 def restore_solution(boxes, containers, saved):
     """Khôi phục trạng thái boxes từ saved"""
-    for b, (truck, x, y, rot) in zip(boxes, saved):
-        b.truck = truck
-        b.x = x
-        b.y = y
-        b.rotation = rot
+    boxes[0].table.restore(saved)
     rebuild_container_state(boxes, containers)
 
 
-def random_LNS(boxes, containers, iters=200, destroy_rate=0.2):
+def random_LNS(boxes, containers, iters=200, destroy_rate=0.2, engine="corner", bound=None, rng=random):
+    """
+    bound: cận dưới của cost (bounds.lower_bound), dừng khi best_cost đạt cận.
+    rng: nguồn ngẫu nhiên của destroy, truyền random.Random(seed) để không
+    đụng tới trạng thái của module random dùng chung.
+    """
     initial_cost = total_cost(containers)
     best_cost = initial_cost
     best_solution = save_solution(boxes)
     
     print(f"Initial cost: {initial_cost}")
-    print(f"Containers used: {sum(1 for c in containers if c.used)}")
+    print(f"Containers used: {containers[0].objective.n_used}")
 
     for i in range(iters):
+        if bound is not None and best_cost <= bound:
+            print(f"Iter {i}: cost reached the lower bound {bound}")
+            break
+
         # Save current state before destroy
         current_solution = save_solution(boxes)
         current_cost = total_cost(containers)
         
-        removed = random_destroy(boxes, containers, destroy_rate)
-        repair_solution(removed, boxes, containers)
+        removed = random_destroy(boxes, containers, destroy_rate, rng)
+        repair_solution(removed, boxes, containers, engine=engine)
 
         new_cost = total_cost(containers)
         
         if new_cost < best_cost:
             best_cost = new_cost
             best_solution = save_solution(boxes)
-            print(f"Iter {i}: Improved! Cost: {new_cost}, Containers: {sum(1 for c in containers if c.used)}")
+            print(f"Iter {i}: Improved! Cost: {new_cost}, Containers: {containers[0].objective.n_used}")
         else:
             # Rollback về best solution
             restore_solution(boxes, containers, best_solution)
@@ -231,26 +274,18 @@ def random_LNS(boxes, containers, iters=200, destroy_rate=0.2):
 # ===================== IO =====================
 
 def solve():
-    with open("example.txt", "r") as f:
-        data = f.read().strip().split()
-
-    it = iter(data)
+    instance = load("example.txt")
 
-    N = int(next(it))
-    K = int(next(it))
-
-    boxes = [Box(i + 1, int(next(it)), int(next(it))) for i in range(N)]
-    containers = [
-        Container(i + 1, int(next(it)), int(next(it)), int(next(it)))
-        for i in range(K)
-    ]
+    boxes = BoxTable(instance.item_list()).views()
+    containers = ContainerTable(instance.truck_list()).views(Container)
 
     containers.sort(key=lambda c: (c.cost, c.ID))
 
     greedy_construct(boxes, containers)
     print("After greedy - Cost:", total_cost(containers))
-    
-    random_LNS(boxes, containers, iters=100, destroy_rate=0.3)
+
+    bound = lower_bound([(b.w, b.h) for b in boxes], [(c.W, c.H, c.cost) for c in containers])
+    random_LNS(boxes, containers, iters=100, destroy_rate=0.3, bound=bound)
     
     print("Final cost:", total_cost(containers))
 
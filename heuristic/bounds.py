@@ -0,0 +1,126 @@
+import numpy as np
+
+
+def _arrays(items, trucks):
+    """items [(w, h)], trucks [(W, H, cost)] -> mảng numpy int64"""
+    it = np.asarray(items, dtype=np.int64).reshape(-1, 2)
+    tr = np.asarray(trucks, dtype=np.int64).reshape(-1, 3)
+    return it, tr
+
+
+def useful_area(items, trucks) -> np.ndarray:
+    """
+    Diện tích dùng được của từng truck: min(W * H, tổng diện tích các item
+    vừa truck đó). Truck không chứa được item nào thì bằng 0.
+    """
+    it, tr = _arrays(items, trucks)
+    w, h = it[:, 0][:, None], it[:, 1][:, None]
+    W, H = tr[:, 0][None, :], tr[:, 1][None, :]
+    fits = ((w <= W) & (h <= H)) | ((h <= W) & (w <= H))  # (n, k)
+    area = it[:, 0] * it[:, 1]
+    return np.minimum(tr[:, 0] * tr[:, 1], area @ fits)
+
+
+def fit_bound(items, trucks) -> int:
+    """Mỗi item cần ít nhất một truck vừa nó: max_i (cost rẻ nhất của truck chứa được i)"""
+    it, tr = _arrays(items, trucks)
+    w, h = it[:, 0][:, None], it[:, 1][:, None]
+    W, H = tr[:, 0][None, :], tr[:, 1][None, :]
+    fits = ((w <= W) & (h <= H)) | ((h <= W) & (w <= H))
+    if not fits.any(axis=1).all():
+        raise ValueError("Some item fits in no truck")
+    cheapest = np.where(fits, tr[:, 2][None, :], np.iinfo(np.int64).max).min(axis=1)
+    return int(cheapest.max()) if len(cheapest) else 0
+
+
+def area_bound(items, trucks) -> int:
+    """Tổng diện tích item nhân với cost / diện tích nhỏ nhất của các truck"""
+    it, tr = _arrays(items, trucks)
+    need = int((it[:, 0] * it[:, 1]).sum())
+    area = useful_area(items, trucks)
+    ok = area > 0
+    if need == 0:
+        return 0
+    ratio = (tr[ok, 2] / area[ok]).min()
+    return int(np.ceil(need * ratio - 1e-9))
+
+
+def continuous_bound(items, trucks) -> int:
+    """
+    Nới lỏng liên tục của bài toán phủ diện tích: chọn truck theo cost / diện
+    tích tăng dần, truck cuối được lấy một phần (Dantzig).
+    """
+    it, tr = _arrays(items, trucks)
+    need = int((it[:, 0] * it[:, 1]).sum())
+    area = useful_area(items, trucks)
+    lb = 0.0
+    for j in sorted(np.nonzero(area)[0], key=lambda j: tr[j, 2] / area[j]):
+        if need <= 0:
+            break
+        take = min(need, area[j])
+        lb += tr[j, 2] * take / area[j]
+        need -= take
+    if need > 0:
+        raise ValueError("Total truck area is smaller than total item area")
+    return int(np.ceil(lb - 1e-9))
+
+
+def greedy_cover_cost(items, trucks) -> int:
+    """Cost của một tập truck phủ đủ diện tích (lấy nguyên truck theo thứ tự Dantzig)"""
+    it, tr = _arrays(items, trucks)
+    need = int((it[:, 0] * it[:, 1]).sum())
+    area = useful_area(items, trucks)
+    cost = 0
+    for j in sorted(np.nonzero(area)[0], key=lambda j: tr[j, 2] / area[j]):
+        if need <= 0:
+            break
+        cost += int(tr[j, 2])
+        need -= int(area[j])
+    if need > 0:
+        raise ValueError("Total truck area is smaller than total item area")
+    return cost
+
+
+def knapsack_bound(items, trucks, upper=None, max_states=200_000_000) -> int:
+    """
+    Cost nhỏ nhất của một tập truck (mỗi truck dùng tối đa một lần) có tổng
+    diện tích dùng được >= tổng diện tích item: knapsack 0-1 quy hoạch động
+    theo cost, dp[c] = diện tích lớn nhất với tổng cost <= c.
+    upper: cost của một lời giải đã biết, giới hạn bảng dp.
+    Bảng quá lớn (> max_states) thì trả về continuous_bound.
+    """
+    it, tr = _arrays(items, trucks)
+    need = int((it[:, 0] * it[:, 1]).sum())
+    if need == 0:
+        return 0
+    area = useful_area(items, trucks)
+    U = greedy_cover_cost(items, trucks)
+    if upper is not None:
+        U = min(U, int(upper))
+    if (U + 1) * len(tr) > max_states:
+        return continuous_bound(items, trucks)
+
+    dp = np.zeros(U + 1, dtype=np.int64)
+    for j in np.nonzero(area)[0]:
+        c, a = int(tr[j, 2]), int(area[j])
+        if c > U:
+            continue
+        if c == 0:
+            dp += a
+            continue
+        # vế phải tính từ dp cũ trước khi gán: mỗi truck chỉ dùng một lần
+        dp[c:] = np.maximum(dp[c:], dp[:U + 1 - c] + a)
+
+    reach = np.nonzero(dp >= need)[0]
+    # upper là cost của lời giải thật nên luôn phủ đủ diện tích
+    return int(reach[0]) if len(reach) else U
+
+
+def lower_bound(items, trucks, upper=None) -> int:
+    """Cận dưới tốt nhất trong các cận trên"""
+    return max(fit_bound(items, trucks), knapsack_bound(items, trucks, upper))
+
+
+def gap(cost, bound) -> float:
+    """Gap tương đối (cost - bound) / cost"""
+    return (cost - bound) / cost if cost else 0.0
@@ -0,0 +1,132 @@
+from array import array
+
+
+# ===================== BOXES =====================
+
+class BoxTable:
+    """
+    Structure-of-arrays cho N box: kích thước (w, h) và vị trí đặt hiện tại
+    (truck, x, y, rotation). Box i (0-based) có ID = i + 1.
+    """
+
+    __slots__ = ('w', 'h', 'truck', 'x', 'y', 'rotation')
+
+    def __init__(self, sizes):
+        n = len(sizes)
+        self.w = array('i', (w for w, _ in sizes))
+        self.h = array('i', (h for _, h in sizes))
+        self.truck = array('i', [-1]) * n
+        self.x = array('i', [0]) * n
+        self.y = array('i', [0]) * n
+        self.rotation = array('b', [0]) * n
+
+    def __len__(self):
+        return len(self.w)
+
+    def views(self):
+        return [Box(self, i) for i in range(len(self.w))]
+
+    def snapshot(self):
+        """Copy các cột vị trí đặt (kích thước không đổi nên dùng chung)"""
+        return (array('i', self.truck), array('i', self.x),
+                array('i', self.y), array('b', self.rotation))
+
+    def restore(self, snapshot):
+        truck, x, y, rotation = snapshot
+        self.truck[:] = truck
+        self.x[:] = x
+        self.y[:] = y
+        self.rotation[:] = rotation
+
+    def copy(self):
+        table = BoxTable.__new__(BoxTable)
+        table.w, table.h = self.w, self.h
+        table.truck, table.x, table.y, table.rotation = self.snapshot()
+        return table
+
+
+class Box:
+    """
+    View (__slots__) vào một dòng của BoxTable.
+    ID, w, h không đổi nên được giữ sẵn; vị trí đặt đọc/ghi thẳng vào bảng.
+    """
+
+    __slots__ = ('table', 'i', 'ID', 'w', 'h')
+
+    def __init__(self, table: BoxTable, i):
+        self.table = table
+        self.i = i
+        self.ID = i + 1
+        self.w = table.w[i]
+        self.h = table.h[i]
+
+    @property
+    def truck(self):
+        return self.table.truck[self.i]
+
+    @truck.setter
+    def truck(self, value):
+        self.table.truck[self.i] = value
+
+    @property
+    def x(self):
+        return self.table.x[self.i]
+
+    @x.setter
+    def x(self, value):
+        self.table.x[self.i] = value
+
+    @property
+    def y(self):
+        return self.table.y[self.i]
+
+    @y.setter
+    def y(self, value):
+        self.table.y[self.i] = value
+
+    @property
+    def rotation(self):
+        return bool(self.table.rotation[self.i])
+
+    @rotation.setter
+    def rotation(self, value):
+        self.table.rotation[self.i] = value
+
+
+# ===================== CONTAINERS =====================
+
+class ContainerTable:
+    """Structure-of-arrays cho K container: W, H, cost. Container j có ID = j + 1."""
+
+    __slots__ = ('W', 'H', 'cost')
+
+    def __init__(self, specs):
+        self.W = array('i', (W for W, _, _ in specs))
+        self.H = array('i', (H for _, H, _ in specs))
+        self.cost = array('i', (c for _, _, c in specs))
+
+    def __len__(self):
+        return len(self.W)
+
+    def views(self, cls):
+        """Tạo container (lớp con của ContainerView) cho từng dòng"""
+        return [cls(self, j) for j in range(len(self.W))]
+
+
+class ContainerView:
+    """
+    View vào một dòng của ContainerTable (W, H, cost không đổi nên giữ sẵn).
+    Mỗi heuristic kế thừa để thêm state riêng (boxes, grid, ...) qua
+    __slots__ của lớp con.
+    """
+
+    __slots__ = ('table', 'j', 'ID', 'W', 'H', 'cost')
+
+    def __init__(self, table: ContainerTable, j):
+        self.table = table
+        self.j = j
+        self.ID = j + 1
+        self.W = table.W[j]
+        self.H = table.H[j]
+        self.cost = table.cost[j]
+
@@ -0,0 +1,161 @@
+import os
+import re
+import numpy as np
+
+from instance import Instance, parse
+
+# Corpus đóng gói nằm trong <test_dir>/.corpus/
+CORPUS_DIR = ".corpus"
+INPUT_NAME = re.compile(r"input(\d+)\.txt$")
+
+
+def discover(test_dir):
+    """
+    Các phase và test có trong test_dir: [(phase, [test, ...])] tăng dần,
+    đọc từ tên thư mục Phase_{p} và file input{NN}.txt (thay cho bảng phases
+    viết cứng trong các harness). Test chạy liền từ số nhỏ nhất tới lớn nhất
+    tìm thấy: file thiếu ở giữa vẫn là một test (dòng N/A), để dòng CSV
+    khớp với số test như bảng cũ.
+    """
+    phases = []
+    for name in os.listdir(test_dir):
+        match = re.fullmatch(r"Phase_(\d+)", name)
+        if match is None or not os.path.isdir(os.path.join(test_dir, name)):
+            continue
+        found = [int(m.group(1)) for m in map(INPUT_NAME.match, os.listdir(os.path.join(test_dir, name))) if m]
+        if found:
+            phases.append((int(match.group(1)), list(range(min(found), max(found) + 1))))
+    return sorted(phases)
+
+
+class Corpus:
+    """
+    Toàn bộ instance của một phase trong một file int64 memory-mapped:
+    với mỗi test, items (2n số) rồi trucks (3k số) nối liền nhau. Index
+    (test, n, k, offset) nằm trong file .npz đi kèm, cùng (size, mtime) của
+    các file nguồn: file nguồn đổi thì corpus được đóng gói lại.
+
+    get(test) / iter trả về Instance mà items, trucks là view của memmap
+    (không copy, không parse): nhiều process mở cùng corpus dùng chung page
+    cache của hệ điều hành.
+
+    File input parse lỗi không làm hỏng cả phase: index ghi n = k = -1 cùng
+    thông báo lỗi, get(test) raise ValueError đó, iter trả về None cho test
+    đó để harness ghi dòng N/A như khi đọc file lỗi.
+    """
+
+    def __init__(self, test_dir, phase, build=True):
+        self.phase = phase
+        self.source_dir = os.path.join(test_dir, f"Phase_{phase}")
+        self.data_path = os.path.join(test_dir, CORPUS_DIR, f"Phase_{phase}.bin")
+        self.index_path = os.path.join(test_dir, CORPUS_DIR, f"Phase_{phase}.idx.npz")
+        if build and self.stale():
+            self.build()
+        with np.load(self.index_path) as index:
+            self.tests = index["tests"]
+            self.n = index["n"]
+            self.k = index["k"]
+            self.offset = index["offset"]
+            self.errors = index["errors"]
+        self._row = {int(t): r for r, t in enumerate(self.tests)}
+        total = int(np.where(self.n >= 0, 2 * self.n + 3 * self.k, 0).sum())
+        self.data = np.memmap(self.data_path, dtype=np.int64, mode="r", shape=(total,)) if total else np.zeros(0, np.int64)
+
+    def _sources(self):
+        """[(test, path)] của các file input trong phase"""
+        found = [(int(m.group(1)), os.path.join(self.source_dir, m.group(0)))
+                 for m in map(INPUT_NAME.match, os.listdir(self.source_dir)) if m]
+        return sorted(found)
+
+    def _stamp(self, sources):
+        """(test, size, mtime_ns) của từng file nguồn: chỉ cần stat, không đọc file"""
+        return np.array([(t, os.stat(p).st_size, os.stat(p).st_mtime_ns) for t, p in sources],
+                        dtype=np.int64).reshape(-1, 3)
+
+    def stale(self):
+        """True nếu chưa có corpus hoặc file nguồn đã đổi"""
+        if not (os.path.exists(self.data_path) and os.path.exists(self.index_path)):
+            return True
+        try:
+            with np.load(self.index_path) as index:
+                if "errors" not in index.files:
+                    return True  # index cũ, chưa ghi lỗi parse
+                return not np.array_equal(index["stamp"], self._stamp(self._sources()))
+        except (OSError, KeyError, ValueError):
+            return True
+
+    def build(self):
+        """
+        Parse mọi file input của phase và ghi corpus (file tạm rồi os.replace).
+        File lỗi được ghi vào index (n = k = -1, errors) thay vì raise.
+        """
+        sources = self._sources()
+        stamp = self._stamp(sources)
+        instances, errors = [], []
+        for _, path in sources:
+            try:
+                with open(path, "rb") as f:
+                    instances.append(parse(f.read()))
+                errors.append("")
+            except (OSError, ValueError) as e:
+                instances.append(None)
+                errors.append(str(e))
+        n = np.array([inst.n if inst is not None else -1 for inst in instances], dtype=np.int64)
+        k = np.array([inst.k if inst is not None else -1 for inst in instances], dtype=np.int64)
+        sizes = np.where(n >= 0, 2 * n + 3 * k, 0)
+        offset = np.concatenate(([0], np.cumsum(sizes)[:-1])).astype(np.int64)
+
+        os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
+        tmp = f"{self.data_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            for inst in instances:
+                if inst is None:
+                    continue
+                inst.items.astype(np.int64).tofile(f)
+                inst.trucks.astype(np.int64).tofile(f)
+        os.replace(tmp, self.data_path)
+        # index ghi sau data: index mới luôn trỏ vào data đầy đủ
+        tmp = f"{self.index_path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, tests=np.array([t for t, _ in sources], dtype=np.int64),
+                     n=n, k=k, offset=offset, stamp=stamp, errors=np.array(errors, dtype=str))
+        os.replace(tmp, self.index_path)
+
+    def __len__(self):
+        return len(self.tests)
+
+    def __contains__(self, test):
+        return test in self._row
+
+    def path(self, test):
+        """File text gốc của test (để báo lỗi, ghi log)"""
+        return os.path.join(self.source_dir, f"input{test:02d}.txt")
+
+    def valid(self, test):
+        """True nếu test có trong phase và file input parse được"""
+        return test in self._row and bool(self.n[self._row[test]] >= 0)
+
+    def get(self, test) -> Instance:
+        """Instance của test, raise ValueError nếu file input của nó không parse được"""
+        r = self._row[test]
+        start, n, k = int(self.offset[r]), int(self.n[r]), int(self.k[r])
+        if n < 0:
+            raise ValueError(f"{self.path(test)}: {self.errors[r]}")
+        items = self.data[start:start + 2 * n].reshape(n, 2)
+        trucks = self.data[start + 2 * n:start + 2 * n + 3 * k].reshape(k, 3)
+        return Instance(items, trucks)
+
+    def __iter__(self):
+        """
+        (test, Instance) theo thứ tự test như discover(), kể cả các số test
+        thiếu file ở giữa; Instance là None nếu file input thiếu hoặc lỗi.
+        """
+        if not len(self.tests):
+            return
+        for t in range(int(self.tests[0]), int(self.tests[-1]) + 1):
+            yield t, self.get(t) if self.valid(t) else None
+
+
+def open_all(test_dir):
+    """[(phase, Corpus)] của mọi phase trong test_dir, đóng gói lại phase nào đã cũ"""
+    return [(phase, Corpus(test_dir, phase)) for phase, _ in discover(test_dir)]
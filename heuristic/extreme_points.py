@@ -0,0 +1,81 @@
+import bisect
+
+
+class ExtremePoints:
+    """
+    Tập điểm ứng viên (góc phải-dưới, góc trên-trái của các box + (0,0)) của
+    một container, luôn được giữ theo thứ tự (y, x).
+
+    Điểm nằm ngoài container hoặc bị một box che (không box nào đặt được tại
+    đó) bị loại khỏi danh sách ứng viên, nên thứ tự thử vị trí giống hệt việc
+    sort lại toàn bộ góc mỗi lần.
+    """
+
+    def __init__(self, W, H):
+        self.W = W
+        self.H = H
+        self.count = {(0, 0): 1}  # (y, x) -> số box sinh ra điểm này
+        self.keys = [(0, 0)]      # mọi điểm (y, x) trong container, đã sort
+        self.live = [(0, 0)]      # các điểm chưa bị box nào che, đã sort
+
+    def __iter__(self):
+        # Chỉ được sửa tập điểm sau khi đã dừng duyệt
+        for y, x in self.live:
+            yield x, y
+
+    def __len__(self):
+        return len(self.live)
+
+    def clear(self):
+        self.count = {(0, 0): 1}
+        self.keys = [(0, 0)]
+        self.live = [(0, 0)]
+
+    def _in_rect(self, x, y, w, h):
+        """Các điểm (y, x) đã biết nằm trong [x, x+w) x [y, y+h)"""
+        lo = bisect.bisect_left(self.keys, (y, -1))
+        hi = bisect.bisect_left(self.keys, (y + h, -1))
+        return [p for p in self.keys[lo:hi] if x <= p[1] < x + w]
+
+    def _add_live(self, p):
+        i = bisect.bisect_left(self.live, p)
+        if i == len(self.live) or self.live[i] != p:
+            self.live.insert(i, p)
+
+    def _drop_live(self, p):
+        i = bisect.bisect_left(self.live, p)
+        if i < len(self.live) and self.live[i] == p:
+            del self.live[i]
+
+    def insert(self, x, y, w, h, grid):
+        """Cập nhật sau khi box (x, y, w, h) đã được thêm vào grid"""
+        for p in self._in_rect(x, y, w, h):
+            self._drop_live(p)
+
+        for p in ((y, x + w), (y + h, x)):
+            if p[1] >= self.W or p[0] >= self.H:
+                continue
+            n = self.count.get(p, 0)
+            self.count[p] = n + 1
+            if n == 0:
+                bisect.insort(self.keys, p)
+                if not grid.overlaps(p[1], p[0], 1, 1):
+                    self._add_live(p)
+
+    def remove(self, x, y, w, h, grid):
+        """Cập nhật sau khi box (x, y, w, h) đã được bỏ khỏi grid"""
+        for p in ((y, x + w), (y + h, x)):
+            if p[1] >= self.W or p[0] >= self.H:
+                continue
+            n = self.count[p] - 1
+            if n:
+                self.count[p] = n
+                continue
+            del self.count[p]
+            del self.keys[bisect.bisect_left(self.keys, p)]
+            self._drop_live(p)
+
+        # Các điểm trước đó bị box này che có thể dùng lại được
+        for p in self._in_rect(x, y, w, h):
+            if not grid.overlaps(p[1], p[0], 1, 1):
+                self._add_live(p)
@@ -0,0 +1,61 @@
+from itertools import islice
+
+import numpy as np
+
+
+def placed_rects(grid):
+    """Các box đã đặt trong grid dưới dạng mảng (n, 4): x, y, w, h"""
+    if grid.packed is None:
+        grid.packed = np.array(list(grid.rects.values()), dtype=np.int64).reshape(-1, 4)
+    return grid.packed
+
+
+def feasible_mask(box, cont, candidates) -> np.ndarray:
+    """
+    Kiểm tra cùng lúc mọi candidate (x, y, rot) của box trong container.
+    Trả về mảng bool, phần tử i là True nếu đặt được box tại candidates[i].
+    """
+    cand = np.asarray(candidates, dtype=np.int64).reshape(-1, 3)
+    x, y, rot = cand[:, 0], cand[:, 1], cand[:, 2].astype(bool)
+    w = np.where(rot, box.h, box.w)
+    h = np.where(rot, box.w, box.h)
+
+    mask = (x >= 0) & (y >= 0) & (x + w <= cont.W) & (y + h <= cont.H)
+
+    idx = mask.nonzero()[0]
+    rects = placed_rects(cont.grid)
+    if len(idx) == 0 or len(rects) == 0:
+        return mask
+
+    x1, y1 = x[idx], y[idx]
+    x2, y2 = x1 + w[idx], y1 + h[idx]
+
+    # Chỉ giữ các box nằm trong dải y mà các candidate có thể chạm tới
+    bx, by, bw, bh = rects.T
+    near = (by < y2.max()) & (by + bh > y1.min())
+    if near.any():
+        bx, by, bx2, by2 = bx[near], by[near], bx[near] + bw[near], by[near] + bh[near]
+        hit = ((x1[:, None] < bx2) & (bx < x2[:, None])
+               & (y1[:, None] < by2) & (by < y2[:, None]))
+        mask[idx] = ~hit.any(axis=1)
+    return mask
+
+
+def first_feasible(box, cont, candidates, chunk=64):
+    """
+    Candidate (x, y, rot) đầu tiên đặt được box, hoặc None.
+    candidates có thể là iterator; kiểm tra theo từng khối để dừng sớm như
+    vòng lặp can_place.
+    """
+    # Box không vừa container theo chiều nào thì khỏi gọi NumPy
+    if not ((box.w <= cont.W and box.h <= cont.H) or (box.h <= cont.W and box.w <= cont.H)):
+        return None
+
+    it = iter(candidates)
+    while True:
+        block = list(islice(it, chunk))
+        if not block:
+            return None
+        hits = feasible_mask(box, cont, block).nonzero()[0]
+        if len(hits):
+            return block[hits[0]]
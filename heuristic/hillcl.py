@@ -1,32 +1,40 @@
 import sys
-import copy
 from typing import List
 
+from core import Box, BoxTable, ContainerTable, ContainerView
+from spatial import SpatialGrid
+from objective import track
+from feasibility import feasible_mask
+from bounds import lower_bound
+from instance import read_stdin
+
 INF = 10**9
 
 
 # ===================== DATA STRUCTURES =====================
 
-class Box:
-    def __init__(self, ID, w, h):
-        self.ID = ID
-        self.w = w
-        self.h = h
-        self.truck = -1
-        self.x = 0
-        self.y = 0
-        self.rotation = False
-
-
-class Container:
-    def __init__(self, ID, W, H, cost):
-        self.ID = ID
-        self.W = W
-        self.H = H
-        self.cost = cost
-        self.used = False
+class Container(ContainerView):
+    __slots__ = ('_used', 'objective', 'boxes', 'boxes_pos', 'grid')
+
+    def __init__(self, table: ContainerTable, j):
+        super().__init__(table, j)
+        W, H = self.W, self.H
+        self._used = False
+        self.objective = None  # Objective chung, gắn bởi track()
         self.boxes = []
         self.boxes_pos = [(0, 0)]
+        self.grid = SpatialGrid(W, H)
+
+    @property
+    def used(self):
+        return self._used
+
+    @used.setter
+    def used(self, value):
+        if value != self._used:
+            self._used = value
+            if self.objective is not None:
+                self.objective.update(self, value)
 
 
 # ===================== GEOMETRY =====================
@@ -48,12 +56,7 @@ def can_place(box: Box, container: Container, x, y, rotation, boxes: List[Box])
     if x + w > container.W or y + h > container.H:
         return False
 
-    box.x, box.y, box.rotation = x, y, rotation
-    for bid in container.boxes:
-        if box_intersect(box, boxes[bid - 1]):
-            return False
-
-    return True
+    return not container.grid.overlaps(x, y, w, h)
 
 
 def insert_box(box: Box, container: Container, x, y, rotation):
@@ -65,6 +68,7 @@ def insert_box(box: Box, container: Container, x, y, rotation):
     box.truck = container.ID
 
     container.boxes.append(box.ID)
+    container.grid.insert(box.ID, x, y, w, h)
     container.boxes_pos.append((x, y + h))
     container.boxes_pos.append((x + w, y))
     container.used = True
@@ -72,7 +76,7 @@ def insert_box(box: Box, container: Container, x, y, rotation):
 
 # ===================== CONSTRUCTIVE =====================
 
-def find_best_container(box: Box, containers, boxes, used_flag):
+def find_best_container(box: Box, containers, boxes, used_flag, batch=False):
     best = None
     min_cost = INF
     best_sum = INF
@@ -81,14 +85,24 @@ def find_best_container(box: Box, containers, boxes, used_flag):
         if cont.used != used_flag:
             continue
 
-        for pos in cont.boxes_pos:
-            for rot in (False, True):
-                if can_place(box, cont, pos[0], pos[1], rot, boxes):
-                    s = pos[0] + pos[1]
-                    if cont.cost < min_cost or (cont.cost == min_cost and s < best_sum):
-                        min_cost = cont.cost
-                        best_sum = s
-                        best = (i, pos, rot)
+        if batch:
+            candidates = [(pos, rot) for pos in cont.boxes_pos for rot in (False, True)]
+            mask = feasible_mask(box, cont, [(p[0], p[1], rot) for p, rot in candidates])
+            feasible = [candidates[k] for k in mask.nonzero()[0]]
+        else:
+            feasible = [
+                (pos, rot)
+                for pos in cont.boxes_pos
+                for rot in (False, True)
+                if can_place(box, cont, pos[0], pos[1], rot, boxes)
+            ]
+
+        for pos, rot in feasible:
+            s = pos[0] + pos[1]
+            if cont.cost < min_cost or (cont.cost == min_cost and s < best_sum):
+                min_cost = cont.cost
+                best_sum = s
+                best = (i, pos, rot)
 
         if cont.cost >= min_cost:
             break
@@ -96,12 +110,13 @@ def find_best_container(box: Box, containers, boxes, used_flag):
     if best is not None:
         return best
 
-    return find_best_container(box, containers, boxes, False)
+    return find_best_container(box, containers, boxes, False, batch)
 
 
-def construct_initial_solution(boxes, containers):
+def construct_initial_solution(boxes, containers, batch=False):
+    track(containers)
     for box in boxes:
-        ci, pos, rot = find_best_container(box, containers, boxes, True)
+        ci, pos, rot = find_best_container(box, containers, boxes, True, batch)
         containers[ci].boxes_pos.remove(pos)
         insert_box(box, containers[ci], pos[0], pos[1], rot)
 
@@ -109,7 +124,33 @@ def construct_initial_solution(boxes, containers):
 # ===================== COST =====================
 
 def compute_cost(containers):
-    return sum(c.cost for c in containers if c.used)
+    objective = containers[0].objective
+    if objective is None:
+        return sum(c.cost for c in containers if c.used)
+    return objective.cost
+
+
+# ===================== MOVES =====================
+
+def relocation_delta(src: Container, dst: Container) -> int:
+    """Cost thay đổi khi chuyển 1 box từ src sang dst"""
+    delta = 0 if dst.used else dst.cost
+    if len(src.boxes) == 1:
+        delta -= src.cost
+    return delta
+
+
+def apply_relocation(box: Box, src: Container, dst: Container, x, y, rotation):
+    """
+    Chuyển box từ src sang dst ngay trên solution hiện tại.
+    hill_climbing đã kiểm tra delta và vị trí trước khi gọi nên không cần hoàn tác.
+    """
+    src.boxes.remove(box.ID)
+    src.grid.remove(box.ID)
+    if not src.boxes:
+        src.used = False
+
+    insert_box(box, dst, x, y, rotation)
 
 
 # ===================== HILL CLIMBING =====================
@@ -121,17 +162,18 @@ def find_container_of_box(box_id, containers):
     return None
 
 
-def hill_climbing(boxes, containers):
+def hill_climbing(boxes, containers, bound=None):
     """
     Hill Climbing using RELOCATION move:
     Move one box from its current container to another container
     if total cost is reduced.
+    Stops early once the cost reaches bound (a lower bound, see bounds.py).
     """
 
     best_cost = compute_cost(containers)
     improved = True
 
-    while improved:
+    while improved and (bound is None or best_cost > bound):
         improved = False
 
         # iterate over boxes by ID (stable)
@@ -147,41 +189,22 @@ def hill_climbing(boxes, containers):
                 if dst is src:
                     continue
 
+                # delta không phụ thuộc vị trí: bỏ qua cả container nếu không giảm cost
+                delta = relocation_delta(src, dst)
+                if delta >= 0:
+                    continue
+
                 # try all extreme points
                 for pos in dst.boxes_pos:
                     for rot in (False, True):
-
-                        # --- copy whole state ---
-                        boxes_cp = copy.deepcopy(boxes)
-                        conts_cp = copy.deepcopy(containers)
-
-                        b = boxes_cp[box.ID - 1]
-                        src_cp = find_container_of_box(b.ID, conts_cp)
-                        dst_cp = conts_cp[dst.ID - 1]
-
-                        if src_cp is None:
+                        if not can_place(box, dst, pos[0], pos[1], rot, boxes):
                             continue
 
-                        # remove from source
-                        src_cp.boxes.remove(b.ID)
-                        if not src_cp.boxes:
-                            src_cp.used = False
-
-                        # try place in destination
-                        if not can_place(b, dst_cp, pos[0], pos[1], rot, boxes_cp):
-                            continue
-
-                        insert_box(b, dst_cp, pos[0], pos[1], rot)
-
-                        new_cost = compute_cost(conts_cp)
-
                         # hill climbing: accept ONLY improvement
-                        if new_cost < best_cost:
-                            boxes[:] = boxes_cp
-                            containers[:] = conts_cp
-                            best_cost = new_cost
-                            improved = True
-                            break
+                        apply_relocation(box, src, dst, pos[0], pos[1], rot)
+                        best_cost += delta
+                        improved = True
+                        break
 
                     if improved:
                         break
@@ -195,17 +218,10 @@ def hill_climbing(boxes, containers):
 # ===================== MAIN =====================
 
 def solve():
-    data = sys.stdin.read().strip().split()
-    it = iter(data)
-
-    N = int(next(it))
-    K = int(next(it))
+    instance = read_stdin()
 
-    boxes = [Box(i + 1, int(next(it)), int(next(it))) for i in range(N)]
-    containers = [
-        Container(i + 1, int(next(it)), int(next(it)), int(next(it)))
-        for i in range(K)
-    ]
+    boxes = BoxTable(instance.item_list()).views()
+    containers = ContainerTable(instance.truck_list()).views(Container)
 
     containers.sort(key=lambda c: (c.cost, c.ID))
 
@@ -213,7 +229,8 @@ def solve():
     construct_initial_solution(boxes, containers)
 
     # 2️⃣ Hill Climbing
-    boxes, containers = hill_climbing(boxes, containers)
+    bound = lower_bound([(b.w, b.h) for b in boxes], [(c.W, c.H, c.cost) for c in containers])
+    boxes, containers = hill_climbing(boxes, containers, bound)
 
     # Output
     for box in boxes:
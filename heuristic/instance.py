@@ -0,0 +1,103 @@
+import os
+import sys
+import hashlib
+import numpy as np
+
+# Sidecar nhị phân nằm cạnh file input: <thư mục>/.instance_cache/<tên file>.npz
+CACHE_DIR = ".instance_cache"
+
+
+class Instance:
+    """
+    Một instance: items (n, 2) = (w, h), trucks (k, 3) = (W, H, cost),
+    mảng numpy int64. item_list() / truck_list() trả về list tuple cho các
+    model cần kiểu Python.
+    """
+
+    __slots__ = ('items', 'trucks')
+
+    def __init__(self, items, trucks):
+        self.items = items
+        self.trucks = trucks
+
+    @property
+    def n(self):
+        return len(self.items)
+
+    @property
+    def k(self):
+        return len(self.trucks)
+
+    def item_list(self):
+        return [tuple(row) for row in self.items.tolist()]
+
+    def truck_list(self):
+        return [tuple(row) for row in self.trucks.tolist()]
+
+    def as_tuple(self):
+        """(n, k, items, trucks) như Input() của Solver/"""
+        return self.n, self.k, self.item_list(), self.truck_list()
+
+
+def parse(data) -> Instance:
+    """
+    Đọc cả input một lần thành mảng int64 (str hoặc bytes):
+    "n k", n dòng "w h", k dòng "W H cost".
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    # np.array(split) dừng ở token lỗi thay vì bỏ qua như fromstring
+    try:
+        values = np.array(data.split(), dtype=np.int64)
+    except ValueError as e:
+        raise ValueError(f"Invalid input format: {e}")
+    if len(values) < 2:
+        raise ValueError("Invalid input format: missing n and k")
+    n, k = int(values[0]), int(values[1])
+    if n < 0 or k < 0 or len(values) < 2 + 2 * n + 3 * k:
+        raise ValueError(f"Invalid input format: expected {2 + 2 * n + 3 * k} numbers, got {len(values)}")
+    items = values[2:2 + 2 * n].reshape(n, 2)
+    trucks = values[2 + 2 * n:2 + 2 * n + 3 * k].reshape(k, 3)
+    return Instance(items, trucks)
+
+
+def sidecar_path(path) -> str:
+    folder, name = os.path.split(os.path.abspath(path))
+    return os.path.join(folder, CACHE_DIR, name + ".npz")
+
+
+def load(path, cache=False) -> Instance:
+    """
+    Đọc file input. cache=True: dùng sidecar .npz nếu hash (blake2b) của file
+    khớp, ngược lại parse rồi ghi sidecar mới (ghi file tạm rồi os.replace
+    nên nhiều process chạy song song không đọc phải file ghi dở).
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    if not cache:
+        return parse(raw)
+
+    digest = hashlib.blake2b(raw, digest_size=16).hexdigest()
+    sidecar = sidecar_path(path)
+    try:
+        with np.load(sidecar) as cached:
+            if str(cached["digest"]) == digest:
+                return Instance(cached["items"], cached["trucks"])
+    except (OSError, KeyError, ValueError):
+        pass  # chưa có sidecar hoặc sidecar hỏng: parse lại
+
+    instance = parse(raw)
+    try:
+        os.makedirs(os.path.dirname(sidecar), exist_ok=True)
+        tmp = f"{sidecar}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, items=instance.items, trucks=instance.trucks, digest=np.array(digest))
+        os.replace(tmp, sidecar)
+    except OSError:
+        pass  # thư mục chỉ đọc: vẫn trả về kết quả đã parse
+    return instance
+
+
+def read_stdin() -> Instance:
+    """Đọc input từ stdin (các script trong Solver/, Assignment/)"""
+    return parse(sys.stdin.buffer.read())
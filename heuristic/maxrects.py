@@ -0,0 +1,87 @@
+class MaxRects:
+    """
+    Tập các hình chữ nhật trống tối đại (x, y, w, h) của một container.
+    Mỗi box đặt vào cắt mọi vùng trống giao với nó thành tối đa 4 phần,
+    sau đó bỏ các vùng nằm gọn trong vùng khác.
+    """
+
+    def __init__(self, W, H):
+        self.W = W
+        self.H = H
+        self.free = [(0, 0, W, H)]
+
+    def __len__(self):
+        return len(self.free)
+
+    def find(self, w, h):
+        """
+        Best-short-side-fit: vị trí (x, y, rot) mà phần dư cạnh ngắn nhỏ nhất
+        (rồi cạnh dài, rồi (y, x)), hoặc None nếu không vùng trống nào vừa.
+        """
+        best = None
+        for fx, fy, fw, fh in self.free:
+            for rot in (False, True):
+                bw, bh = (h, w) if rot else (w, h)
+                if bw > fw or bh > fh:
+                    continue
+                dw, dh = fw - bw, fh - bh
+                key = (min(dw, dh), max(dw, dh), fy, fx)
+                if best is None or key < best[0]:
+                    best = (key, (fx, fy, rot))
+        return best[1] if best else None
+
+    def add(self, x, y, w, h):
+        """Cập nhật sau khi đặt box (x, y, w, h)"""
+        x2, y2 = x + w, y + h
+        kept, split = [], []
+        for r in self.free:
+            fx, fy, fw, fh = r
+            fx2, fy2 = fx + fw, fy + fh
+            if x >= fx2 or x2 <= fx or y >= fy2 or y2 <= fy:
+                kept.append(r)
+                continue
+            # Phần trái / phải / dưới / trên box còn trống
+            if x > fx:
+                split.append((fx, fy, x - fx, fh))
+            if x2 < fx2:
+                split.append((x2, fy, fx2 - x2, fh))
+            if y > fy:
+                split.append((fx, fy, fw, y - fy))
+            if y2 < fy2:
+                split.append((fx, y2, fw, fy2 - y2))
+        self.free = kept + self._prune(split, kept)
+
+    @staticmethod
+    def _prune(rects, others=()):
+        """
+        Các vùng mới rects sau khi bỏ vùng trùng hoặc nằm gọn trong vùng khác
+        (vùng mới khác hoặc vùng cũ others). Các vùng cũ không chứa nhau, và
+        không nằm được trong vùng mới (vùng mới nằm trong vùng cũ đã bị cắt),
+        nên chỉ cần kiểm tra các vùng mới: O(mới * tổng) thay vì O(tổng^2).
+        """
+        # Vùng lớn trước: một vùng mới chỉ có thể bị chứa trong vùng mới đứng trước nó
+        rects = sorted(set(rects), key=lambda r: r[2] * r[3], reverse=True)
+        kept = []
+        for r in rects:
+            x, y, w, h = r
+            x2, y2 = x + w, y + h
+            if not any(kx <= x and ky <= y and x2 <= kx + kw and y2 <= ky + kh
+                       for group in (kept, others) for kx, ky, kw, kh in group):
+                kept.append(r)
+        return kept
+
+
+def maxrects_position(box, cont, boxes):
+    """
+    Vị trí (x, y, rot) cho box theo MaxRects của container, hoặc None.
+    Tập vùng trống được dựng lại từ các box hiện có nếu container đã bị xoá
+    bớt box (cắt theo từng box cho ra đúng các vùng trống tối đại).
+    """
+    if cont.maxrects is None:
+        space = MaxRects(cont.W, cont.H)
+        for bid in cont.boxes:
+            b = boxes[bid - 1]
+            w, h = (b.h, b.w) if b.rotation else (b.w, b.h)
+            space.add(b.x, b.y, w, h)
+        cont.maxrects = space
+    return cont.maxrects.find(box.w, box.h)
@@ -0,0 +1,28 @@
+class Objective:
+    """
+    Cost và số truck đang dùng của một solution.
+    Container báo lại mỗi khi chuyển trạng thái used, nên truy vấn là O(1)
+    thay vì quét lại toàn bộ containers.
+    """
+
+    def __init__(self):
+        self.cost = 0
+        self.n_used = 0
+
+    def update(self, cont, used):
+        if used:
+            self.cost += cont.cost
+            self.n_used += 1
+        else:
+            self.cost -= cont.cost
+            self.n_used -= 1
+
+
+def track(containers) -> Objective:
+    """Gắn một Objective chung cho các container, tính từ trạng thái hiện tại"""
+    objective = Objective()
+    for c in containers:
+        c.objective = objective
+        if c.used:
+            objective.update(c, True)
+    return objective
@@ -0,0 +1,102 @@
+import os
+import csv
+import numpy as np
+
+
+def placements_array(boxes):
+    """
+    Mảng (n, 5) int64 [ID, truck, x, y, rotation] theo thứ tự ID, từ các
+    box có thuộc tính ID, truck, x, y, rotation (Box của các harness).
+    """
+    flat = [v for b in boxes for v in (b.ID, b.truck, b.x, b.y, int(b.rotation))]
+    rows = np.fromiter(flat, dtype=np.int64, count=len(flat)).reshape(-1, 5)
+    return rows[np.argsort(rows[:, 0], kind="stable")]
+
+
+def format_rows(rows, sep="\n"):
+    """
+    Các dòng "i truck x y rot" của mảng (n, 5) trong một lần format
+    (% trên cả chuỗi mẫu thay cho một f-string mỗi dòng). Không có sep cuối.
+    """
+    flat = np.asarray(rows, dtype=np.int64).ravel().tolist()
+    if not flat:
+        return ""
+    return (("%d %d %d %d %d" + sep) * (len(flat) // 5) % tuple(flat))[:-len(sep)]
+
+
+def write_solution(path, rows, summary=None, binary=False):
+    """
+    Ghi lời giải bằng một lần write.
+    Text: các dòng "i truck x y rot", rồi dòng summary nếu có (mỗi dòng kết thúc bằng \\n).
+    binary=True: file .npz gồm rows (int32) và summary, đọc lại bằng read_solution.
+    """
+    if binary:
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1, 5)
+        with open(path, "wb") as f:
+            np.savez_compressed(f, rows=rows.astype(np.int32), summary=np.array(summary or ""))
+        return
+    text = format_rows(rows)
+    if text:
+        text += "\n"
+    if summary is not None:
+        text += f"{summary}\n"
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def read_solution(path):
+    """(rows (n, 5) int64, summary hoặc None) từ file text hoặc .npz của write_solution"""
+    with open(path, "rb") as f:
+        binary = f.read(2) == b"PK"  # .npz là file zip
+    if binary:
+        with np.load(path) as data:
+            return data["rows"].astype(np.int64), str(data["summary"]) or None
+    with open(path) as f:
+        lines = f.read().split("\n")
+    lines = [line for line in lines if line.strip()]
+    rows = [line for line in lines if len(line.split()) == 5]
+    summary = [line for line in lines if len(line.split()) != 5]
+    array = np.array(" ".join(rows).split(), dtype=np.int64).reshape(-1, 5)
+    return array, summary[-1] if summary else None
+
+
+class CsvAppender:
+    """
+    Ghi CSV từng dòng: mỗi append() ghi và flush ngay, sweep bị ngắt giữa
+    chừng vẫn giữ các dòng đã xong. resume=True giữ lại file cũ (cùng header)
+    và ghi tiếp, ngược lại file được ghi lại từ đầu.
+    """
+
+    def __init__(self, path, fieldnames, resume=False):
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        keep = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        if keep:
+            with open(path, newline="") as f:
+                header = next(csv.reader(f), None)
+            if header != self.fieldnames:
+                raise ValueError(f"{path}: header {header} does not match {self.fieldnames}")
+        self._file = open(path, "a" if keep else "w", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        if not keep:
+            self._writer.writeheader()
+            self._file.flush()
+
+    def append(self, row):
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def rows(self):
+        """Các dòng đã có trong file (kể cả của lần chạy trước khi resume)"""
+        self._file.flush()
+        with open(self.path, newline="") as f:
+            return list(csv.DictReader(f))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,99 @@
+from collections import deque
+
+
+class Skyline:
+    """
+    Đường bao trên (skyline) của các box trong một container: các đoạn
+    [x, y, width] liên tiếp phủ kín [0, W), y là độ cao cao nhất đã bị chiếm
+    trên đoạn đó. Đặt box phía trên skyline thì không thể chồng lên box nào.
+    """
+
+    def __init__(self, W, H):
+        self.W = W
+        self.H = H
+        self.segments = [[0, 0, W]]
+
+    def add(self, x, y, w, h):
+        """Nâng skyline trên [x, x+w) lên ít nhất y+h"""
+        top = y + h
+        x2 = x + w
+        new = []
+        for sx, sy, sw in self.segments:
+            sx2 = sx + sw
+            if sx2 <= x or sx >= x2 or sy >= top:
+                new.append([sx, sy, sw])
+                continue
+            # Cắt đoạn thành phần bên trái / bị nâng / bên phải
+            if sx < x:
+                new.append([sx, sy, x - sx])
+            lo, hi = max(sx, x), min(sx2, x2)
+            new.append([lo, top, hi - lo])
+            if sx2 > x2:
+                new.append([x2, sy, sx2 - x2])
+
+        merged = [new[0]]
+        for seg in new[1:]:
+            if seg[1] == merged[-1][1]:
+                merged[-1][2] += seg[2]
+            else:
+                merged.append(seg)
+        self.segments = merged
+
+    def fit(self, w, h):
+        """
+        Vị trí (x, y) tốt nhất cho hình w x h: đỉnh thấp nhất, rồi x nhỏ nhất.
+        Trả về None nếu không vừa.
+
+        Một lượt qua các đoạn: cửa sổ [x, x+w) chỉ trượt sang phải nên đoạn
+        cuối của nó (j) không lùi lại, và deque giữ các đoạn trong cửa sổ theo
+        y giảm dần nên đầu deque là độ cao lớn nhất, O(s) thay vì O(s^2).
+        """
+        best = None
+        segs = self.segments
+        window = deque()
+        j = 0
+        for i, (x, _, _) in enumerate(segs):
+            if x + w > self.W:
+                break
+            # thêm các đoạn bắt đầu trước x+w (luôn có đoạn i)
+            while j < len(segs) and (j <= i or segs[j][0] < x + w):
+                while window and segs[window[-1]][1] <= segs[j][1]:
+                    window.pop()
+                window.append(j)
+                j += 1
+            while window[0] < i:
+                window.popleft()
+            y = segs[window[0]][1]  # độ cao lớn nhất của các đoạn nằm dưới [x, x+w)
+            if y + h > self.H:
+                continue
+            if best is None or (y + h, x) < (best[1] + h, best[0]):
+                best = (x, y)
+        return best
+
+    def find(self, w, h):
+        """Vị trí (x, y, rot) tốt nhất khi được xoay box, hoặc None"""
+        best = None
+        for rot in (False, True):
+            bw, bh = (h, w) if rot else (w, h)
+            pos = self.fit(bw, bh)
+            if pos is None:
+                continue
+            key = (pos[1] + bh, pos[0])
+            if best is None or key < best[0]:
+                best = (key, (pos[0], pos[1], rot))
+        return best[1] if best else None
+
+
+def skyline_position(box, cont, boxes):
+    """
+    Vị trí (x, y, rot) cho box theo skyline của container, hoặc None.
+    Skyline được dựng lại từ các box hiện có nếu container đã bị xoá bớt box.
+    """
+    if cont.skyline is None:
+        sky = Skyline(cont.W, cont.H)
+        for bid in cont.boxes:
+            b = boxes[bid - 1]
+            w, h = (b.h, b.w) if b.rotation else (b.w, b.h)
+            sky.add(b.x, b.y, w, h)
+        cont.skyline = sky
+    return cont.skyline.find(box.w, box.h)
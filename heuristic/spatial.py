@@ -0,0 +1,70 @@
+class SpatialGrid:
+    """
+    Uniform grid over the floor of a container.
+    Each placed box is registered in every cell its rectangle covers, so an
+    overlap query only looks at boxes sharing a cell with the query rectangle.
+    """
+
+    def __init__(self, W, H, cells=16):
+        self.size = max(1, -(-max(W, H) // cells))
+        self.cells = {}  # (cx, cy) -> list of box IDs
+        self.rects = {}  # box ID -> (x, y, w, h)
+        self.packed = None  # rects dạng mảng (xem feasibility.py), xoá khi grid đổi
+        self.log = None  # list (grid, op, bid, rect) khi một undo log đang ghi (CBGLS.Journal)
+
+    def _span(self, x, y, w, h):
+        s = self.size
+        return (range(x // s, (x + w - 1) // s + 1),
+                range(y // s, (y + h - 1) // s + 1))
+
+    def insert(self, bid, x, y, w, h):
+        if self.log is not None:
+            self.log.append((self, "insert", bid, None))
+        self.rects[bid] = (x, y, w, h)
+        self.packed = None
+        xs, ys = self._span(x, y, w, h)
+        for cx in xs:
+            for cy in ys:
+                self.cells.setdefault((cx, cy), []).append(bid)
+
+    def remove(self, bid):
+        x, y, w, h = self.rects.pop(bid)
+        if self.log is not None:
+            self.log.append((self, "remove", bid, (x, y, w, h)))
+        self.packed = None
+        xs, ys = self._span(x, y, w, h)
+        for cx in xs:
+            for cy in ys:
+                self.cells[(cx, cy)].remove(bid)
+
+    def __deepcopy__(self, memo):
+        # rects chỉ chứa tuple int nên copy nông từng bucket là đủ
+        grid = SpatialGrid.__new__(SpatialGrid)
+        grid.size = self.size
+        grid.cells = {key: bucket[:] for key, bucket in self.cells.items()}
+        grid.rects = dict(self.rects)
+        grid.packed = None
+        grid.log = None
+        return grid
+
+    def clear(self):
+        self.cells.clear()
+        self.rects.clear()
+        self.packed = None
+
+    def overlaps(self, x, y, w, h) -> bool:
+        """True nếu hình chữ nhật (x, y, w, h) giao với một box đã đặt"""
+        s = self.size
+        x2, y2 = x + w, y + h
+        cells, rects = self.cells, self.rects
+        for cx in range(x // s, (x2 - 1) // s + 1):
+            for cy in range(y // s, (y2 - 1) // s + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                # Một box lớn có thể nằm ở nhiều ô, check lại cũng không sai
+                for bid in bucket:
+                    bx, by, bw, bh = rects[bid]
+                    if bx < x2 and x < bx + bw and by < y2 and y < by + bh:
+                        return True
+        return False